@@ -0,0 +1,157 @@
+"""Dense-only vs hybrid (dense + BM25, RRF) retrieval on synthetic listings.
+
+Reports recall@k for exact-token questions (street address, zip, MLS id) and the
+latency of exact keyword lookups. Runs fully offline on the in-memory vector
+store.
+
+    python benchmarks/bench_hybrid_retrieval.py --listings 2000
+    python benchmarks/bench_hybrid_retrieval.py --model intfloat/multilingual-e5-large
+
+Without ``--model`` a hashed bag-of-words embedder stands in for the e5 model so
+the script runs without downloading weights; pass ``--model`` for numbers that
+reflect production.
+"""
+import argparse
+import hashlib
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.keyword_index import KeywordIndex
+from services.retrieval import fuse, keyword_search, vector_search
+from services.vector_store import create_vector_store
+
+STREETS = ["Elm", "Oak", "Maple", "Cedar", "Pine", "Lakeview", "Sunset", "Willow", "Highland", "River"]
+CITIES = ["Austin", "Dallas", "Houston", "Denver", "Phoenix", "Tampa"]
+FEATURES = [
+    "renovated kitchen with quartz counters",
+    "large backyard and covered patio",
+    "walking distance to schools and parks",
+    "open floor plan with vaulted ceilings",
+    "two-car garage and new roof",
+]
+
+
+class HashingEmbedder:
+    """Deterministic stand-in for the e5 model: hashed unigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _vector(self, text: str):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            vec[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return (vec / (np.linalg.norm(vec) or 1.0)).tolist()
+
+    def embed_passages(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def make_listings(n: int, rng: random.Random):
+    listings = []
+    for i in range(n):
+        listing = {
+            "id": f"listing-{i}",
+            "number": rng.randint(100, 9999),
+            "street": rng.choice(STREETS),
+            "city": rng.choice(CITIES),
+            "zip": f"{rng.randint(70000, 89999)}",
+            "mls": f"{rng.randint(1000000, 9999999)}",
+            "price": rng.randrange(150_000, 1_500_000, 1000),
+            "beds": rng.randint(1, 6),
+        }
+        listing["text"] = (
+            f"{listing['beds']} bed home at {listing['number']} {listing['street']} St, "
+            f"{listing['city']} {listing['zip']}. Listed at ${listing['price']:,}. "
+            f"MLS# {listing['mls']}. Features a {rng.choice(FEATURES)} and {rng.choice(FEATURES)}."
+        )
+        listings.append(listing)
+    return listings
+
+
+def make_questions(listings, count: int, rng: random.Random):
+    templates = [
+        lambda l: f"What is the price of the house at {l['number']} {l['street']} St?",
+        lambda l: f"Tell me about MLS {l['mls']}",
+        lambda l: f"How many bedrooms does the {l['zip']} listing on {l['street']} have?",
+    ]
+    return [(rng.choice(templates)(l), l["id"]) for l in rng.sample(listings, count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--model", help="embedding model name; defaults to a hashing stand-in")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    listings = make_listings(args.listings, rng)
+    questions = make_questions(listings, args.questions, rng)
+
+    if args.model:
+        from services.embedding_service import EmbeddingService
+        embedder = EmbeddingService(model_name=args.model, cache_path=None)
+    else:
+        embedder = HashingEmbedder()
+
+    store = create_vector_store({"backend": "memory", "collection": f"bench_{uuid.uuid4().hex[:8]}"})
+    tmpdir = tempfile.mkdtemp()
+    index = KeywordIndex(str(pathlib.Path(tmpdir) / "keywords.sqlite3"))
+
+    ids = [l["id"] for l in listings]
+    texts = [l["text"] for l in listings]
+    metadatas = [{"source": f"https://example.com/{l['id']}"} for l in listings]
+    for start in range(0, len(ids), 500):
+        part = slice(start, start + 500)
+        store.upsert(ids=ids[part], documents=texts[part], metadatas=metadatas[part], embeddings=embedder.embed_passages(texts[part]))
+        index.upsert(ids[part], texts[part], metadatas[part])
+
+    dense_hits = hybrid_hits = 0
+    dense_ms, keyword_ms = [], []
+    for question, expected in questions:
+        embedding = embedder.embed_query(question)
+        t0 = time.perf_counter()
+        dense = vector_search(store, embedding, args.candidates)
+        t1 = time.perf_counter()
+        keyword = keyword_search(index, question, args.candidates)
+        t2 = time.perf_counter()
+        dense_ms.append((t1 - t0) * 1000)
+        keyword_ms.append((t2 - t1) * 1000)
+        dense_hits += expected in [h.id for h in dense[:args.top_k]]
+        hybrid_hits += expected in [h.id for h in fuse([dense, keyword], args.top_k)]
+
+    lookup_us = []
+    for listing in listings[: args.questions]:
+        t0 = time.perf_counter()
+        found = index.lookup(listing["mls"])
+        lookup_us.append((time.perf_counter() - t0) * 1e6)
+        assert listing["id"] in found
+
+    n = len(questions)
+    print(f"listings={args.listings} questions={n} top_k={args.top_k} embedder={args.model or 'hashing stand-in'}")
+    print(f"recall@{args.top_k} dense only : {dense_hits / n:.3f}")
+    print(f"recall@{args.top_k} hybrid RRF : {hybrid_hits / n:.3f}")
+    print(f"dense search   p50 {statistics.median(dense_ms):.2f} ms")
+    print(f"keyword search p50 {statistics.median(keyword_ms):.2f} ms")
+    print(f"exact MLS lookup p50 {statistics.median(lookup_us):.0f} us, p95 {sorted(lookup_us)[int(0.95 * len(lookup_us))]:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Latency / quality trade-off of the cross-encoder re-rank stage.
+
+For each over-fetch size and cut-off setting, reports recall@k (the listing that
+answers the question is among the chunks sent), MRR, the average number of
+chunks sent to the LLM and re-rank latency, against the fused top-k baseline.
+
+    python benchmarks/bench_rerank.py --model cross-encoder/ms-marco-MiniLM-L-6-v2
+    python benchmarks/bench_rerank.py --scorer overlap     # offline stand-in
+
+``--scorer overlap`` replaces the cross-encoder with a word-overlap scorer so
+the harness can be exercised without model weights; its numbers say nothing
+about the real model.
+"""
+import argparse
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import uuid
+
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from bench_hybrid_retrieval import HashingEmbedder, make_listings, make_questions
+from services.keyword_index import KeywordIndex
+from services.reranker import Reranker
+from services.retrieval import fuse, keyword_search, vector_search
+from services.vector_store import create_vector_store
+
+
+class OverlapScorer:
+    """Stand-in for a CrossEncoder: fraction of query words present in the passage."""
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        scores = []
+        for query, text in pairs:
+            words = set(query.lower().replace("?", "").split())
+            passage = set(text.lower().replace(",", " ").replace(".", " ").split())
+            scores.append(len(words & passage) / len(words) if words else 0.0)
+        return scores
+
+
+def evaluate(results, questions):
+    recall = sum(expected in [h.id for h in hits] for hits, (_, expected) in zip(results, questions)) / len(questions)
+    mrr = 0.0
+    for hits, (_, expected) in zip(results, questions):
+        ids = [h.id for h in hits]
+        if expected in ids:
+            mrr += 1.0 / (ids.index(expected) + 1)
+    sent = statistics.mean(len(hits) for hits in results)
+    return recall, mrr / len(questions), sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--candidates", default="10,20,40", help="comma-separated over-fetch sizes")
+    parser.add_argument("--cutoffs", default="0,0.2,0.5", help="comma-separated relative cut-offs")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--scorer", choices=["cross-encoder", "overlap"], default="cross-encoder")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    listings = make_listings(args.listings, rng)
+    questions = make_questions(listings, args.questions, rng)
+
+    embedder = HashingEmbedder()
+    store = create_vector_store({"backend": "memory", "collection": f"bench_{uuid.uuid4().hex[:8]}"})
+    index = KeywordIndex(str(pathlib.Path(tempfile.mkdtemp()) / "keywords.sqlite3"))
+    ids = [l["id"] for l in listings]
+    texts = [l["text"] for l in listings]
+    metadatas = [{"source": f"https://example.com/{l['id']}"} for l in listings]
+    for start in range(0, len(ids), 500):
+        part = slice(start, start + 500)
+        store.upsert(ids=ids[part], documents=texts[part], metadatas=metadatas[part], embeddings=embedder.embed_passages(texts[part]))
+        index.upsert(ids[part], texts[part], metadatas[part])
+
+    sizes = [int(n) for n in args.candidates.split(",")]
+    cutoffs = [float(c) for c in args.cutoffs.split(",")]
+    pools = {n: [] for n in sizes}
+    for question, _ in questions:
+        dense = vector_search(store, embedder.embed_query(question), max(sizes))
+        keyword = keyword_search(index, question, max(sizes))
+        for n in sizes:
+            pools[n].append(fuse([dense, keyword], n))
+
+    model = OverlapScorer() if args.scorer == "overlap" else None
+    name = "overlap stand-in" if model is not None else args.model
+    print(f"listings={args.listings} questions={len(questions)} top_k={args.top_k} scorer={name}")
+    print(f"{'setting':<28}{'recall@k':>9}{'MRR':>7}{'sent':>7}{'p50 ms':>9}{'p95 ms':>9}")
+
+    baseline = [pool[:args.top_k] for pool in pools[min(sizes)]]
+    recall, mrr, sent = evaluate(baseline, questions)
+    print(f"{'fused top-k (no rerank)':<28}{recall:>9.3f}{mrr:>7.3f}{sent:>7.2f}{'-':>9}{'-':>9}")
+
+    for n in sizes:
+        for cutoff in cutoffs:
+            reranker = Reranker(model_name=args.model, batch_size=args.batch_size, min_score=0.0,
+                                relative_cutoff=cutoff, model=model)
+            if model is None:
+                model = reranker.model  # load once, share across settings
+            results = [reranker.rerank(question, pool, args.top_k).hits for (question, _), pool in zip(questions, pools[n])]
+            recall, mrr, sent = evaluate(results, questions)
+            stats = reranker.stats()
+            label = f"rerank N={n} cutoff={cutoff}"
+            print(f"{label:<28}{recall:>9.3f}{mrr:>7.3f}{sent:>7.2f}{stats['latency_ms_p50']:>9.2f}{stats['latency_ms_p95']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
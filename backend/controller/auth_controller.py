@@ -2,43 +2,92 @@ from fastapi import Depends, status, HTTPException, Cookie
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 from models import user_model, auth_model
-from database.postgresdb import get_db
-from sqlalchemy.orm import Session
-from env import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRATION_TIME
+from database.postgresdb import get_async_db, AsyncSessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from env import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRATION_TIME, USER_IMPORT_ADMIN_EMAILS
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
+import hmac
 import logging
+import time
 from middlewares.exceptions import AuthenticationError, AuthenticationWithCookie
+from services.auth_cache import password_fingerprint, token_cache, token_key, user_cache
+from services.password_hasher import password_hasher
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")  # Include prefix so docs/forms work
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto") # Password hashing context
+pwd_context = password_hasher.context # Password hashing context (bcrypt, BCRYPT_ROUNDS)
 
   
-def create_access_token(subject: str, user_id: int, remember: bool = False) -> str:
+def create_access_token(subject: str, user_id: int, remember: bool = False, password_hash: str = "") -> str:
     """Create a JWT signed with HS256 using configured secret.
-    Expiration is interpreted as days (per env comment)."""
+    Expiration is interpreted as days (per env comment).
+    ``pwv`` fingerprints the user's password hash, so changing the password revokes the token."""
     if not JWT_SECRET_KEY:
         raise RuntimeError("JWT secret key not configured")
     expires = datetime.now(timezone.utc) + timedelta(minutes=JWT_EXPIRATION_TIME if not remember else JWT_EXPIRATION_TIME * 24 * 7)
-    to_encode = {"sub": subject, "id": user_id, "exp": expires}
+    to_encode = {"sub": subject, "id": user_id, "pwv": password_fingerprint(password_hash), "exp": expires}
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
-def authenticate_user(email: str, password: str, db: Session) -> user_model.userSchema | bool:
-    user = db.query(user_model.userSchema).filter(user_model.userSchema.email == email).first()
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> user_model.userSchema | bool:
+    user = (await db.execute(select(user_model.userSchema).where(user_model.userSchema.email == email))).scalar_one_or_none()
+    if not user:
+        return False
+    ok, new_hash = await password_hasher.verify_and_update(password, user.password)
+    if not ok:
         return False
+    if new_hash:
+        # Hashed with a lower cost than BCRYPT_ROUNDS: store the upgraded hash
+        user.password = new_hash
+        await db.commit()
+        user_cache.invalidate(user.id)
+        logging.info(f"Rehashed password for user ID {user.id} at the current cost.")
     return user
 
 def verify_token(token: str) -> auth_model.TokenData:
+  """Verified claims of ``token``; repeat presentations of a token skip the signature check."""
+  key = token_key(token)
+  cached = token_cache.get(key)
+  if cached is not None:
+    return cached
   try:
     payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-    user_id: int = payload.get("id")
-    return auth_model.TokenData(user_id=user_id)
   except JWTError as e:
     logging.warning(f"Token validation failed: {str(e)}")
     raise AuthenticationError()
+  user_id = payload.get("id")
+  if not isinstance(user_id, int) or not payload.get("pwv"):
+    # Tokens issued before password fingerprints cannot be revoked; make the user sign in again
+    logging.warning("Token validation failed: missing claims")
+    raise AuthenticationError()
+  token_data = auth_model.TokenData(user_id=user_id, email=payload.get("sub"), password_version=payload["pwv"])
+  token_cache.put(key, token_data, ttl_seconds=payload["exp"] - time.time())
+  return token_data
+
+
+async def load_principal(token_data: auth_model.TokenData) -> auth_model.Principal | None:
+  """The user a verified token stands for, or None if they were deleted or changed password since.
+
+  Users are cached for a short TTL, so most requests do not touch the database;
+  ``user_controller`` invalidates the cache entry when a password changes or a
+  user is deleted.
+  """
+  cached = user_cache.get(token_data.user_id)
+  if cached is None:
+    async with AsyncSessionLocal() as db:
+      user = await db.get(user_model.userSchema, token_data.user_id)
+      if user is None:
+        return None
+      cached = (
+        auth_model.Principal(id=user.id, email=user.email, username=user.username, lastname=user.lastname),
+        password_fingerprint(user.password),
+      )
+    user_cache.put(token_data.user_id, cached)
+  principal, fingerprint = cached
+  if not hmac.compare_digest(fingerprint, token_data.password_version or ""):
+    return None
+  return principal
 
 def get_token_from_cookie(access_token: str | None = Cookie(default=None)) -> str:
     if not access_token:
@@ -46,16 +95,23 @@ def get_token_from_cookie(access_token: str | None = Cookie(default=None)) -> st
     return access_token
 
 def get_password_hash(password: str) -> str:
+    """Blocking; request handlers use ``password_hasher.hash`` so bcrypt runs off the event loop."""
     return pwd_context.hash(password)
 
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Blocking; request handlers use ``password_hasher.verify``."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 
-def get_current_user(token: Annotated[str, Depends(get_token_from_cookie)], db: Session = Depends(get_db)) -> user_model.userSchema:
+async def get_current_user(token: Annotated[str, Depends(get_token_from_cookie)]) -> auth_model.Principal:
+    return await _authenticate(token)
+
+
+
+async def _authenticate(token: str) -> auth_model.Principal:
     try:
         token_data = verify_token(token)
     except AuthenticationError as e:
@@ -64,23 +120,56 @@ def get_current_user(token: Annotated[str, Depends(get_token_from_cookie)], db:
             detail=f"Invalid token: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(user_model.userSchema).filter(user_model.userSchema.id == token_data.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    principal = await load_principal(token_data)
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: user not found or password changed",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+
+CurrentUser = Annotated[auth_model.Principal, Depends(get_current_user)]
+
+
+
+async def get_optional_current_user(access_token: str | None = Cookie(default=None)) -> auth_model.Principal | None:
+    """Like get_current_user, but requests without a token get None instead of a 401.
+
+    A token that is sent but does not verify (expired, tampered, revoked) is
+    still a 401: treating it as anonymous would silently move a signed-in
+    user onto the shared collection.
+    """
+    if not access_token:
+        return None
+    return await _authenticate(access_token)
+
+
+
+OptionalCurrentUser = Annotated[auth_model.Principal | None, Depends(get_optional_current_user)]
+
+
+
+def require_operator(current_user: CurrentUser) -> auth_model.Principal:
+    """The signed-in user, if listed in USER_IMPORT_ADMIN_EMAILS; anyone can register, so signing in is not enough."""
+    if current_user.email.lower() not in USER_IMPORT_ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operators only")
+    return current_user
 
 
 
-CurrentUser = Annotated[user_model.userSchema, Depends(get_current_user)]
+OperatorUser = Annotated[auth_model.Principal, Depends(require_operator)]
 
 
 
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db), remember: bool = False) -> auth_model.Token:
-    user = authenticate_user(form_data.username, form_data.password, db)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db), remember: bool = False) -> auth_model.Token:
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         logging.warning(f"Authentication failed for user: {form_data.username}")
         raise AuthenticationError()
-    access_token = create_access_token(subject=user.email, user_id=user.id, remember=remember)
+    access_token = create_access_token(subject=user.email, user_id=user.id, remember=remember, password_hash=user.password)
     logging.info(f"User {form_data.username} authenticated successfully.")
     return auth_model.Token(access_token=access_token, token_type="bearer")
 
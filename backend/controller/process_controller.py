@@ -1,32 +1,72 @@
-from env import GROQ_API_KEY, CHROMA_API_KEY, CHROMA_TENANT, CHROMA_DATABASE
-from uuid import uuid4
+from env import (
+    GROQ_API_KEY,
+    QUERY_EXECUTOR_WORKERS,
+    QUERY_TIMEOUT_SECONDS,
+    RETRIEVAL_TOP_K,
+    RETRIEVAL_CANDIDATES,
+    RERANK_CANDIDATES,
+    UPLOAD_MAX_BYTES,
+)
 
 if not GROQ_API_KEY:
     raise Exception("GROQ_API_KEY not set in environment variables.")
 
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_groq import ChatGroq
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pydantic import BaseModel, HttpUrl
-from typing import List
-import re
-from fastapi import HTTPException
-import chromadb
-from chromadb.utils import embedding_functions
-
-client = chromadb.CloudClient(
-  api_key=CHROMA_API_KEY,
-  tenant=CHROMA_TENANT,
-  database=CHROMA_DATABASE
+from typing import AsyncIterator, List
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import dataclasses
+import json
+from fastapi import HTTPException, Request
+from database.postgresdb import pool_stats
+from services.component_registry import registry
+from services.listing_store import ListingStore
+from services.query_cache import answer_cache
+from services.http_fetcher import http_fetcher
+from services.recrawl_scheduler import recrawl_scheduler
+from services.document_loader import (
+    UnsupportedDocument,
+    UploadTooLarge,
+    pdf_support_available,
+    save_upload,
 )
+from services.answer_sanitizer import sanitize_answer, StreamingSanitizer
+from services.retrieval import vector_search, keyword_search, fuse
+from services.context_builder import ContextResult, context_builder
+from services.query_router import answer_listing_query
+from services.metadata_filters import SearchFilters
+from services.ingest_jobs import job_queue, get_job, cancel_job, run_ingest
 
 # --- Pydantic Models for API Request/Response ---
 
 class UrlList(BaseModel):
     urls: List[HttpUrl]
 
+class QueryFilters(BaseModel):
+    # No owner field: whose documents are searched follows from the signed-in user
+    domain: List[str] | None = None
+    source: List[str] | None = None
+    doc_type: List[str] | None = None
+    ingested_after: datetime | None = None
+    ingested_before: datetime | None = None
+
+    def to_search_filters(self) -> SearchFilters | None:
+        filters = SearchFilters(
+            domains=self.domain or [],
+            sources=self.source or [],
+            doc_types=self.doc_type or [],
+            ingested_after=int(self.ingested_after.timestamp()) if self.ingested_after else None,
+            ingested_before=int(self.ingested_before.timestamp()) if self.ingested_before else None,
+        )
+        return None if filters.is_empty else filters
+
 class Query(BaseModel):
     question: str
+    filters: QueryFilters | None = None
+
+    def search_filters(self) -> SearchFilters | None:
+        return self.filters.to_search_filters() if self.filters is not None else None
 
 class AnswerResponse(BaseModel):
     answer: str
@@ -34,98 +74,75 @@ class AnswerResponse(BaseModel):
 
 # --- Global Variables ---
 
-llm = None
-embeddings = None
-vector_store = None
-client = None
+# Bounded pool for blocking query work so it never runs on the event loop
+query_executor = ThreadPoolExecutor(max_workers=QUERY_EXECUTOR_WORKERS, thread_name_prefix="query")
 
-# --- Component Initialization Functions ---
 
-def initialize_component():
-    global llm, embeddings, vector_store, client
+def process_single_url(url: str, owner_id: int | None = None) -> int:
+    """
+    Process a single URL: load, split, embed, and store in the vector store.
+    Returns the number of new chunks written for this URL (0 if unchanged).
+    """
+    result = run_ingest([url], owner_id=owner_id).results[url]
+    if result.error is not None:
+        raise Exception(result.error)
+    return result.chunks
 
-    print("Initial LLM")
-    llm = ChatGroq(
-        api_key=GROQ_API_KEY,
-        model="meta-llama/llama-4-maverick-17b-128e-instruct",
-        max_tokens=2048,
-    )
-    print("Initialized LLM")
 
-    print("Initial Embeddings Function (Chroma)")
-    # Use Chroma's embedding function compatible with Cloud collections
-    embeddings = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="intfloat/multilingual-e5-large"
-    )
-    print("Initialized Embeddings Function")
-
-    # Initialize Chroma Cloud client lazily to avoid import-time env errors
-    if not (CHROMA_API_KEY and CHROMA_TENANT and CHROMA_DATABASE):
-        raise Exception("Chroma Cloud environment variables are not configured.")
-    print("Initial Chroma Cloud Collection")
-    client = chromadb.CloudClient(
-        api_key=CHROMA_API_KEY,
-        tenant=CHROMA_TENANT,
-        database=CHROMA_DATABASE,
-    )
-    vector_store = client.get_or_create_collection(
-        name="real_estate_documents",
-        embedding_function=embeddings,
-    )
-    print("Initialized Chroma Cloud Collection")
+async def _offload(fn, *args):
+    """Run blocking work (embedding, vector store I/O) on the bounded query executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(query_executor, fn, *args)
 
 
+def components_for(components, owner_id: int | None):
+    """The registry's components with the vector store and keyword index swapped for the user's own."""
+    if owner_id is None or components.tenants is None:
+        return components
+    store = components.tenants.get(owner_id)
+    return dataclasses.replace(components, vector_store=store.vector_store, keyword_index=store.keyword_index)
 
-def process_single_url(url: str) -> int:
-    """
-    Process a single URL: load, split, embed, and store in the vector store.
-    Returns the number of chunks added for this URL.
-    """
-    if embeddings is None or vector_store is None:
-        print("Components not initialized. Please call initialize_component() first.")
-        raise Exception("Components not initialized.")
-
-    loader = WebBaseLoader([url])
-    documents = loader.load()
-
-    print(f"Splitting documents for URL: {url} ...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        separators=["\n\n", "\n", " "],
-        chunk_size=1000,
-        chunk_overlap=200,
-    )
-    docs = text_splitter.split_documents(documents)
-    print(f"URL {url} split completed. Found {len(docs)} chunks.")
 
-    print(f"Adding {len(docs)} chunks to vector store for URL: {url} ...")
-    uid = [str(uuid4()) for _ in range(len(docs))]
-
-    # Upsert raw texts and metadatas into Chroma Cloud
-    vector_store.upsert(
-        documents=[d.page_content for d in docs],
-        metadatas=[d.metadata for d in docs],
-        ids=uid,
-    )
-    try:
-        total = vector_store.count()
-    except Exception:
-        total = 'unknown'
-    print(f"Done adding for URL {url}. Total documents: {total}")
-    return len(docs)
+def _cache_scope(filters: SearchFilters | None, owner_id: int | None) -> str:
+    scope = filters.cache_scope() if filters is not None else ""
+    return f"user:{owner_id}|{scope}" if owner_id is not None else scope
 
 
-def generate_answer(query: str):
-    if vector_store is None or llm is None:
-        raise Exception("Vector store or LLM is not initialized.")
+async def retrieve_context(query: str, query_embedding, components, filters: SearchFilters | None = None) -> ContextResult:
+    """
+    Fetch the top documents for a query and pack them into the token budget.
+    ``filters`` are pushed down to both searches. Whether anything is in scope
+    is decided by the vector store's filtered query: the keyword index is a
+    best-effort sidecar that can lag behind it.
+    Dense and BM25 keyword search run in parallel and are merged with
+    reciprocal-rank fusion, so exact tokens (addresses, zips, MLS ids) are not lost;
+    an optional cross-encoder re-ranks an over-fetched candidate set, then
+    overlapping chunks are stitched together and near-duplicates dropped.
+    """
+    print("Querying vector store and keyword index for top documents...")
+    dense, keyword = await asyncio.gather(
+        _offload(vector_search, components.vector_store, query_embedding, RETRIEVAL_CANDIDATES, filters),
+        _offload(keyword_search, components.keyword_index, query, RETRIEVAL_CANDIDATES, filters),
+    )
+    if filters is not None and not dense:
+        print("No chunks in filter scope.")
+        return ContextResult(texts=[], metadatas=[], tokens_in=0, tokens_used=0)
+    if components.reranker is not None:
+        # Over-fetch, then let the cross-encoder pick (at most) the top-k
+        candidates = fuse([dense, keyword], RERANK_CANDIDATES)
+        reranked = await _offload(components.reranker.rerank, query, candidates, RETRIEVAL_TOP_K)
+        print(f"Re-ranked {reranked.candidates} candidates to {len(reranked.hits)} in {reranked.latency_ms:.1f} ms")
+        hits = reranked.hits
+    else:
+        hits = fuse([dense, keyword], RETRIEVAL_TOP_K)
+    context = await _offload(context_builder.build, hits)
+    print(f"Context built: {context.summary()}")
+    return context
 
-    print("Querying Chroma for top documents...")
-    qres = vector_store.query(query_texts=[query], n_results=5)
-    # Results are lists per query; we used a single query so index 0
-    docs_texts = qres.get("documents", [[]])[0] if qres else []
-    metadatas = qres.get("metadatas", [[]])[0] if qres else []
 
+def build_prompt(query: str, docs_texts: List[str]) -> str:
     context = "\n\n".join(docs_texts)
-    prompt = (
+    return (
         "You are a helpful real estate analysis assistant. "
         "Answer the user's question only using the context. "
         "If the answer is not in the context, say you don't know.\n\n"
@@ -134,93 +151,304 @@ def generate_answer(query: str):
         "Answer:"
     )
 
-    print("Generating answer with LLM...")
-    llm_result = llm.invoke(prompt)
-    # Extract content depending on return type
-    if isinstance(llm_result, str):
-        answer_text = llm_result
-    else:
-        # LangChain ChatGroq returns a BaseMessage with .content
-        answer_text = getattr(llm_result, "content", str(llm_result))
-
-    # Sanitize answer text
-    for token in ("SOURCES:", "Sources:", "Source:"):
-        idx = answer_text.find(token)
-        if idx != -1:
-            answer_text = answer_text[:idx].strip()
-            break
-    answer_text = re.sub(r"^\s*(FINAL\s+ANSWER:|Final\s+Answer:|Answer:)\s*", "", answer_text, flags=re.IGNORECASE)
-
-    # Build sources from metadatas
+
+def build_sources(metadatas: List[dict]) -> str:
     sources_set = []
     for md in metadatas:
         src = md.get("source") or md.get("url") or "Unknown"
         if src not in sources_set:
             sources_set.append(src)
-    sources_output = ", ".join(sources_set) if sources_set else "No sources found"
+    return ", ".join(sources_set) if sources_set else "No sources found"
+
+
+def _message_text(message) -> str:
+    # Extract content depending on return type
+    if isinstance(message, str):
+        return message
+    # LangChain ChatGroq returns a BaseMessage with .content
+    return getattr(message, "content", str(message))
+
+
+# Returned without calling the LLM when filters leave nothing to search
+NO_DOCUMENTS_IN_SCOPE = ("No documents match the given filters.", "No sources found")
+
+
+async def answer_from_listings(query: str, filters: SearchFilters | None = None, owner_id: int | None = None):
+    """Numeric / filter questions go to the listings table; None means use the LLM."""
+    try:
+        return await _offload(answer_listing_query, query, ListingStore(owner_id=owner_id), filters)
+    except Exception as e:
+        print(f"Listing query failed, falling back to the LLM: {e}")
+        return None
+
+
+async def generate_answer(query: str, filters: SearchFilters | None = None, owner_id: int | None = None):
+    routed = await answer_from_listings(query, filters, owner_id)
+    if routed is not None:
+        print("Answer served from the listings table.")
+        return routed
+
+    scope = _cache_scope(filters, owner_id)
+    cached = answer_cache.get_exact(query, scope)
+    if cached is not None:
+        print("Answer served from exact-match cache.")
+        return cached
+
+    components = await _offload(lambda: components_for(registry.get(), owner_id))
+    generation = answer_cache.generation
+
+    query_embedding = await _offload(components.embeddings.embed_query, query)
+    cached = answer_cache.get_semantic(query_embedding, scope, query)
+    if cached is not None:
+        print("Answer served from semantic cache.")
+        return cached
+
+    context = await retrieve_context(query, query_embedding, components, filters)
+    if filters is not None and not context.texts:
+        return NO_DOCUMENTS_IN_SCOPE
+    prompt = build_prompt(query, context.texts)
+
+    print("Generating answer with LLM...")
+    answer_text = sanitize_answer(_message_text(await components.llm.ainvoke(prompt)))
+    sources_output = build_sources(context.metadatas)
 
     print("Answer generated.")
+    answer_cache.put(query, answer_text, sources_output, query_embedding, generation, scope)
     return answer_text, sources_output
-  
 
-def initialize_process():
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _before(deadline: float, awaitable):
+    """Await ``awaitable``, raising TimeoutError once the loop clock passes ``deadline``."""
+    return await asyncio.wait_for(awaitable, max(deadline - asyncio.get_running_loop().time(), 0))
+
+
+async def stream_answer(
+    query: str, filters: SearchFilters | None = None, owner_id: int | None = None
+) -> AsyncIterator[str]:
     """
-    Initialize the components (LLM, embeddings, and vector store).
-    This should be called once before using other endpoints.
+    Same flow as generate_answer, but yields Server-Sent Events: ``token`` events
+    as the LLM produces text, then one ``sources`` event and a closing ``done``.
+    Starlette cancels this generator when the client disconnects, which also
+    closes the upstream LLM stream. QUERY_TIMEOUT_SECONDS bounds the whole
+    request, retrieval included; each step gets whatever budget is left
+    (rather than one timeout scope around the yields, which would cancel the
+    consumer instead of this generator).
     """
+    deadline = asyncio.get_running_loop().time() + QUERY_TIMEOUT_SECONDS
+    try:
+        routed = await _before(deadline, answer_from_listings(query, filters, owner_id))
+        if routed is not None:
+            answer_text, sources_output = routed
+            yield _sse("token", {"text": answer_text})
+            yield _sse("sources", {"sources": sources_output})
+            yield _sse("done", {"cached": False, "structured": True})
+            return
+
+        scope = _cache_scope(filters, owner_id)
+        cached = answer_cache.get_exact(query, scope)
+        if cached is None:
+            components = await _before(deadline, _offload(lambda: components_for(registry.get(), owner_id)))
+            generation = answer_cache.generation
+            query_embedding = await _before(deadline, _offload(components.embeddings.embed_query, query))
+            cached = answer_cache.get_semantic(query_embedding, scope, query)
+        if cached is not None:
+            answer_text, sources_output = cached
+            yield _sse("token", {"text": answer_text})
+            yield _sse("sources", {"sources": sources_output})
+            yield _sse("done", {"cached": True})
+            return
+
+        context = await _before(deadline, retrieve_context(query, query_embedding, components, filters))
+        if filters is not None and not context.texts:
+            answer_text, sources_output = NO_DOCUMENTS_IN_SCOPE
+            yield _sse("token", {"text": answer_text})
+            yield _sse("sources", {"sources": sources_output})
+            yield _sse("done", {"cached": False})
+            return
+        prompt = build_prompt(query, context.texts)
+
+        print("Streaming answer from LLM...")
+        sanitizer = StreamingSanitizer()
+        parts = []
+        stream = components.llm.astream(prompt)
+        try:
+            while True:
+                try:
+                    chunk = await _before(deadline, anext(stream))
+                except StopAsyncIteration:
+                    break
+                text = sanitizer.feed(_message_text(chunk))
+                if text:
+                    parts.append(text)
+                    yield _sse("token", {"text": text})
+                if sanitizer.stopped:
+                    # Everything after the "SOURCES:" marker is discarded anyway
+                    break
+        finally:
+            await stream.aclose()
+        tail = sanitizer.finish()
+        if tail:
+            parts.append(tail)
+            yield _sse("token", {"text": tail})
+
+        sources_output = build_sources(context.metadatas)
+        yield _sse("sources", {"sources": sources_output})
+        yield _sse("done", {"cached": False})
+        answer_cache.put(query, "".join(parts), sources_output, query_embedding, generation, scope)
+    except TimeoutError:
+        yield _sse("error", {"detail": "Timed out generating answer"})
+    except Exception as e:
+        print(f"Error streaming answer: {e}")
+        yield _sse("error", {"detail": f"Error generating answer: {str(e)}"})
+
+
+def readiness():
+    """Report whether the heavy components are loaded and ready to serve."""
+    status = registry.status()
+    return {
+        "ready": status.ready,
+        "initializing": status.initializing,
+        "components": status.loaded,
+        "error": status.error,
+    }
+
+
+def cache_stats():
+    """Hit/miss counters for the answer cache and the embedding cache."""
+    components = registry.components
+    return {
+        "answers": answer_cache.stats(),
+        "embeddings": components.embeddings.stats() if components.embeddings is not None else None,
+        "collections": components.tenants.stats() if components.tenants is not None else None,
+    }
+
+
+def rerank_stats():
+    """Latency and score metrics for the re-rank stage; ``enabled`` is false without RERANK_MODEL."""
+    reranker = registry.components.reranker
+    if reranker is None:
+        return {"enabled": False}
+    return {"enabled": True, **reranker.stats()}
+
+
+def fetch_stats():
+    """Request, retry and byte counters for the shared ingest HTTP client."""
+    return http_fetcher.stats()
+
+
+def db_stats():
+    """Connection pool occupancy of the sync (workers) and async (request path) engines."""
+    return pool_stats()
+
+
+def recrawl_stats():
+    """Cadence, budget and per-cycle outcome counters of the background re-crawl."""
+    return recrawl_scheduler.stats()
+
+
+def reload_components():
+    """Rebuild only the components whose configuration changed since they were loaded."""
     try:
-        initialize_component()
-        return {"message": "Components initialized successfully."}
+        return registry.reload()
     except Exception as e:
-        print(f"Error initializing components: {e}")
-        raise HTTPException(status_code=500, detail=f"Error initializing components: {str(e)}")
+        print(f"Error reloading components: {e}")
+        raise HTTPException(status_code=500, detail=f"Error reloading components: {str(e)}")
       
-def process_urls(payload: UrlList):
+def process_urls(payload: UrlList, owner_id: int | None = None):
     """
-    Accept a list of URLs, process each URL to extract text,
-    split into chunks, generate embeddings, and store in Vector Store.
-    Processes URLs individually to continue on errors and report per-URL results.
+    Accept a list of URLs and queue them for ingestion (extract text, split,
+    embed, store in Vector Store) on the background job workers.
+    Signed-in users ingest into their own collection (``owner_id``).
+    Returns immediately with a job id; poll get_ingest_job() for per-URL progress.
     """
     # Convert URLs to strings
     url_strings = [str(url) for url in payload.urls]
+    job_id = job_queue.submit(url_strings, owner_id)
+    return {
+        "message": f"Queued {len(url_strings)} URLs for processing.",
+        "job_id": job_id,
+        "status": "queued",
+    }
 
-    total_chunks = 0
-    successes = []  # list of {url, chunks}
-    failures = []   # list of {url, error}
-
-    for url in url_strings:
-        try:
-            chunks = process_single_url(url)
-            total_chunks += chunks
-            successes.append({"url": url, "chunks": chunks})
-        except Exception as e:
-            print(f"Error processing URL {url}: {e}")
-            failures.append({"url": url, "error": str(e)})
-
-    message = (
-        f"Processed {len(url_strings)} URLs. "
-        f"Success: {len(successes)}, Failed: {len(failures)}."
-    )
 
-    # Maintain backward-compatible key 'chunks_added' while adding details
+async def process_upload(request: Request, filename: str, owner_id: int | None = None):
+    """
+    Accept a PDF as the raw request body and queue it for ingestion on the
+    background job workers, like process_urls(). The body is streamed to disk
+    (never held in memory) and pages are extracted in a separate process pool.
+    """
+    if not pdf_support_available():
+        raise HTTPException(status_code=503, detail="PDF ingestion is not available: the pypdf package is not installed.")
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=415, detail="Only PDF documents are supported.")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {UPLOAD_MAX_BYTES} byte limit.")
+    try:
+        stored = await save_upload(request.stream(), filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedDocument as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    print(f"Stored upload {filename} ({stored.size} bytes) as {stored.source}")
+    job_id = job_queue.submit([stored.source], owner_id)
     return {
-        "message": message,
-        "chunks_added": total_chunks,
-        "total_chunks": total_chunks,
-        "details": {
-            "success": successes,
-            "failed": failures,
-        },
+        "message": f"Queued {filename} for processing.",
+        "job_id": job_id,
+        "status": "queued",
+        "source": stored.source,
     }
-      
-def get_answer(payload: Query):
+
+
+def get_ingest_job(job_id: str, owner_id: int | None = None):
+    job = get_job(job_id)
+    # Another user's job is reported as missing rather than forbidden
+    if job is None or job["owner_id"] not in (None, owner_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def cancel_ingest_job(job_id: str, owner_id: int | None = None):
+    get_ingest_job(job_id, owner_id)
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+async def _cancel_on_disconnect(request: Request, task: asyncio.Task):
+    while not task.done():
+        if await request.is_disconnected():
+            print("Client disconnected; cancelling answer generation.")
+            task.cancel()
+            return
+        await asyncio.sleep(0.5)
+
+
+async def get_answer(payload: Query, request: Request | None = None, owner_id: int | None = None):
     """
     Accept a question string, retrieve relevant documents from Vector Store,
     and generate an answer using the LLM along with source references.
+    Bounded by QUERY_TIMEOUT_SECONDS and cancelled if the client goes away.
     """
+    task = asyncio.ensure_future(asyncio.wait_for(generate_answer(payload.question, payload.search_filters(), owner_id), QUERY_TIMEOUT_SECONDS))
+    watcher = asyncio.ensure_future(_cancel_on_disconnect(request, task)) if request is not None else None
     try:
-        answer, sources = generate_answer(payload.question)
+        answer, sources = await task
         return AnswerResponse(answer=answer, sources=sources)
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise
+        # Client is gone; 499 mirrors nginx's "client closed request"
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out generating answer")
     except Exception as e:
         print(f"Error generating answer: {e}")
-        raise HTTPException(status_code=500, detail=f"Error generating answer: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating answer: {str(e)}")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
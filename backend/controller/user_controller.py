@@ -1,20 +1,82 @@
-from fastapi import Depends
+from typing import AsyncIterator
+from fastapi import Depends, HTTPException, Request
 from models import user_model
-from database.postgresdb import get_db
-from sqlalchemy.orm import Session
-from controller.auth_controller import create_access_token, get_password_hash, verify_password
+from database.postgresdb import get_async_db, AsyncSessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from controller.auth_controller import create_access_token
 from middlewares.exceptions import UserNotFoundError, InvalidPasswordError, PasswordMismatchError
+from services.auth_cache import user_cache
+from services.password_hasher import password_hasher
+from services import user_import
+from env import USER_IMPORT_MAX_BYTES
 import logging
 
 
 
-def get_users(db: Session = Depends(get_db)):
-    db_users = db.query(user_model.userSchema).all()
-    return db_users
+EXPORT_BATCH_SIZE = 1000
 
+# Listing/export projection: the password hash is never loaded
+_SUMMARY_COLUMNS = (
+    user_model.userSchema.id,
+    user_model.userSchema.username,
+    user_model.userSchema.lastname,
+    user_model.userSchema.email,
+    user_model.userSchema.created_at,
+)
 
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(user_model.userSchema).filter(user_model.userSchema.id == user_id).first()
+
+def _prefix_pattern(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _users_page_query(after: int | None, limit: int, email_prefix: str | None, username_prefix: str | None):
+    """Keyset page on ``id``: each page is an index range scan, however deep it is."""
+    users = user_model.userSchema
+    query = select(*_SUMMARY_COLUMNS).order_by(users.id).limit(limit)
+    if after is not None:
+        query = query.where(users.id > after)
+    if email_prefix:
+        # Emails are stored lowercased
+        query = query.where(users.email.like(_prefix_pattern(email_prefix.strip().lower()), escape="\\"))
+    if username_prefix:
+        query = query.where(users.username.ilike(_prefix_pattern(username_prefix.strip()), escape="\\"))
+    return query
+
+
+async def get_users(
+    db: AsyncSession = Depends(get_async_db),
+    after: int | None = None,
+    limit: int = 50,
+    email_prefix: str | None = None,
+    username_prefix: str | None = None,
+) -> user_model.UserPage:
+    rows = (await db.execute(_users_page_query(after, limit + 1, email_prefix, username_prefix))).all()
+    users = [user_model.UserSummary.model_validate(row._mapping) for row in rows[:limit]]
+    next_after = users[-1].id if len(rows) > limit else None
+    return user_model.UserPage(users=users, next_after=next_after)
+
+
+async def export_users(email_prefix: str | None = None, username_prefix: str | None = None) -> AsyncIterator[str]:
+    """All matching users as NDJSON lines, read in keyset batches so memory stays flat.
+
+    Opens its own session: the response streams after the request's
+    dependencies have been torn down.
+    """
+    after = None
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(_users_page_query(after, EXPORT_BATCH_SIZE, email_prefix, username_prefix))).all()
+            for row in rows:
+                yield user_model.UserSummary.model_validate(row._mapping).model_dump_json() + "\n"
+            if len(rows) < EXPORT_BATCH_SIZE:
+                return
+            after = rows[-1].id
+
+
+async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.get(user_model.userSchema, user_id)
     if not db_user:
       logging.warning(f"User with ID {user_id} not found.")
       raise UserNotFoundError(user_id)
@@ -22,13 +84,13 @@ def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
     return db_user
 
 
-def create_user(user: user_model.UserBase, db: Session = Depends(get_db)):
-    hashed_password = get_password_hash(user.password)
+async def create_user(user: user_model.UserBase, db: AsyncSession = Depends(get_async_db)):
+    hashed_password = await password_hasher.hash(user.password)
     user.password = hashed_password
     db_user = user_model.userSchema(**user.model_dump())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return { 
             "success": True,
             "data": {
@@ -37,12 +99,12 @@ def create_user(user: user_model.UserBase, db: Session = Depends(get_db)):
         }
 
 
-# def update_user(user_id: int, user: UserBase, db: Session = Depends(get_db)):
+# def update_user(user_id: int, user: UserBase, db: AsyncSession = Depends(get_async_db)):
 
-def change_password(user_id: int, password_update: user_model.PasswordUpdate, db: Session = Depends(get_db)):
+async def change_password(user_id: int, password_update: user_model.PasswordUpdate, db: AsyncSession = Depends(get_async_db)):
   try:
-    user = get_user_by_id(user_id, db)
-    if not verify_password(password_update.current_password, user.password):
+    user = await get_user_by_id(user_id, db)
+    if not await password_hasher.verify(password_update.current_password, user.password):
         logging.warning(f"Invalid current password for user ID {user_id}.")
         raise InvalidPasswordError()
 
@@ -52,18 +114,61 @@ def change_password(user_id: int, password_update: user_model.PasswordUpdate, db
         raise PasswordMismatchError()
     
     # Update password
-    user.password = get_password_hash(password_update.new_password)
-    db.commit()
+    user.password = await password_hasher.hash(password_update.new_password)
+    await db.commit()
+    # Tokens carry the old password's fingerprint: drop the cached user so they stop working now
+    user_cache.invalidate(user_id)
     logging.info(f"Password updated successfully for user ID {user_id}.")
   except Exception as e:
     logging.error(f"Error changing password for user ID {user_id}: {e}")
     raise e
     
 
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(user_model.userSchema).filter(user_model.userSchema.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.get(user_model.userSchema, user_id)
     if db_user:
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
+        user_cache.invalidate(user_id)
         return {"message": "User deleted successfully"}
-    return {"message": "User not found"}
\ No newline at end of file
+    return {"message": "User not found"}
+
+
+async def import_users(request: Request, current_user, fmt: str | None = None) -> dict:
+    """Queue a bulk account import from a CSV or JSON request body.
+
+    Operators only (the route requires OperatorUser): the per-row results say
+    which emails are already registered. Hashing runs in the background; returns a
+    job id for get_import_job(), whose result holds one entry per row.
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "json" if "json" in content_type else "csv" if "csv" in content_type else None
+    if fmt not in ("csv", "json"):
+        raise HTTPException(status_code=415, detail="Send text/csv or application/json, or pass ?format=csv|json")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > USER_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Import exceeds the {USER_IMPORT_MAX_BYTES} byte limit")
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > USER_IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Import exceeds the {USER_IMPORT_MAX_BYTES} byte limit")
+    try:
+        rows, rejected = user_import.parse_users(bytes(body), fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job_id = user_import.import_jobs.submit(rows, rejected, submitted_by=current_user.id)
+    logging.info(f"Queued user import {job_id}: {len(rows)} rows, {len(rejected)} invalid.")
+    return {
+        "message": f"Queued {len(rows) + len(rejected)} rows for import.",
+        "job_id": job_id,
+        "status": "queued",
+    }
+
+
+def get_import_job(job_id: str) -> dict:
+    job = user_import.import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+    return job
@@ -2,19 +2,102 @@ from typing import Annotated
 from fastapi.params import Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from env import DB_URL
+from env import (
+    DB_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+)
 
 if not DB_URL:
     raise ValueError("DATABASE_URL is not set in environment variables.")
-engine = create_engine(DB_URL, future=True)
+
+# Async drivers for the request path: asyncpg for Postgres, aiosqlite for local runs and tests
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url: str) -> URL:
+    """The async-driver form of a sync database URL (postgresql:// -> postgresql+asyncpg://)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    # asyncpg takes ssl as a connect argument, not a libpq query parameter
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").difference_update_query(["sslmode"])
+
+
+def _engine_options(url: str, async_driver: bool = False) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite pools per file/thread; sizing and timeouts do not apply
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    connect_args = {}
+    if async_driver:
+        if DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+        if parsed.query.get("sslmode"):
+            connect_args["ssl"] = parsed.query["sslmode"]
+    elif DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+# Sync engine: background workers (ingest jobs, re-crawl) and table creation
+engine = create_engine(DB_URL, future=True, **_engine_options(DB_URL))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Async engine: the user/auth request path, so DB round-trips do not block the event loop
+async_engine = create_async_engine(async_url(DB_URL), **_engine_options(DB_URL, async_driver=True))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-        
-dbSession = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def pool_stats() -> dict:
+    """Connection pool occupancy of the sync and async engines."""
+    return {
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.sync_engine.pool),
+    }
+
+
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+
+syncDbSession = Annotated[Session, Depends(get_db)]
+dbSession = Annotated[AsyncSession, Depends(get_async_db)]
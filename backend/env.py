@@ -7,15 +7,99 @@ env_file = f".env.{env_name}.local"
 load_dotenv(dotenv_path=env_file)
 PORT = os.environ.get("PORT")
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
+GROQ_MODEL = os.environ.get("GROQ_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct")
+GROQ_MAX_TOKENS = int(os.environ.get("GROQ_MAX_TOKENS", 2048))
 DB_URL = os.environ.get("DATABASE_URL")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # seconds; below the server/proxy idle timeout
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))  # Postgres only; 0 disables
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
 JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM")
 JWT_EXPIRATION_TIME = int(os.environ.get("JWT_EXPIRATION_TIME", 1))
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))  # raising it rehashes passwords on next login
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))  # queued beyond this -> 503
+# Hashing processes; half the cores so an import leaves room for the request path
+USER_IMPORT_WORKERS = int(os.environ.get("USER_IMPORT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# Operator accounts (comma-separated): user listing/export/import, component reload, internal stats.
+# Registration is open, so these routes are closed to everyone else; empty leaves only the CLI
+USER_IMPORT_ADMIN_EMAILS = frozenset(
+    e.strip().lower() for e in os.environ.get("USER_IMPORT_ADMIN_EMAILS", "").split(",") if e.strip()
+)
+USER_IMPORT_BATCH_SIZE = int(os.environ.get("USER_IMPORT_BATCH_SIZE", 500))  # rows per INSERT
+USER_IMPORT_MAX_ROWS = int(os.environ.get("USER_IMPORT_MAX_ROWS", 10000))
+USER_IMPORT_MAX_BYTES = int(os.environ.get("USER_IMPORT_MAX_BYTES", 10 * 1024 * 1024))
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_TOKEN_CACHE_MAX_ENTRIES", 10000))  # decoded tokens
+AUTH_TOKEN_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_TOKEN_CACHE_TTL_SECONDS", 300))  # never past the token's exp
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_USER_CACHE_MAX_ENTRIES", 10000))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_USER_CACHE_TTL_SECONDS", 60))  # bounds staleness across processes
 DEV_PORT = os.environ.get("DEV_PORT")
 
 CHROMA_API_KEY = os.environ.get("CHROMA_API_KEY")
 CHROMA_TENANT = os.environ.get("CHROMA_TENANT")
 CHROMA_DATABASE = os.environ.get("CHROMA_DATABASE")
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "cloud")  # cloud / local / memory
+CHROMA_PERSIST_PATH = os.environ.get("CHROMA_PERSIST_PATH", "chroma_db")
+CHROMA_COLLECTION = os.environ.get("CHROMA_COLLECTION", "real_estate_documents")
+TENANT_COLLECTIONS = os.environ.get("TENANT_COLLECTIONS", "true").lower() in ("1", "true", "yes")  # per-user collections
+TENANT_MAX_OPEN_COLLECTIONS = int(os.environ.get("TENANT_MAX_OPEN_COLLECTIONS", 64))
+TENANT_MAX_CHUNKS = int(os.environ.get("TENANT_MAX_CHUNKS", 100000))  # per user; 0 disables the quota
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "intfloat/multilingual-e5-large")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_DEVICE = os.environ.get("EMBEDDING_DEVICE")  # cuda / mps / cpu; auto-detected when unset
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+
+KEYWORD_INDEX_PATH = os.environ.get("KEYWORD_INDEX_PATH", "keyword_index.sqlite3")  # empty disables hybrid retrieval
+RETRIEVAL_TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", 5))
+RETRIEVAL_CANDIDATES = int(os.environ.get("RETRIEVAL_CANDIDATES", 20))
+RERANK_MODEL = os.environ.get("RERANK_MODEL", "")  # e.g. cross-encoder/ms-marco-MiniLM-L-6-v2; empty disables re-ranking
+RERANK_CANDIDATES = int(os.environ.get("RERANK_CANDIDATES", 20))
+RERANK_BATCH_SIZE = int(os.environ.get("RERANK_BATCH_SIZE", 16))
+RERANK_DEVICE = os.environ.get("RERANK_DEVICE")  # auto-detected when unset
+RERANK_MIN_SCORE = float(os.environ.get("RERANK_MIN_SCORE", 0.05))
+RERANK_RELATIVE_CUTOFF = float(os.environ.get("RERANK_RELATIVE_CUTOFF", 0.2))
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 3000))
+# Hugging Face tokenizer of the deployed LLM (e.g. the Llama 4 repo for GROQ_MODEL); empty estimates counts
+CONTEXT_TOKENIZER = os.environ.get("CONTEXT_TOKENIZER", "")
+CONTEXT_CHARS_PER_TOKEN = int(os.environ.get("CONTEXT_CHARS_PER_TOKEN", 4))  # estimate used without a tokenizer
+CONTEXT_DEDUPE_THRESHOLD = float(os.environ.get("CONTEXT_DEDUPE_THRESHOLD", 0.85))
+
+QUERY_EXECUTOR_WORKERS = int(os.environ.get("QUERY_EXECUTOR_WORKERS", 8))
+QUERY_TIMEOUT_SECONDS = float(os.environ.get("QUERY_TIMEOUT_SECONDS", 60))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", 1024))
+QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", 600))
+QUERY_CACHE_SEMANTIC_THRESHOLD = float(os.environ.get("QUERY_CACHE_SEMANTIC_THRESHOLD", 0.95))  # > 1 disables
+
+INGEST_FETCH_WORKERS = int(os.environ.get("INGEST_FETCH_WORKERS", 32))
+INGEST_PER_HOST_LIMIT = int(os.environ.get("INGEST_PER_HOST_LIMIT", 4))
+INGEST_SPLIT_WORKERS = int(os.environ.get("INGEST_SPLIT_WORKERS", 4))
+INGEST_UPSERT_BATCH_SIZE = int(os.environ.get("INGEST_UPSERT_BATCH_SIZE", 250))
+INGEST_MAX_QUEUED_PARTS = int(os.environ.get("INGEST_MAX_QUEUED_PARTS", 8))  # split output waiting for upsert, in batches
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", 256))  # counted with CONTEXT_TOKENIZER
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", 32))
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 100 * 1024 * 1024))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 2))  # extraction processes
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", 16))
+INGEST_JOB_WORKERS = int(os.environ.get("INGEST_JOB_WORKERS", 2))
+INGEST_JOB_POLL_INTERVAL = float(os.environ.get("INGEST_JOB_POLL_INTERVAL", 2.0))
+INGEST_JOB_LEASE_SECONDS = float(os.environ.get("INGEST_JOB_LEASE_SECONDS", 60))  # running jobs without a heartbeat this long are requeued
+RECRAWL_INTERVAL_SECONDS = float(os.environ.get("RECRAWL_INTERVAL_SECONDS", 600))  # between cycles; 0 disables re-crawling
+RECRAWL_MAX_AGE_SECONDS = float(os.environ.get("RECRAWL_MAX_AGE_SECONDS", 24 * 3600))  # re-fetch pages older than this
+RECRAWL_MAX_URLS_PER_CYCLE = int(os.environ.get("RECRAWL_MAX_URLS_PER_CYCLE", 200))
+RECRAWL_MAX_CHUNKS_PER_CYCLE = int(os.environ.get("RECRAWL_MAX_CHUNKS_PER_CYCLE", 5000))  # re-embedded chunks
+RECRAWL_MAX_FAILURES = int(os.environ.get("RECRAWL_MAX_FAILURES", 3))  # failed fetches in a row before a page is dropped
+FETCH_TIMEOUT_SECONDS = float(os.environ.get("FETCH_TIMEOUT_SECONDS", 20))
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", 5 * 1024 * 1024))
+FETCH_RETRIES = int(os.environ.get("FETCH_RETRIES", 3))
+FETCH_BACKOFF_SECONDS = float(os.environ.get("FETCH_BACKOFF_SECONDS", 0.5))
+FETCH_PER_HOST_LIMIT = int(os.environ.get("FETCH_PER_HOST_LIMIT", 4))  # across all running jobs
+FETCH_POLITENESS_DELAY = float(os.environ.get("FETCH_POLITENESS_DELAY", 0.2))  # seconds between requests to one host
+FETCH_MAX_CONNECTIONS = int(os.environ.get("FETCH_MAX_CONNECTIONS", 100))
+FETCH_USER_AGENT = os.environ.get("FETCH_USER_AGENT", "RealEstateAssistantBot/1.0")
 
 
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
@@ -1,3 +1,5 @@
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 try:
     from fastapi_fortify import SecurityMiddleware
@@ -7,10 +9,17 @@ except Exception:
     _SECURITY_AVAILABLE = False
 from fastapi.middleware.cors import CORSMiddleware
 from router import auth_routes, user_routes, process_routes
-from database.postgresdb import engine
-from models import user_model
+from database.postgresdb import engine, dispose_async_engine
+from models import user_model, ingest_model, listing_model
 from middlewares.error_middleware import setup_exception_handlers
 from env import DEV_PORT
+from services.component_registry import registry
+from services.ingest_jobs import job_queue
+from services.context_builder import context_builder
+from services.http_fetcher import http_fetcher
+from services.document_loader import shutdown_pdf_pool
+from services.recrawl_scheduler import recrawl_scheduler
+from services.user_import import import_jobs, shutdown_hash_pool
 
 print("Server startup: Initializing components...")
 print("Creating database tables...📑")
@@ -22,7 +31,35 @@ origin = [
     
 ]
 
-app = FastAPI()
+def _warm_up_components():
+    try:
+        registry.initialize()
+        # Load the prompt tokenizer now rather than on the first query
+        context_builder.counter.count("")
+        print("Components initialized.✅")
+    except Exception as e:
+        # Surfaced through /process/ready; requests retry the lazy init.
+        print(f"Component warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the LLM, embedding model and vector store once per process, off the
+    # event loop so the server can answer readiness probes while models load.
+    threading.Thread(target=_warm_up_components, name="component-warmup", daemon=True).start()
+    job_queue.start()
+    recrawl_scheduler.start()
+    yield
+    recrawl_scheduler.stop()
+    job_queue.stop()
+    import_jobs.stop()
+    http_fetcher.close()
+    shutdown_pdf_pool()
+    shutdown_hash_pool()
+    await dispose_async_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 if _SECURITY_AVAILABLE and SecurityMiddleware:
     app.add_middleware(SecurityMiddleware)
 app.add_middleware(
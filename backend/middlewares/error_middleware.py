@@ -6,6 +6,8 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, DataError
 
+from services.password_hasher import PasswordHasherBusy
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +50,14 @@ async def handle_request_validation_error(request: Request, exc: RequestValidati
 	return _json_error(400, ", ".join(messages), detail=exc.errors())
 
 
+async def handle_password_hasher_busy(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+	"""Login/register burst beyond what the hashing pool will queue: ask the client to retry."""
+	logger.warning("Password hashing queue full on %s %s: %s", request.method, request.url.path, exc)
+	response = _json_error(503, "Server busy, please retry")
+	response.headers["Retry-After"] = "1"
+	return response
+
+
 async def handle_unhandled_exception(request: Request, exc: Exception) -> JSONResponse:
 	"""Last-resort handler to standardize 500 responses."""
 	logger.exception("Unhandled error on %s %s", request.method, request.url.path)
@@ -61,11 +71,13 @@ def setup_exception_handlers(app: FastAPI) -> None:
 	- Duplicate key -> 400 with friendly message
 	- Validation error -> 400 aggregated messages
 	- Invalid/cast-like DB errors -> 400
+	- Password hashing queue full -> 503
 	- Fallback -> 500
 	"""
 	app.add_exception_handler(IntegrityError, handle_integrity_error)
 	app.add_exception_handler(DataError, handle_data_error)
 	app.add_exception_handler(RequestValidationError, handle_request_validation_error)
+	app.add_exception_handler(PasswordHasherBusy, handle_password_hasher_busy)
 	# Model-level validators may raise ValueError -> treat as 400
 	app.add_exception_handler(ValueError, lambda req, exc: _json_error(400, str(exc)))
 	# Keep a generic catch-all to ensure JSON shape consistency
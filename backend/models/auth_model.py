@@ -8,4 +8,15 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: int | None = None
+    email: str | None = None
+    # Fingerprint of the password hash the token was issued against
+    password_version: str | None = None
+
+
+class Principal(BaseModel):
+    """The signed-in user: identity from verified token claims, profile from the user cache."""
+    id: int
+    email: str
+    username: str | None = None
+    lastname: str | None = None
     
\ No newline at end of file
@@ -0,0 +1,137 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func, text
+from models.user_model import Base
+
+
+class ingestJobSchema(Base):
+    __tablename__ = 'ingest_jobs'
+
+    id = Column(
+        String(36), primary_key=True
+    )
+    status = Column(
+        String, nullable=False, default="queued", index=True
+    )
+    # User whose collection the job writes to; NULL for the shared collection
+    owner_id = Column(
+        Integer, index=True
+    )
+    total_urls = Column(
+        Integer, nullable=False, default=0
+    )
+    chunks_added = Column(
+        Integer, nullable=False, default=0
+    )
+    cancel_requested = Column(
+        Boolean, nullable=False, default=False
+    )
+    error = Column(
+        Text
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    started_at = Column(
+        DateTime(timezone=True)
+    )
+    # Refreshed by the worker running the job; a stale one means that worker died
+    heartbeat_at = Column(
+        DateTime(timezone=True)
+    )
+    finished_at = Column(
+        DateTime(timezone=True)
+    )
+
+
+class ingestJobUrlSchema(Base):
+    __tablename__ = 'ingest_job_urls'
+    __table_args__ = (
+        Index("ix_ingest_job_urls_job_id_position", "job_id", "position"),
+    )
+
+    id = Column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    job_id = Column(
+        String(36), ForeignKey("ingest_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    position = Column(
+        Integer, nullable=False
+    )
+    url = Column(
+        Text, nullable=False
+    )
+    status = Column(
+        String, nullable=False, default="pending"
+    )
+    chunks = Column(
+        Integer, nullable=False, default=0
+    )
+    # Boilerplate the extractor stripped: page text bytes, and about how many chunks that was
+    bytes_removed = Column(
+        Integer, nullable=False, default=0
+    )
+    chunks_removed = Column(
+        Integer, nullable=False, default=0
+    )
+    error = Column(
+        Text
+    )
+
+
+class urlManifestSchema(Base):
+    __tablename__ = 'url_manifest'
+    __table_args__ = (
+        UniqueConstraint("owner_id", "url", name="uq_url_manifest_owner_url"),
+        # NULLs are distinct in the constraint above, so the shared collection needs its own
+        Index(
+            "uq_url_manifest_shared_url", "url", unique=True,
+            postgresql_where=text("owner_id IS NULL"), sqlite_where=text("owner_id IS NULL"),
+        ),
+    )
+
+    id = Column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    url = Column(
+        Text, index=True, nullable=False
+    )
+    # Each user's collection is tracked separately; NULL is the shared collection
+    owner_id = Column(
+        Integer, index=True
+    )
+    content_hash = Column(
+        String(64)
+    )
+    etag = Column(
+        Text
+    )
+    last_modified = Column(
+        Text
+    )
+    # JSON list of the chunk ids currently stored in the vector store for this URL
+    chunk_ids = Column(
+        Text, nullable=False, default="[]"
+    )
+    chunk_count = Column(
+        Integer, nullable=False, default=0
+    )
+    last_fetched_at = Column(
+        DateTime(timezone=True), index=True
+    )
+    # Consecutive failed fetches; reset by any successful one
+    fetch_failures = Column(
+        Integer, nullable=False, default=0
+    )
+    # Set when the page went away (404/410 or too many failures) and its chunks were removed
+    gone_at = Column(
+        DateTime(timezone=True)
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, Float, Text, DateTime, Index, UniqueConstraint
+from sqlalchemy.sql import func, text
+from models.user_model import Base
+
+
+class listingSchema(Base):
+    __tablename__ = 'listings'
+    __table_args__ = (
+        UniqueConstraint("owner_id", "url", "address", name="uq_listings_owner_url_address"),
+        # NULLs are distinct in the constraint above, so the shared collection needs its own
+        Index(
+            "uq_listings_shared_url_address", "url", "address", unique=True,
+            postgresql_where=text("owner_id IS NULL"), sqlite_where=text("owner_id IS NULL"),
+        ),
+        # Serves the common "N-bed under $X" filters and cheapest-first ordering
+        Index("ix_listings_beds_price", "beds", "price"),
+    )
+
+    id = Column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    # Page the listing was extracted from; re-ingest replaces all rows for a URL
+    url = Column(
+        Text, nullable=False, index=True
+    )
+    # Owner of the collection the page was ingested into; NULL for the shared one
+    owner_id = Column(
+        Integer, index=True
+    )
+    address = Column(
+        Text, nullable=False
+    )
+    price = Column(
+        Integer, index=True
+    )
+    beds = Column(
+        Float
+    )
+    baths = Column(
+        Float
+    )
+    sqft = Column(
+        Integer, index=True
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
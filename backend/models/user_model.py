@@ -1,6 +1,7 @@
 import re
-from pydantic import BaseModel, EmailStr
-from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr
+from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import validates
@@ -47,6 +48,42 @@ class userSchema(Base):
         if not EMAIL_REGEX.match(email):
             raise ValueError("Invalid email format")
         return email
+
+
+class userImportJobSchema(Base):
+    __tablename__ = 'user_import_jobs'
+
+    id = Column(
+        String(36), primary_key=True
+    )
+    status = Column(
+        String, nullable=False, default="queued", index=True
+    )
+    # Operator who submitted the import
+    submitted_by = Column(
+        Integer, index=True
+    )
+    total_rows = Column(
+        Integer, nullable=False, default=0
+    )
+    error = Column(
+        Text
+    )
+    # JSON summary with one result per input row
+    result = Column(
+        Text
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    started_at = Column(
+        DateTime(timezone=True)
+    )
+    finished_at = Column(
+        DateTime(timezone=True)
+    )
   
 class PasswordUpdate(BaseModel):
     current_password: str
@@ -57,4 +94,24 @@ class UserBase(BaseModel):
     username: str
     lastname: str
     email: EmailStr
-    password: str
\ No newline at end of file
+    password: str
+
+class UserSummary(BaseModel):
+    """A row of the users listing: profile columns only, never the password hash."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str | None = None
+    lastname: str | None = None
+    email: str
+    created_at: datetime | None = None
+
+class UserPage(BaseModel):
+    users: list[UserSummary]
+    # Pass as ``after`` to get the next page; None on the last page
+    next_after: int | None = None
+
+class UserPublic(BaseModel):
+    username: str | None = None
+    lastname: str | None = None
+    email: EmailStr
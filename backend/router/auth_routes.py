@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
 from starlette import status
 from controller.user_controller import create_user
-from controller.auth_controller import login_for_access_token
+from controller.auth_controller import OperatorUser, login_for_access_token
 from auth.google_auth_controller import login_with_google, google_login_url, google_callback
 from auth.facebook_auth_controller import (
     login_with_facebook,
@@ -19,6 +19,7 @@ from auth.github_auth_controller import (
 from models.auth_model import Token
 from models.user_model import UserBase
 from database.postgresdb import dbSession
+from services.password_hasher import password_hasher
 
 
 router = APIRouter(
@@ -28,11 +29,11 @@ router = APIRouter(
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register_user(user: UserBase, db: dbSession):
-    return create_user(user, db)
+    return await create_user(user, db)
 
 @router.post("/login", response_model=Token)
 async def login(response: Response, form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: dbSession, remember: bool = False):
-    token = login_for_access_token(form_data, db, remember)
+    token = await login_for_access_token(form_data, db, remember)
     
     # set token in a cookie
     response.set_cookie(
@@ -46,6 +47,11 @@ async def login(response: Response, form_data: Annotated[OAuth2PasswordRequestFo
     
     return token
 
+@router.get("/hasher/stats", status_code=status.HTTP_200_OK)
+async def get_hasher_stats(current_user: OperatorUser):
+    # Queue depth and wait times of the bcrypt worker pool
+    return password_hasher.stats()
+
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(response: Response):
     # Clear the access token cookie
@@ -67,7 +73,7 @@ async def get_google_login_url():
 @router.get("/google-callback")
 async def handle_google_callback(request: Request, db: dbSession):
     user_info = await google_callback(request)
-    token = login_with_google(user_info, db)
+    token = await login_with_google(user_info, db)
     
     # Redirect to home and set token in cookie
     front_url = "http://localhost:5173"
@@ -92,7 +98,7 @@ async def get_facebook_login_url():
 @router.get("/facebook-callback")
 async def handle_facebook_callback(request: Request, db: dbSession):
     user_info = await facebook_callback(request)
-    token = login_with_facebook(user_info, db)
+    token = await login_with_facebook(user_info, db)
 
     front_url = "http://localhost:5173"
     response = RedirectResponse(url=front_url, status_code=status.HTTP_302_FOUND)
@@ -116,7 +122,7 @@ async def get_github_login_url():
 @router.get("/github-callback")
 async def handle_github_callback(request: Request, db: dbSession):
     user_info = await github_callback(request)
-    token = login_with_github(user_info, db)
+    token = await login_with_github(user_info, db)
 
     front_url = "http://localhost:5173"
     response = RedirectResponse(url=front_url, status_code=status.HTTP_302_FOUND)
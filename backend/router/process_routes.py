@@ -1,33 +1,116 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import StreamingResponse
 from controller.process_controller import (
-    initialize_process,
+    readiness,
+    cache_stats,
+    rerank_stats,
+    fetch_stats,
+    db_stats,
+    recrawl_stats,
+    reload_components,
     process_urls,
+    process_upload,
+    get_ingest_job,
+    cancel_ingest_job,
     get_answer,
+    stream_answer,
     AnswerResponse,
     UrlList,
     Query,
 )
+from controller.auth_controller import OperatorUser, OptionalCurrentUser
 from rate_limiting import limiter
 
 # --- API Router ---
 
+def _owner(current_user) -> int | None:
+    # Signed-in users get their own collection; anonymous requests use the shared one
+    return current_user.id if current_user is not None else None
+
+
 process_router = APIRouter(
     prefix="/process",
     tags=["process"]
 )
 
 
-@process_router.post("/process-urls", status_code=201)
+@process_router.post("/process-urls", status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit("5/minute")
-async def process_url_list(payload: UrlList, request: Request):
-    initialize_process()
-    return process_urls(payload)
+async def process_url_list(payload: UrlList, request: Request, current_user: OptionalCurrentUser):
+    return process_urls(payload, _owner(current_user))
+
+
+@process_router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+async def upload_document(request: Request, filename: str, current_user: OptionalCurrentUser):
+    # Raw body (Content-Type: application/pdf) so it can be streamed straight to disk
+    return await process_upload(request, filename, _owner(current_user))
+
+
+@process_router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, current_user: OptionalCurrentUser):
+    return get_ingest_job(job_id, _owner(current_user))
+
+
+@process_router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, current_user: OptionalCurrentUser):
+    return cancel_ingest_job(job_id, _owner(current_user))
 
 
 @process_router.post("/query", response_model=AnswerResponse)
-async def query_answer(payload: Query):
-    # call controller function get_answer; avoid returning a coroutine
-    return get_answer(payload)
+async def query_answer(payload: Query, request: Request, current_user: OptionalCurrentUser):
+    return await get_answer(payload, request, _owner(current_user))
+
+
+@process_router.post("/query/stream")
+async def query_answer_stream(payload: Query, current_user: OptionalCurrentUser):
+    return StreamingResponse(
+        stream_answer(payload.question, payload.search_filters(), _owner(current_user)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@process_router.get("/ready")
+async def ready(response: Response):
+    result = readiness()
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
+
+# Internal pool sizes, queue depths and crawl state: operators only
+
+@process_router.get("/cache/stats")
+async def get_cache_stats(current_user: OperatorUser):
+    return cache_stats()
+
+
+@process_router.get("/rerank/stats")
+async def get_rerank_stats(current_user: OperatorUser):
+    return rerank_stats()
+
+
+@process_router.get("/fetch/stats")
+async def get_fetch_stats(current_user: OperatorUser):
+    return fetch_stats()
+
+
+@process_router.get("/db/stats")
+async def get_db_stats(current_user: OperatorUser):
+    return db_stats()
+
+
+@process_router.get("/recrawl/stats")
+async def get_recrawl_stats(current_user: OperatorUser):
+    return recrawl_stats()
+
+
+@process_router.post("/reload")
+@limiter.limit("2/minute")
+async def reload(request: Request, current_user: OperatorUser):
+    # Rebuilding the LLM / embedding model is expensive; operators only
+    return reload_components()
 
 
 
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import StreamingResponse
 from database.postgresdb import dbSession
 from controller import user_controller, auth_controller
 from models import user_model, auth_model
+from rate_limiting import limiter
 
 
 user_router = APIRouter(
@@ -9,23 +11,60 @@ user_router = APIRouter(
     tags=["Users"]
 )
 
-@user_router.get("/")
-async def get_users(db: dbSession):
-    db_users = user_controller.get_users(db)
-    return {"users": db_users}
+@user_router.get("/", response_model=user_model.UserPage)
+async def get_users(
+    db: dbSession,
+    current_user: auth_controller.OperatorUser,
+    after: int | None = Query(default=None, description="Last id of the previous page"),
+    limit: int = Query(default=50, ge=1, le=200),
+    email_prefix: str | None = Query(default=None, max_length=254),
+    username_prefix: str | None = Query(default=None, max_length=100),
+):
+    return await user_controller.get_users(db, after, limit, email_prefix, username_prefix)
 
 
-@user_router.get("/me", response_model=user_model.UserBase)
-def get_current_user(current_user: auth_controller.CurrentUser, db: dbSession):
-    # current_user is the ORM user object from dependency
+@user_router.get("/export")
+async def export_users(
+    current_user: auth_controller.OperatorUser,
+    email_prefix: str | None = Query(default=None, max_length=254),
+    username_prefix: str | None = Query(default=None, max_length=100),
+):
+    # Admin bulk dump as NDJSON, one user per line; operators only
+    return StreamingResponse(
+        user_controller.export_users(email_prefix, username_prefix),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
+
+
+@user_router.post("/import", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+async def import_users(
+    request: Request,
+    current_user: auth_controller.OperatorUser,
+    format: str | None = Query(default=None, pattern="^(csv|json)$", description="Defaults to the Content-Type"),
+):
+    # Bulk provisioning by operators: CSV/JSON body with email, password, username, lastname per user.
+    # Runs as a background job; poll /users/import/{job_id} for the per-row results
+    return await user_controller.import_users(request, current_user, format)
+
+
+@user_router.get("/import/{job_id}")
+def get_import_job(job_id: str, current_user: auth_controller.OperatorUser):
+    return user_controller.get_import_job(job_id)
+
+
+@user_router.get("/me", response_model=user_model.UserPublic)
+def get_current_user(current_user: auth_controller.CurrentUser):
+    # current_user is the principal from the verified token, no database round-trip
     return current_user
 
 
 @user_router.put("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(current_user: auth_controller.CurrentUser, password_update: user_model.PasswordUpdate, db: dbSession):
-    return user_controller.change_password(current_user.id, password_update, db)
+    return await user_controller.change_password(current_user.id, password_update, db)
 
 @user_router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(current_user: auth_controller.CurrentUser, db: dbSession):
-    return user_controller.delete_user(current_user.id, db)
+    return await user_controller.delete_user(current_user.id, db)
     
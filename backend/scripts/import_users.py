@@ -0,0 +1,56 @@
+"""Provision user accounts in bulk from a CSV or JSON file.
+
+Same path as ``POST /users/import``, run directly against DATABASE_URL, so
+large onboarding files are not bound by the endpoint's size limits.
+
+    python scripts/import_users.py agents.csv
+    python scripts/import_users.py agents.json --rounds 12 --report results.ndjson
+
+CSV files need a header row with at least ``email`` and ``password``;
+``username`` and ``lastname`` are optional. JSON files hold a list of
+objects with the same keys.
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from env import BCRYPT_ROUNDS, USER_IMPORT_BATCH_SIZE
+from services.user_import import import_users, parse_users, shutdown_hash_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=pathlib.Path)
+    parser.add_argument("--format", choices=["csv", "json"], help="defaults to the file extension")
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost")
+    parser.add_argument("--batch-size", type=int, default=USER_IMPORT_BATCH_SIZE)
+    parser.add_argument("--max-rows", type=int, default=1_000_000)
+    parser.add_argument("--report", type=pathlib.Path, help="write one JSON result per row here")
+    args = parser.parse_args()
+
+    fmt = args.format or args.path.suffix.lstrip(".").lower()
+    rows, rejected = parse_users(args.path.read_bytes(), fmt, max_rows=args.max_rows)
+    try:
+        summary = asyncio.run(import_users(rows, rejected, rounds=args.rounds, batch_size=args.batch_size))
+    finally:
+        shutdown_hash_pool()
+
+    results = summary.pop("results")
+    if args.report:
+        with args.report.open("w") as out:
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+    print(json.dumps(summary, indent=2))
+    for result in results:
+        if result["status"] == "invalid":
+            print(f"row {result['row']}: {result['error']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
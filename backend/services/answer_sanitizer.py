@@ -0,0 +1,71 @@
+import re
+
+SOURCE_MARKERS = ("SOURCES:", "Sources:", "Source:")
+ANSWER_PREFIX = re.compile(r"^\s*(FINAL\s+ANSWER:|Final\s+Answer:|Answer:)\s*", flags=re.IGNORECASE)
+# Longest text that could still turn into an answer prefix ("final   answer:" allows extra spaces)
+_PREFIX_LOOKAHEAD = 24
+_MARKER_LOOKAHEAD = max(len(m) for m in SOURCE_MARKERS) - 1
+
+
+def sanitize_answer(answer_text: str) -> str:
+    """Drop a trailing "SOURCES:" section and a leading "Answer:" label from LLM output."""
+    for token in SOURCE_MARKERS:
+        idx = answer_text.find(token)
+        if idx != -1:
+            answer_text = answer_text[:idx].strip()
+            break
+    return ANSWER_PREFIX.sub("", answer_text)
+
+
+class StreamingSanitizer:
+    """Incremental version of ``sanitize_answer`` for token streams.
+
+    ``feed`` returns the text that is safe to emit now. Only a short tail is held
+    back - enough to recognise a source marker split across tokens - so output
+    keeps pace with the model instead of waiting for the full answer.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._prefix_done = False
+        self.stopped = False
+
+    def _strip_prefix(self, final: bool) -> bool:
+        if self._prefix_done:
+            return True
+        stripped = self._buffer.lstrip()
+        match = ANSWER_PREFIX.match(self._buffer)
+        if match:
+            # Wait for the whitespace after the label so it is consumed too
+            if match.end() == len(self._buffer) and not final:
+                return False
+            self._buffer = self._buffer[match.end():]
+        elif len(stripped) < _PREFIX_LOOKAHEAD and not final and re.match(r"^[a-z\s:]*$", stripped, re.IGNORECASE):
+            # Could still become "Answer:" / "Final Answer:"
+            return False
+        self._prefix_done = True
+        return True
+
+    def feed(self, token: str) -> str:
+        if self.stopped or not token:
+            return ""
+        self._buffer += token
+        if not self._strip_prefix(final=False):
+            return ""
+        positions = [i for i in (self._buffer.find(m) for m in SOURCE_MARKERS) if i != -1]
+        if positions:
+            out = self._buffer[:min(positions)].rstrip()
+            self._buffer = ""
+            self.stopped = True
+            return out
+        cut = max(0, len(self._buffer) - _MARKER_LOOKAHEAD)
+        out, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return out
+
+    def finish(self) -> str:
+        if self.stopped:
+            return ""
+        self._strip_prefix(final=True)
+        out, self._buffer = self._buffer, ""
+        self.stopped = True
+        return out.rstrip()
@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from env import (
+    AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    AUTH_TOKEN_CACHE_TTL_SECONDS,
+    AUTH_USER_CACHE_MAX_ENTRIES,
+    AUTH_USER_CACHE_TTL_SECONDS,
+    JWT_SECRET_KEY,
+)
+
+
+class TtlLruCache:
+    """Thread-safe LRU map whose entries also expire after ``ttl_seconds`` (or earlier, per entry)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float | None = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+def token_key(token: str) -> str:
+    # Raw tokens are credentials; only their hash is kept in memory as a key
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def password_fingerprint(password_hash: str) -> str:
+    """Keyed digest of a user's password hash, carried in their tokens so a password change revokes them."""
+    key = (JWT_SECRET_KEY or "").encode("utf-8")
+    return hmac.new(key, password_hash.encode("utf-8"), hashlib.sha256).hexdigest()[:22]
+
+
+# token hash -> verified TokenData, until the token expires
+token_cache = TtlLruCache(AUTH_TOKEN_CACHE_MAX_ENTRIES, AUTH_TOKEN_CACHE_TTL_SECONDS)
+# user id -> (Principal, password fingerprint); invalidated on password change and delete
+user_cache = TtlLruCache(AUTH_USER_CACHE_MAX_ENTRIES, AUTH_USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,171 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, List
+
+from env import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+from services.context_builder import TokenCounter, context_builder
+
+_LINE = re.compile(r"[^\n]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+•·▪◦]|\d{1,3}[.)])\s+")
+# Rows as written by the HTML extractor ("Price: $450,000; 3 Beds", "a | b") and "Key: value" specs
+_TABLE_ROW = re.compile(r"; |\s\|\s|^[^:.!?]{1,40}:\s+\S")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+_MAX_HEADING_WORDS = 12
+
+
+@dataclass
+class TextChunk:
+    text: str
+    start: int
+    tokens: int
+    section: str | None = None
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+    kind: str  # heading / list / table / text
+
+
+class StructuredChunker:
+    """Token-sized chunks that follow the structure of the page text.
+
+    The text is walked line by line (lines longer than ``max_tokens`` are cut at
+    sentence boundaries, then at token boundaries) and packed greedily into
+    chunks of at most ``max_tokens``:
+
+    - a heading (a short line after a blank line, or a markdown ``#`` line)
+      closes the current chunk once it holds a quarter of the budget, so
+      sections are not glued onto the tail of the previous one; the heading is
+      kept as the chunk's ``section``;
+    - consecutive list items and table rows are kept in one chunk when they fit
+      in one;
+    - each new chunk repeats up to ``overlap_tokens`` of trailing lines from the
+      previous one within the same section.
+
+    Chunks are yielded as soon as they are complete, with ``start`` the offset
+    of their text in the input, so callers can embed and store them while the
+    rest of the page is still being chunked.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CHUNK_MAX_TOKENS,
+        overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+        counter: TokenCounter | None = None,
+    ):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.counter = counter or context_builder.counter
+
+    def _kind(self, text: str, line: str, start: int) -> str:
+        if _MARKDOWN_HEADING.match(line):
+            return "heading"
+        after_blank = start == 0 or text.startswith("\n\n", start - 2)
+        if after_blank and len(line.split()) <= _MAX_HEADING_WORDS and not line.rstrip().endswith((".", ",", ";", ":")):
+            if not _LIST_ITEM.match(line) and not _TABLE_ROW.search(line):
+                return "heading"
+        if _LIST_ITEM.match(line):
+            return "list"
+        if _TABLE_ROW.search(line):
+            return "table"
+        return "text"
+
+    def _pieces(self, text: str, start: int, end: int) -> Iterator[tuple]:
+        """(start, end, tokens) of one line, or of its sentences when the line exceeds ``max_tokens``."""
+        tokens = self.counter.count(text[start:end])
+        if tokens <= self.max_tokens:
+            yield start, end, tokens
+            return
+        bounds = [start + m.end() for m in _SENTENCE_END.finditer(text, start, end)] + [end]
+        sentence_start = start
+        for sentence_end in bounds:
+            sentence_tokens = self.counter.count(text[sentence_start:sentence_end])
+            if sentence_tokens > self.max_tokens:
+                yield from self._token_windows(text, sentence_start, sentence_end)
+            elif sentence_tokens:
+                yield sentence_start, sentence_end, sentence_tokens
+            sentence_start = sentence_end
+
+    def _token_windows(self, text: str, start: int, end: int) -> Iterator[tuple]:
+        spans = self.counter.spans(text[start:end])
+        for i in range(0, len(spans), self.max_tokens):
+            window = spans[i:i + self.max_tokens]
+            window_end = spans[i + self.max_tokens][0] if i + self.max_tokens < len(spans) else end - start
+            yield start + window[0][0], start + window_end, len(window)
+
+    def _units(self, text: str) -> Iterator[_Unit]:
+        for match in _LINE.finditer(text):
+            line = match.group(0)
+            if not line.strip():
+                continue
+            kind = self._kind(text, line, match.start())
+            for start, end, tokens in self._pieces(text, match.start(), match.end()):
+                yield _Unit(start, end, tokens, kind)
+
+    def iter_chunks(self, text: str) -> Iterator[TextChunk]:
+        current: List[_Unit] = []
+        current_tokens = 0
+        section = chunk_section = None
+        group_kind = None
+
+        def emit():
+            return TextChunk(
+                text=text[current[0].start:current[-1].end],
+                start=current[0].start,
+                tokens=current_tokens,
+                section=chunk_section,
+            )
+
+        def overlap_tail() -> List[_Unit]:
+            tail, tokens = [], 0
+            for unit in reversed(current):
+                if unit.kind == "heading" or tokens + unit.tokens > self.overlap_tokens:
+                    break
+                tail.insert(0, unit)
+                tokens += unit.tokens
+            return tail
+
+        units = self._units(text)
+        for unit in units:
+            if unit.kind == "heading":
+                if current and current_tokens >= self.max_tokens // 4:
+                    yield emit()
+                    current, current_tokens = [], 0
+                section = text[unit.start:unit.end].lstrip("# ").strip()
+            starts_group = unit.kind in ("list", "table") and unit.kind != group_kind
+            group_kind = unit.kind
+            fits = current_tokens + unit.tokens <= self.max_tokens
+            if fits and starts_group and current:
+                # Move a list/table that will not fit here to a fresh chunk as a whole
+                group_tokens = self._group_tokens(text, unit)
+                fits = current_tokens + group_tokens <= self.max_tokens or group_tokens > self.max_tokens
+            if not fits and current:
+                yield emit()
+                current = overlap_tail()
+                current_tokens = sum(u.tokens for u in current)
+                if current_tokens + unit.tokens > self.max_tokens:
+                    current, current_tokens = [], 0
+            if not current:
+                chunk_section = section
+            current.append(unit)
+            current_tokens += unit.tokens
+        if current:
+            yield emit()
+
+    def _group_tokens(self, text: str, first: _Unit) -> int:
+        """Tokens of the run of list items / table rows starting at ``first``."""
+        tokens = 0
+        for match in _LINE.finditer(text, first.start):
+            line = match.group(0)
+            if not line.strip():
+                continue
+            if self._kind(text, line, match.start()) != first.kind:
+                break
+            tokens += self.counter.count(line)
+            if tokens > self.max_tokens:
+                break
+        return tokens
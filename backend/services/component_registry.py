@@ -0,0 +1,229 @@
+import os
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+from dotenv import load_dotenv
+
+import env
+
+logger = logging.getLogger(__name__)
+
+
+def _read_config() -> Dict[str, Dict[str, Any]]:
+    """Snapshot the settings each component is built from, grouped per component.
+
+    Values are read from ``os.environ`` (populated by ``env.py`` / dotenv) so a
+    reload can pick up edits without restarting the process.
+    """
+    config = {
+        "llm": {
+            "api_key": os.environ.get("GROQ_API_KEY", env.GROQ_API_KEY),
+            "model": os.environ.get("GROQ_MODEL", env.GROQ_MODEL),
+            "max_tokens": int(os.environ.get("GROQ_MAX_TOKENS", env.GROQ_MAX_TOKENS)),
+        },
+        "embeddings": {
+            "model_name": os.environ.get("EMBEDDING_MODEL", env.EMBEDDING_MODEL),
+            "batch_size": int(os.environ.get("EMBEDDING_BATCH_SIZE", env.EMBEDDING_BATCH_SIZE)),
+            "device": os.environ.get("EMBEDDING_DEVICE", env.EMBEDDING_DEVICE),
+            "cache_path": os.environ.get("EMBEDDING_CACHE_PATH", env.EMBEDDING_CACHE_PATH),
+        },
+        "vector_store": {
+            "backend": os.environ.get("VECTOR_STORE_BACKEND", env.VECTOR_STORE_BACKEND),
+            "persist_path": os.environ.get("CHROMA_PERSIST_PATH", env.CHROMA_PERSIST_PATH),
+            "api_key": os.environ.get("CHROMA_API_KEY", env.CHROMA_API_KEY),
+            "tenant": os.environ.get("CHROMA_TENANT", env.CHROMA_TENANT),
+            "database": os.environ.get("CHROMA_DATABASE", env.CHROMA_DATABASE),
+            "collection": os.environ.get("CHROMA_COLLECTION", env.CHROMA_COLLECTION),
+        },
+        "keyword_index": {
+            "path": os.environ.get("KEYWORD_INDEX_PATH", env.KEYWORD_INDEX_PATH),
+        },
+        "tenants": {
+            "enabled": os.environ.get("TENANT_COLLECTIONS", str(env.TENANT_COLLECTIONS)).lower() in ("1", "true", "yes"),
+            "max_open": int(os.environ.get("TENANT_MAX_OPEN_COLLECTIONS", env.TENANT_MAX_OPEN_COLLECTIONS)),
+            "max_chunks": int(os.environ.get("TENANT_MAX_CHUNKS", env.TENANT_MAX_CHUNKS)),
+        },
+        "reranker": {
+            "model_name": os.environ.get("RERANK_MODEL", env.RERANK_MODEL),
+            "batch_size": int(os.environ.get("RERANK_BATCH_SIZE", env.RERANK_BATCH_SIZE)),
+            "device": os.environ.get("RERANK_DEVICE", env.RERANK_DEVICE),
+            "min_score": float(os.environ.get("RERANK_MIN_SCORE", env.RERANK_MIN_SCORE)),
+            "relative_cutoff": float(os.environ.get("RERANK_RELATIVE_CUTOFF", env.RERANK_RELATIVE_CUTOFF)),
+        },
+    }
+    # Per-user stores derive from the shared ones, so rebuild them when those change
+    config["tenants"]["shared"] = {"vector_store": config["vector_store"], "keyword_index": config["keyword_index"]}
+    return config
+
+
+# --- Component builders ---
+
+def _build_llm(cfg: dict, built: dict):
+    from langchain_groq import ChatGroq
+
+    if not cfg["api_key"]:
+        raise Exception("GROQ_API_KEY not set in environment variables.")
+    return ChatGroq(api_key=cfg["api_key"], model=cfg["model"], max_tokens=cfg["max_tokens"])
+
+
+def _build_embeddings(cfg: dict, built: dict):
+    from services.embedding_service import EmbeddingService
+
+    service = EmbeddingService(**cfg)
+    service.model  # load weights now rather than on the first request
+    return service
+
+
+def _build_vector_store(cfg: dict, built: dict):
+    from services.vector_store import create_vector_store
+
+    return create_vector_store(cfg)
+
+
+def _build_keyword_index(cfg: dict, built: dict):
+    from services.keyword_index import KeywordIndex
+
+    return KeywordIndex(cfg["path"]) if cfg["path"] else None
+
+
+def _build_tenants(cfg: dict, built: dict):
+    from services.tenant_stores import TenantStores
+
+    return TenantStores(
+        built["vector_store"],
+        built.get("keyword_index"),
+        keyword_index_path=cfg["shared"]["keyword_index"]["path"],
+        enabled=cfg["enabled"],
+        max_open=cfg["max_open"],
+        max_chunks=cfg["max_chunks"],
+    )
+
+
+def _build_reranker(cfg: dict, built: dict):
+    if not cfg["model_name"]:
+        return None
+    from services.reranker import Reranker
+
+    reranker = Reranker(**cfg)
+    reranker.model  # load weights now rather than on the first request
+    return reranker
+
+
+_BUILDERS: Dict[str, Callable[[dict, dict], Any]] = {
+    "llm": _build_llm,
+    "embeddings": _build_embeddings,
+    "vector_store": _build_vector_store,
+    "keyword_index": _build_keyword_index,
+    "tenants": _build_tenants,
+    "reranker": _build_reranker,
+}
+
+
+@dataclass
+class Components:
+    llm: Any = None
+    embeddings: Any = None
+    vector_store: Any = None
+    keyword_index: Any = None
+    tenants: Any = None
+    reranker: Any = None
+
+
+@dataclass
+class RegistryStatus:
+    ready: bool = False
+    initializing: bool = False
+    error: str | None = None
+    loaded: Dict[str, bool] = field(default_factory=dict)
+
+
+class ComponentRegistry:
+    """Process-wide owner of the LLM, embedding service, vector store, keyword index and re-ranker.
+
+    Components are built once, lazily, under a lock so concurrent first requests
+    do not race to load the embedding model twice. ``reload()`` rebuilds only the
+    components whose configuration actually changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built: Dict[str, Any] = {}
+        self._config: Dict[str, Dict[str, Any]] = {}
+        self._status = RegistryStatus()
+
+    def _build(self, names, config, built: Dict[str, Any]):
+        for name in _BUILDERS:
+            if name not in names:
+                continue
+            logger.info("Initializing component: %s", name)
+            built[name] = _BUILDERS[name](config[name], built)
+            logger.info("Initialized component: %s", name)
+
+    def initialize(self) -> Components:
+        """Build every component that is not loaded yet. Safe to call repeatedly."""
+        if self._status.ready:
+            return self.components
+        with self._lock:
+            if self._status.ready:
+                return self.components
+            self._status.initializing = True
+            try:
+                config = _read_config()
+                missing = [n for n in _BUILDERS if n not in self._built]
+                self._build(missing, config, self._built)
+                self._config.update({n: config[n] for n in missing})
+                self._status.ready = True
+                self._status.error = None
+            except Exception as e:
+                self._status.error = str(e)
+                raise
+            finally:
+                self._status.initializing = False
+            return self.components
+
+    def get(self) -> Components:
+        """Return the live components, initializing them on first use."""
+        return self.initialize()
+
+    def reload(self) -> Dict[str, list]:
+        """Re-read the env file and rebuild only the components whose config changed.
+
+        Replacements are built aside and swapped in together, so a failed
+        rebuild leaves the previous components serving.
+        """
+        load_dotenv(dotenv_path=env.env_file, override=True)
+        with self._lock:
+            config = _read_config()
+            changed = {n for n in _BUILDERS if self._config.get(n) != config[n]}
+            if changed:
+                staged = dict(self._built)
+                try:
+                    self._build(changed, config, staged)
+                except Exception as e:
+                    self._status.error = str(e)
+                    raise
+                self._built = staged
+                self._config.update({n: config[n] for n in changed})
+                self._status.ready = len(self._built) == len(_BUILDERS)
+                self._status.error = None
+            return {
+                "reloaded": [n for n in _BUILDERS if n in changed],
+                "unchanged": [n for n in _BUILDERS if n not in changed],
+            }
+
+    @property
+    def components(self) -> Components:
+        return Components(**{name: self._built.get(name) for name in _BUILDERS})
+
+    def status(self) -> RegistryStatus:
+        return RegistryStatus(
+            ready=self._status.ready,
+            initializing=self._status.initializing,
+            error=self._status.error,
+            loaded={name: name in self._built for name in _BUILDERS},
+        )
+
+
+registry = ComponentRegistry()
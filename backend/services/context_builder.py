@@ -0,0 +1,272 @@
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from env import CONTEXT_CHARS_PER_TOKEN, CONTEXT_DEDUPE_THRESHOLD, CONTEXT_TOKEN_BUDGET, CONTEXT_TOKENIZER
+
+logger = logging.getLogger(__name__)
+
+# Fallback when no tokenizer is available: words and punctuation marks, with
+# long words counted as one token per CONTEXT_CHARS_PER_TOKEN characters. BPE
+# splits long words, numbers and addresses, so this errs on the high side.
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SEPARATOR = "\n\n"
+# Don't bother keeping a truncated block shorter than this
+_MIN_TRUNCATED_TOKENS = 48
+
+
+class TokenCounter:
+    """Counts tokens with a Hugging Face ``tokenizers`` model, loaded lazily.
+
+    Falls back to a character-ratio estimate when the name is empty or the
+    tokenizer cannot be loaded (offline, missing package), so the query path
+    never fails on tokenizer problems.
+    """
+
+    def __init__(self, name: str | None, chars_per_token: int = CONTEXT_CHARS_PER_TOKEN):
+        self.name = name
+        self.chars_per_token = max(chars_per_token, 1)
+        self._tokenizer = None
+        self._loaded = not name
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._loaded:
+            return self._tokenizer
+        with self._lock:
+            if not self._loaded:
+                try:
+                    from tokenizers import Tokenizer
+                    self._tokenizer = Tokenizer.from_pretrained(self.name)
+                except Exception as e:
+                    logger.warning("Tokenizer %s unavailable, approximating token counts: %s", self.name, e)
+                self._loaded = True
+        return self._tokenizer
+
+    @property
+    def exact(self) -> bool:
+        return self._load() is not None
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character (start, end) offsets of each token."""
+        tokenizer = self._load()
+        if tokenizer is None:
+            step = self.chars_per_token
+            return [
+                (i, min(i + step, m.end()))
+                for m in _APPROX_TOKEN.finditer(text)
+                for i in range(m.start(), m.end(), step)
+            ]
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        return [span for span in encoding.offsets if span[1] > span[0]]
+
+    def count(self, text: str) -> int:
+        tokenizer = self._load()
+        if tokenizer is None:
+            step = self.chars_per_token
+            return sum((len(token) + step - 1) // step for token in _APPROX_TOKEN.findall(text))
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        spans = self.spans(text)
+        if len(spans) <= max_tokens:
+            return text
+        return text[:spans[max_tokens - 1][1]] if max_tokens > 0 else ""
+
+
+@dataclass
+class ContextBlock:
+    text: str
+    metadata: dict
+    rank: int
+    start: int | None = None
+    end: int | None = None
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ContextResult:
+    texts: List[str]
+    metadatas: List[dict]
+    tokens_in: int
+    tokens_used: int
+    merged: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_used
+
+    def summary(self) -> str:
+        return (
+            f"context {self.tokens_used}/{self.tokens_in} tokens (saved {self.tokens_saved}); "
+            f"merged {self.merged}, duplicates {self.duplicates}, truncated {self.truncated}, dropped {self.dropped}"
+        )
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _overlap_text(left: str, right: str, overlap: int) -> str | None:
+    """Join two spans of the same page that overlap by ``overlap`` characters."""
+    if overlap <= 0:
+        return left + ("\n" if overlap == 0 else _SEPARATOR) + right
+    if overlap >= len(right):
+        return left
+    if left.endswith(right[:overlap]):
+        return left + right[overlap:]
+    # Splitter stripped whitespace at the boundary; find the shared text directly
+    probe = right[:min(overlap, 80)].strip()
+    idx = left.rfind(probe) if probe else -1
+    if idx == -1:
+        return None
+    tail = left[idx:]
+    if right.startswith(tail.lstrip()):
+        return left[:idx] + right.lstrip()
+    return None
+
+
+def merge_adjacent(blocks: Sequence[ContextBlock]) -> Tuple[List[ContextBlock], int]:
+    """Merge chunks from the same page whose character ranges overlap or touch.
+
+    Needs ``start_index`` in the chunk metadata (written at ingest); chunks
+    without it are passed through unchanged. A merged block keeps the best rank
+    of its parts.
+    """
+    passthrough, by_source = [], {}
+    for block in blocks:
+        source = block.metadata.get("source")
+        if block.start is None or source is None:
+            passthrough.append(block)
+        else:
+            # Offsets of PDF chunks are relative to their page
+            by_source.setdefault((source, block.metadata.get("page")), []).append(block)
+
+    merged_blocks, merges = list(passthrough), 0
+    for group in by_source.values():
+        group.sort(key=lambda b: b.start)
+        current = group[0]
+        for block in group[1:]:
+            joined = None
+            if block.start <= current.end:
+                joined = _overlap_text(current.text, block.text, current.end - block.start)
+            if joined is None:
+                merged_blocks.append(current)
+                current = block
+                continue
+            current = ContextBlock(
+                text=joined,
+                metadata=current.metadata if current.rank <= block.rank else block.metadata,
+                rank=min(current.rank, block.rank),
+                start=current.start,
+                end=max(current.end, block.end),
+                chunk_ids=current.chunk_ids + block.chunk_ids,
+            )
+            merges += 1
+        merged_blocks.append(current)
+    merged_blocks.sort(key=lambda b: b.rank)
+    return merged_blocks, merges
+
+
+def drop_near_duplicates(blocks: Sequence[ContextBlock], threshold: float) -> Tuple[List[ContextBlock], int]:
+    """Drop blocks whose word 3-gram Jaccard similarity to a better-ranked block reaches ``threshold``.
+
+    Catches the same listing syndicated across sites and pages that were
+    re-ingested under a different URL.
+    """
+    kept: List[Tuple[ContextBlock, set]] = []
+    dropped = 0
+    for block in sorted(blocks, key=lambda b: b.rank):
+        shingles = _shingles(block.text)
+        duplicate = False
+        for _, other in kept:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= threshold:
+                duplicate = True
+                break
+            # A block fully contained in a kept one adds nothing either
+            if shingles and shingles <= other:
+                duplicate = True
+                break
+        if duplicate:
+            dropped += 1
+        else:
+            kept.append((block, shingles))
+    return [b for b, _ in kept], dropped
+
+
+class ContextBuilder:
+    """Turns ranked retrieval hits into the prompt context.
+
+    Overlapping chunks of the same page are stitched back together, near
+    duplicates are dropped, and blocks are added in relevance order until the
+    token budget is spent; the block that crosses the budget is truncated if a
+    useful amount still fits.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, tokenizer: str | None = CONTEXT_TOKENIZER,
+                 dedupe_threshold: float = CONTEXT_DEDUPE_THRESHOLD):
+        self.token_budget = token_budget
+        self.dedupe_threshold = dedupe_threshold
+        self.counter = TokenCounter(tokenizer)
+
+    def build(self, hits) -> ContextResult:
+        blocks = []
+        for rank, hit in enumerate(hits):
+            md = hit.metadata or {}
+            start = md.get("start_index")
+            blocks.append(ContextBlock(
+                text=hit.text,
+                metadata=md,
+                rank=rank,
+                start=start,
+                end=start + len(hit.text) if start is not None else None,
+                chunk_ids=[hit.id],
+            ))
+        count = self.counter.count
+        tokens_in = count(_SEPARATOR.join(b.text for b in blocks)) if blocks else 0
+
+        blocks, merged = merge_adjacent(blocks)
+        blocks, duplicates = drop_near_duplicates(blocks, self.dedupe_threshold)
+
+        texts, metadatas = [], []
+        used, truncated, dropped = 0, 0, 0
+        separator_cost = count(_SEPARATOR)
+        for block in blocks:
+            cost = count(block.text) + (separator_cost if texts else 0)
+            remaining = self.token_budget - used
+            if cost <= remaining:
+                texts.append(block.text)
+                metadatas.append(block.metadata)
+                used += cost
+                continue
+            room = remaining - (separator_cost if texts else 0)
+            if room >= _MIN_TRUNCATED_TOKENS:
+                texts.append(self.counter.truncate(block.text, room))
+                metadatas.append(block.metadata)
+                used += count(texts[-1]) + (separator_cost if len(texts) > 1 else 0)
+                truncated += 1
+            else:
+                dropped += 1
+        return ContextResult(
+            texts=texts,
+            metadatas=metadatas,
+            tokens_in=tokens_in,
+            tokens_used=used,
+            merged=merged,
+            duplicates=duplicates,
+            truncated=truncated,
+            dropped=dropped,
+        )
+
+
+context_builder = ContextBuilder()
@@ -0,0 +1,149 @@
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+from urllib.parse import quote, unquote, urlparse
+
+from langchain_core.documents import Document
+
+from env import PDF_PAGES_PER_TASK, PDF_WORKERS, UPLOAD_DIR, UPLOAD_MAX_BYTES
+from services import pdf_worker
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_SCHEME = "upload"
+_PDF_MAGIC = b"%PDF-"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedDocument(Exception):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    source: str
+    path: str
+    size: int
+    sha256: str
+
+
+def pdf_support_available() -> bool:
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def is_upload_source(source: str) -> bool:
+    return source.startswith(f"{UPLOAD_SCHEME}://")
+
+
+def upload_source(sha256: str, filename: str) -> str:
+    """upload://<content hash>/<file name>: the "URL" an uploaded document is ingested under."""
+    return f"{UPLOAD_SCHEME}://{sha256}/{quote(os.path.basename(filename) or 'document.pdf')}"
+
+
+def upload_path(source: str, directory: str = UPLOAD_DIR) -> str:
+    return os.path.join(directory, f"{urlparse(source).netloc}.pdf")
+
+
+async def save_upload(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    directory: str = UPLOAD_DIR,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> StoredUpload:
+    """Stream a request body to disk, hashing as it goes.
+
+    The file is written under a temporary name and renamed to its content hash,
+    so re-uploading the same PDF maps to the same source (and is skipped as
+    unchanged by the manifest). Raises UploadTooLarge past ``max_bytes`` and
+    UnsupportedDocument when the body is not a PDF; the partial file is removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    digest, size, head = hashlib.sha256(), 0, b""
+    try:
+        with open(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+                if len(head) < len(_PDF_MAGIC):
+                    head += chunk[:len(_PDF_MAGIC)]
+                    if not _PDF_MAGIC.startswith(head[:len(_PDF_MAGIC)]):
+                        raise UnsupportedDocument("Only PDF documents are supported")
+                digest.update(chunk)
+                out.write(chunk)
+        if not head.startswith(_PDF_MAGIC):
+            raise UnsupportedDocument("Only PDF documents are supported")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    sha256 = digest.hexdigest()
+    source = upload_source(sha256, filename)
+    path = upload_path(source, directory)
+    os.replace(tmp_path, path)
+    return StoredUpload(source=source, path=path, size=size, sha256=sha256)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads (ingest workers, the fetcher loop) is unsafe
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pdf_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_documents(path: str, source: str, pages_per_task: int = PDF_PAGES_PER_TASK) -> Iterator[Document]:
+    """One Document per non-empty page, extracted in the process pool.
+
+    Pages are parsed in ranges of ``pages_per_task`` with at most two ranges
+    per worker in flight, and yielded in page order as soon as their range is
+    done, so chunking starts on page 1 while later pages are still being parsed
+    and a long document is never held in memory as one parse.
+    """
+    pool = _pdf_pool()
+    count = pool.submit(pdf_worker.page_count, path).result()
+    title = unquote(urlparse(source).path.lstrip("/")) or None
+    ranges = deque((first, min(first + pages_per_task, count)) for first in range(0, count, pages_per_task))
+    in_flight = deque()
+    try:
+        while ranges or in_flight:
+            while ranges and len(in_flight) < 2 * PDF_WORKERS:
+                first, last = ranges.popleft()
+                in_flight.append(pool.submit(pdf_worker.extract_pages, path, first, last))
+            for number, text in in_flight.popleft().result():
+                if not text.strip():
+                    continue
+                metadata = {"source": source, "doc_type": "pdf", "page": number}
+                if title:
+                    metadata["title"] = title
+                yield Document(page_content=text, metadata=metadata)
+    finally:
+        for future in in_flight:
+            future.cancel()
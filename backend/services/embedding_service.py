@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from env import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_DEVICE,
+    EMBEDDING_MODEL,
+)
+
+logger = logging.getLogger(__name__)
+
+QUERY_PREFIX = "query: "
+PASSAGE_PREFIX = "passage: "
+
+
+def detect_device() -> str:
+    """Pick the fastest available torch device, falling back to CPU."""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class EmbeddingCache:
+    """Content-hash keyed embedding store in SQLite.
+
+    Keys are sha256(model name + prefixed text), values raw float32 vectors, so
+    identical chunk text is only ever embedded once per model.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in items.items()],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingService:
+    """Batched e5 embedding with query/passage prefixes and a persistent cache.
+
+    Cache misses are sorted by length before batching so each batch pads to a
+    similar sequence length, then results are restored to input order.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        device: str | None = EMBEDDING_DEVICE,
+        cache_path: str | None = EMBEDDING_CACHE_PATH,
+        model=None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device or detect_device()
+        # e5 models are trained with these prefixes; other models get raw text
+        self.use_prefixes = "e5" in model_name.lower()
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info("Loading embedding model %s on %s", self.model_name, self.device)
+                    self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[np.ndarray | None] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            encoded = self.model.encode(
+                [texts[i] for i in idx],
+                batch_size=len(idx),
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+            for i, vector in zip(idx, encoded):
+                vectors[i] = vector
+        return np.vstack(vectors).astype(np.float32)
+
+    def _embed(self, texts: Sequence[str], prefix: str) -> List[List[float]]:
+        if not texts:
+            return []
+        prefixed = [f"{prefix}{t}" if self.use_prefixes else t for t in texts]
+        keys = [self._key(t) for t in prefixed]
+        cached = self.cache.get_many(list(set(keys))) if self.cache else {}
+
+        # Embed each distinct missing text once, even if repeated in this call
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, prefixed):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        self.hits += len(keys) - sum(1 for k in keys if k in missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = dict(zip(missing.keys(), self._encode(list(missing.values()))))
+            if self.cache:
+                self.cache.put_many(computed)
+            cached.update(computed)
+        return [cached[k].tolist() for k in keys]
+
+    def embed_passages(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._embed(texts, PASSAGE_PREFIX)
+
+    def embed_queries(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._embed(texts, QUERY_PREFIX)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "device": self.device,
+            "batch_size": self.batch_size,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
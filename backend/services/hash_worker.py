@@ -0,0 +1,12 @@
+"""Functions run inside the bulk-import hashing process pool.
+
+Kept free of application imports so spawned workers start quickly.
+"""
+from typing import List
+
+
+def hash_passwords(passwords: List[str], rounds: int) -> List[str]:
+    from passlib.hash import bcrypt
+
+    hasher = bcrypt.using(rounds=rounds)
+    return [hasher.hash(password) for password in passwords]
@@ -0,0 +1,261 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Set
+
+from bs4 import BeautifulSoup
+
+from services.listing_extractor import ADDRESS, BATHS, BEDS, PRICE, SQFT
+from services.metadata_filters import normalize_domain
+
+# Never page content
+_DROP_TAGS = (
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "form", "button", "input", "select", "textarea", "nav", "dialog",
+)
+# Page chrome unless its class/id says otherwise ("listing-header")
+_CHROME_TAGS = ("header", "footer", "aside")
+_CHROME_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search"}
+_UNLIKELY = re.compile(
+    r"cookie|consent|gdpr|banner|footer|header|masthead|\bnav|menu|breadcrumb|sidebar|social|share|"
+    r"subscribe|newsletter|signup|sign-in|login|popup|modal|overlay|promo|advert|\bads?\b|sponsor|"
+    r"related|recommend|comment|skip-link|toolbar|pagination",
+    re.IGNORECASE,
+)
+_LIKELY = re.compile(
+    r"article|content|main|listing|property|detail|description|price|result|facts|features|summary",
+    re.IGNORECASE,
+)
+_BLOCK_TAGS = (
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6", "br", "blockquote", "pre", "address", "figure", "figcaption",
+)
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+# Markers threaded through get_text(): link text, section breaks
+_LINK_OPEN, _LINK_CLOSE, _SECTION = "\x01", "\x02", "\x03"
+_SPACE = re.compile(r"\s+")
+
+# A line at least this long, seen on this many pages of one site, is template
+TEMPLATE_MIN_CHARS = 20
+TEMPLATE_MIN_PAGES = 3
+# Lines mostly made of link text are menus, breadcrumbs and tag clouds
+MAX_LINK_DENSITY = 0.5
+
+
+def _has_listing_signal(text: str) -> bool:
+    return bool(PRICE.search(text) or ADDRESS.search(text) or BEDS.search(text) or BATHS.search(text) or SQFT.search(text))
+
+
+class SiteTemplates:
+    """Remembers which text lines recur across pages of the same site.
+
+    Navigation, footers and "contact our office" blurbs repeat verbatim on
+    every page of a site; once a line has been seen on ``min_pages`` distinct
+    URLs of a domain it is treated as template and dropped. Memory is bounded
+    to ``max_sites`` domains (LRU) and ``max_lines`` fingerprints per domain.
+    """
+
+    def __init__(self, min_pages: int = TEMPLATE_MIN_PAGES, max_sites: int = 256, max_lines: int = 5000):
+        self.min_pages = min_pages
+        self.max_sites = max_sites
+        self.max_lines = max_lines
+        self._sites: "OrderedDict[str, Dict[str, Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(line: str) -> str:
+        return hashlib.sha1(line.lower().encode("utf-8")).hexdigest()[:16]
+
+    def observe(self, url: str, lines: List[str]) -> Set[str]:
+        """Record ``lines`` as seen on ``url``; return the fingerprints that are template."""
+        domain, page = normalize_domain(url), self.fingerprint(url)
+        prints = {self.fingerprint(line) for line in lines}
+        template = set()
+        with self._lock:
+            site = self._sites.get(domain)
+            if site is None:
+                site = self._sites[domain] = {}
+                while len(self._sites) > self.max_sites:
+                    self._sites.popitem(last=False)
+            self._sites.move_to_end(domain)
+            for fp in prints:
+                pages = site.get(fp)
+                if pages is None:
+                    if len(site) >= self.max_lines:
+                        continue
+                    pages = site[fp] = set()
+                if len(pages) < self.min_pages:
+                    pages.add(page)
+                if len(pages) >= self.min_pages:
+                    template.add(fp)
+        return template
+
+
+@dataclass
+class Extraction:
+    text: str
+    title: str | None = None
+    raw_text: str = ""
+    hash_text: str = ""
+    tables: int = 0
+    lines_dropped: int = 0
+    template_lines: int = 0
+
+    @property
+    def bytes_removed(self) -> int:
+        return max(0, len(self.raw_text.encode("utf-8")) - len(self.text.encode("utf-8")))
+
+
+def _is_chrome(tag) -> bool:
+    if tag.name in ("html", "body", "main", "article"):
+        return False
+    attrs = tag.attrs or {}
+    role = (attrs.get("role") or "").lower()
+    if role in _CHROME_ROLES or attrs.get("aria-hidden") == "true" or attrs.get("hidden") is not None:
+        return True
+    names = " ".join([*(attrs.get("class") or []), attrs.get("id") or ""])
+    if tag.name in _CHROME_TAGS:
+        return not _LIKELY.search(names)
+    return bool(names.strip()) and bool(_UNLIKELY.search(names)) and not _LIKELY.search(names)
+
+
+def _cell_text(header: str, value: str) -> str:
+    # "Beds | 3" reads as "3 Beds" so the listing parser sees the usual spec form
+    spoken = f"{value} {header}"
+    if re.fullmatch(r"[\d.,]+", value) and (BEDS.search(spoken) or BATHS.search(spoken) or SQFT.search(spoken)):
+        return spoken
+    return f"{header}: {value}" if header else value
+
+
+def table_to_lines(table) -> List[str]:
+    """Spec tables as text: header/value pairs per row, or "key: value" for two-column tables."""
+    rows = []
+    for tr in table.find_all("tr"):
+        cells = tr.find_all(["th", "td"])
+        rows.append(([c.name for c in cells], [_SPACE.sub(" ", c.get_text(" ")).strip() for c in cells]))
+    rows = [(kinds, texts) for kinds, texts in rows if any(texts)]
+    if not rows:
+        return []
+    kinds, first = rows[0]
+    if len(rows) > 1 and all(k == "th" for k in kinds):
+        return [
+            "; ".join(_cell_text(h, v) for h, v in zip(first, texts) if v)
+            for _, texts in rows[1:]
+        ]
+    lines = []
+    for _, texts in rows:
+        if len(texts) == 2 and texts[0] and texts[1]:
+            lines.append(_cell_text(texts[0].rstrip(":"), texts[1]))
+        else:
+            lines.append(" | ".join(t for t in texts if t))
+    return lines
+
+
+def _lines(root) -> List[tuple]:
+    """(text, link density, starts section) per rendered line of ``root``."""
+    for a in root.find_all("a"):
+        a.insert(0, _LINK_OPEN)
+        a.append(_LINK_CLOSE)
+    for tag in root.find_all(_BLOCK_TAGS):
+        tag.insert_before(_SECTION if tag.name in _HEADINGS else "\n")
+        tag.insert_after("\n")
+    lines, in_link, section = [], False, False
+    for raw in root.get_text().split("\n"):
+        if _SECTION in raw:
+            section = True
+        text, link_chars = [], 0
+        for ch in raw:
+            if ch == _LINK_OPEN:
+                in_link = True
+            elif ch == _LINK_CLOSE:
+                in_link = False
+            elif ch != _SECTION:
+                text.append(ch)
+                if in_link and not ch.isspace():
+                    link_chars += 1
+        line = _SPACE.sub(" ", "".join(text)).strip()
+        if not line:
+            continue
+        visible = sum(1 for ch in line if not ch.isspace())
+        lines.append((line, link_chars / visible if visible else 0.0, section))
+        section = False
+    return lines
+
+
+def extract_main_content(html: bytes | str, url: str, encoding: str | None = None, templates: SiteTemplates | None = None) -> Extraction:
+    """Main text of an HTML page, without the boilerplate around it.
+
+    1. drop scripts, styles, forms and page chrome: nav/header/footer/aside,
+       ARIA landmark roles, and elements whose class/id reads like a cookie
+       banner, menu or sidebar (unless it also reads like content);
+    2. keep only ``<main>`` when the page marks one up;
+    3. turn tables into text lines ("Price: $450,000; 3 Beds");
+    4. score each remaining line readability-style on link density: lines that
+       are mostly link text are dropped unless they carry listing data;
+    5. drop lines the site repeats on every page (``templates``).
+
+    ``hash_text`` is the text before step 5, which depends only on the HTML, so
+    change detection is not disturbed as the template memory fills up.
+    """
+    kwargs = {"from_encoding": encoding} if encoding and isinstance(html, bytes) else {}
+    soup = BeautifulSoup(html, "html.parser", **kwargs)
+    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    raw_text = soup.get_text()
+
+    for tag in soup.find_all(_DROP_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        if not tag.decomposed and _is_chrome(tag):
+            tag.decompose()
+    if soup.head is not None:
+        soup.head.decompose()
+    root = soup.find("main") or soup.find(attrs={"role": "main"})
+    if root is None or not root.get_text(strip=True):
+        root = soup.body or soup
+
+    tables = 0
+    for table in reversed(root.find_all("table")):
+        lines = table_to_lines(table)
+        block = soup.new_tag("div")
+        for line in lines:
+            p = soup.new_tag("p")
+            p.string = line
+            block.append(p)
+        table.replace_with(block)
+        tables += 1
+
+    kept, dropped = [], 0
+    for line, link_density, section in _lines(root):
+        if link_density > MAX_LINK_DENSITY and not _has_listing_signal(line):
+            dropped += 1
+            continue
+        kept.append((line, section))
+
+    template = set()
+    if templates is not None:
+        candidates = [line for line, _ in kept if len(line) >= TEMPLATE_MIN_CHARS and not _has_listing_signal(line)]
+        template = templates.observe(url, candidates)
+
+    def render(lines) -> str:
+        # A blank line before headings keeps section boundaries visible to the splitter
+        return "".join(("\n\n" if section and i else "\n" if i else "") + line for i, (line, section) in enumerate(lines))
+
+    body = [
+        (line, section) for line, section in kept
+        if not (template and len(line) >= TEMPLATE_MIN_CHARS and SiteTemplates.fingerprint(line) in template
+                and not _has_listing_signal(line))
+    ]
+    return Extraction(
+        text=render(body),
+        title=title,
+        raw_text=raw_text,
+        hash_text=render(kept),
+        tables=tables,
+        lines_dropped=dropped,
+        template_lines=len(kept) - len(body),
+    )
+
+
+site_templates = SiteTemplates()
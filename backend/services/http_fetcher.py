@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict
+from urllib.parse import urlparse
+
+import httpx
+
+from env import (
+    FETCH_BACKOFF_SECONDS,
+    FETCH_MAX_BYTES,
+    FETCH_MAX_CONNECTIONS,
+    FETCH_PER_HOST_LIMIT,
+    FETCH_POLITENESS_DELAY,
+    FETCH_RETRIES,
+    FETCH_TIMEOUT_SECONDS,
+    FETCH_USER_AGENT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Worth another attempt: throttling and transient upstream failures
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class FetchError(Exception):
+    """A URL could not be fetched (after retries, or for a non-retryable reason)."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class FetchResponse:
+    url: str
+    status_code: int
+    content: bytes = b""
+    content_type: str | None = None
+    encoding: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    http_version: str | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostGate:
+    """Per-host concurrency cap plus a minimum spacing between request starts."""
+
+    def __init__(self, limit: int, delay: float):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.delay = delay
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait_turn(self):
+        if self.delay <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HttpFetcher:
+    """Shared HTTP client for ingestion.
+
+    One pooled ``httpx.AsyncClient`` (HTTP/2 when the ``h2`` package is
+    installed) runs on a dedicated event-loop thread, so keep-alive
+    connections and TLS sessions are reused across pages and ingest jobs.
+    Requests to the same host are capped at ``per_host`` in flight and started
+    at least ``politeness_delay`` seconds apart. Throttling, 5xx responses and
+    transport errors are retried with exponential backoff (honouring
+    ``Retry-After``); bodies larger than ``max_bytes`` are abandoned mid-stream.
+
+    ``fetch`` blocks the calling thread (the ingest pipeline's fetch pool);
+    ``afetch`` can be awaited from any event loop.
+    """
+
+    def __init__(
+        self,
+        timeout: float = FETCH_TIMEOUT_SECONDS,
+        max_bytes: int = FETCH_MAX_BYTES,
+        retries: int = FETCH_RETRIES,
+        backoff: float = FETCH_BACKOFF_SECONDS,
+        per_host: int = FETCH_PER_HOST_LIMIT,
+        politeness_delay: float = FETCH_POLITENESS_DELAY,
+        max_connections: int = FETCH_MAX_CONNECTIONS,
+        user_agent: str = FETCH_USER_AGENT,
+        http2: bool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.backoff = backoff
+        self.per_host = per_host
+        self.politeness_delay = politeness_delay
+        self.max_connections = max_connections
+        self.user_agent = user_agent
+        self.http2 = _http2_available() if http2 is None else http2
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._gates: Dict[str, _HostGate] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "not_modified": 0,
+            "failures": 0,
+            "too_large": 0,
+            "bytes": 0,
+        }
+        self._versions: Dict[str, int] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="http-fetcher", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Only called on the fetcher loop, so no lock is needed
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlparse(url).netloc.lower()
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = _HostGate(self.per_host, self.politeness_delay)
+        return gate
+
+    def fetch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> FetchResponse:
+        """GET ``url``; a 304 comes back as a response with ``not_modified`` set."""
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url, etag, last_modified), self._ensure_loop())
+        return future.result()
+
+    async def afetch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> FetchResponse:
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url, etag, last_modified), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _fetch(self, url: str, etag: str | None, last_modified: str | None) -> FetchResponse:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        gate = self._gate(url)
+        attempt = 0
+        async with gate.semaphore:
+            while True:
+                await gate.wait_turn()
+                self._stats["requests"] += 1
+                delay = None
+                try:
+                    response, retry_after = await self._get(url, headers)
+                except FetchError:
+                    self._stats["failures"] += 1
+                    raise
+                except httpx.TransportError as e:
+                    if attempt >= self.retries:
+                        self._stats["failures"] += 1
+                        raise FetchError(f"{type(e).__name__} fetching {url}: {e}") from e
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                    if attempt >= self.retries:
+                        self._stats["failures"] += 1
+                        raise FetchError(f"HTTP {response.status_code} fetching {url}", response.status_code)
+                    delay = retry_after
+                attempt += 1
+                self._stats["retries"] += 1
+                if delay is None:
+                    delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                await asyncio.sleep(min(delay, MAX_BACKOFF_SECONDS))
+
+        if response.not_modified:
+            self._stats["not_modified"] += 1
+        elif response.status_code >= 400:
+            self._stats["failures"] += 1
+            raise FetchError(f"HTTP {response.status_code} fetching {url}", response.status_code)
+        self._stats["bytes"] += len(response.content)
+        if response.http_version:
+            self._versions[response.http_version] = self._versions.get(response.http_version, 0) + 1
+        return response
+
+    async def _get(self, url: str, headers: dict) -> tuple:
+        """(response, Retry-After seconds or None) for a single attempt."""
+        async with self._get_client().stream("GET", url, headers=headers) as response:
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                self._stats["too_large"] += 1
+                raise FetchError(f"Response body of {declared} bytes exceeds the {self.max_bytes} byte limit: {url}")
+            # Drain error bodies too, so the connection goes back to the pool
+            body = bytearray()
+            async for part in response.aiter_bytes():
+                body.extend(part)
+                if len(body) > self.max_bytes:
+                    self._stats["too_large"] += 1
+                    raise FetchError(f"Response body exceeds the {self.max_bytes} byte limit: {url}")
+            return (
+                FetchResponse(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    content=bytes(body),
+                    content_type=response.headers.get("Content-Type"),
+                    encoding=response.charset_encoding,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    http_version=response.http_version,
+                ),
+                _retry_after(response.headers.get("Retry-After")),
+            )
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "http2": self.http2,
+            "http_versions": dict(self._versions),
+            "open_hosts": len(self._gates),
+        }
+
+    def close(self):
+        """Close pooled connections and stop the loop thread."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            self._client = None
+        self._gates = {}
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+http_fetcher = HttpFetcher()
@@ -0,0 +1,374 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+from uuid import uuid4
+
+from sqlalchemy import update
+
+from database.postgresdb import SessionLocal
+from env import INGEST_JOB_WORKERS, INGEST_JOB_POLL_INTERVAL, INGEST_JOB_LEASE_SECONDS
+from models.ingest_model import ingestJobSchema, ingestJobUrlSchema
+from services.ingest_pipeline import IngestPipeline, IngestResult, UrlResult
+from services.url_manifest import UrlManifest
+from services.listing_store import ListingStore
+
+logger = logging.getLogger(__name__)
+
+# Pipeline progress states mapped onto the per-URL status column
+_URL_STATES = {
+    "fetched": "fetched",
+    "split": "embedding",
+    "done": "done",
+    "failed": "failed",
+    "cancelled": "cancelled",
+}
+_FINISHED_URL_STATES = ("done", "unchanged", "failed", "cancelled")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def build_pipeline(components, owner_id: int | None = None, max_new_chunks: int | None = None) -> IngestPipeline:
+    """Pipeline writing into ``owner_id``'s collection (the shared one for None), adding at most ``max_new_chunks``."""
+    tenants = components.tenants
+    store = tenants.get(owner_id) if tenants is not None else None
+    return IngestPipeline(
+        store.vector_store if store is not None else components.vector_store,
+        components.embeddings,
+        UrlManifest(owner_id=owner_id),
+        store.keyword_index if store is not None else components.keyword_index,
+        ListingStore(owner_id=owner_id),
+        owner_id=owner_id,
+        max_new_chunks=max_new_chunks,
+    )
+
+
+def run_ingest(urls: List[str], on_progress=None, should_cancel=None, owner_id: int | None = None) -> IngestResult:
+    from services.component_registry import registry
+
+    components = registry.get()
+    if components.tenants is None:
+        return build_pipeline(components, owner_id).run(urls, on_progress=on_progress, should_cancel=should_cancel)
+    # The owner's quota stays reserved until this run's chunks are written
+    with components.tenants.reserve_quota(owner_id) as quota:
+        pipeline = build_pipeline(components, owner_id, max_new_chunks=quota)
+        return pipeline.run(urls, on_progress=on_progress, should_cancel=should_cancel)
+
+
+# --- Job store (SQLAlchemy) ---
+
+def create_job(urls: List[str], owner_id: int | None = None) -> str:
+    urls = list(dict.fromkeys(urls))
+    job_id = str(uuid4())
+    with SessionLocal() as db:
+        db.add(ingestJobSchema(id=job_id, status="queued", owner_id=owner_id, total_urls=len(urls)))
+        db.add_all(
+            ingestJobUrlSchema(job_id=job_id, position=i, url=url, status="pending")
+            for i, url in enumerate(urls)
+        )
+        db.commit()
+    return job_id
+
+
+def get_job(job_id: str) -> dict | None:
+    with SessionLocal() as db:
+        job = db.get(ingestJobSchema, job_id)
+        if job is None:
+            return None
+        rows = (
+            db.query(ingestJobUrlSchema)
+            .filter(ingestJobUrlSchema.job_id == job_id)
+            .order_by(ingestJobUrlSchema.position)
+            .all()
+        )
+        urls = [
+            {
+                "url": r.url,
+                "status": r.status,
+                "chunks": r.chunks,
+                "bytes_removed": r.bytes_removed,
+                "chunks_removed": r.chunks_removed,
+                "error": r.error,
+            }
+            for r in rows
+        ]
+        finished = sum(1 for u in urls if u["status"] in _FINISHED_URL_STATES)
+        return {
+            "job_id": job.id,
+            "owner_id": job.owner_id,
+            "status": job.status,
+            "cancel_requested": job.cancel_requested,
+            "progress": {"total": job.total_urls, "finished": finished},
+            "chunks_added": job.chunks_added,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "urls": urls,
+            # Same shape as the former synchronous /process-urls response
+            "details": {
+                "success": [
+                    {"url": u["url"], "chunks": u["chunks"], "unchanged": u["status"] == "unchanged"}
+                    for u in urls if u["status"] in ("done", "unchanged")
+                ],
+                "failed": [{"url": u["url"], "error": u["error"]} for u in urls if u["status"] in ("failed", "cancelled")],
+            },
+        }
+
+
+def cancel_job(job_id: str) -> dict | None:
+    """Cancel a queued job outright, or ask a running job to stop after in-flight work."""
+    with SessionLocal() as db:
+        job = db.get(ingestJobSchema, job_id)
+        if job is None:
+            return None
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = _now()
+            db.execute(
+                update(ingestJobUrlSchema)
+                .where(ingestJobUrlSchema.job_id == job_id)
+                .values(status="cancelled", error="Cancelled")
+            )
+        elif job.status == "running":
+            job.cancel_requested = True
+        db.commit()
+    return get_job(job_id)
+
+
+def _claim_next_job() -> tuple[str, List[str], int | None] | None:
+    with SessionLocal() as db:
+        candidates = (
+            db.query(ingestJobSchema.id)
+            .filter(ingestJobSchema.status == "queued")
+            .order_by(ingestJobSchema.created_at)
+            .limit(5)
+            .all()
+        )
+        for (job_id,) in candidates:
+            # Conditional update so two workers (or processes) never run the same job
+            claimed = db.execute(
+                update(ingestJobSchema)
+                .where(ingestJobSchema.id == job_id, ingestJobSchema.status == "queued")
+                .values(status="running", started_at=_now(), heartbeat_at=_now())
+            ).rowcount
+            db.commit()
+            if claimed:
+                owner_id = db.query(ingestJobSchema.owner_id).filter(ingestJobSchema.id == job_id).scalar()
+                # A requeued job resumes with the URLs it had not finished
+                urls = [
+                    u for (u,) in db.query(ingestJobUrlSchema.url)
+                    .filter(ingestJobUrlSchema.job_id == job_id, ingestJobUrlSchema.status.not_in(_FINISHED_URL_STATES))
+                    .order_by(ingestJobUrlSchema.position)
+                ]
+                return job_id, urls, owner_id
+    return None
+
+
+def _requeue(db, job_ids):
+    """Put jobs back to "queued" with their unfinished URLs pending again."""
+    db.execute(
+        update(ingestJobSchema)
+        .where(ingestJobSchema.id.in_(job_ids))
+        .values(status="queued", started_at=None, heartbeat_at=None)
+    )
+    db.execute(
+        update(ingestJobUrlSchema)
+        .where(ingestJobUrlSchema.job_id.in_(job_ids), ingestJobUrlSchema.status.not_in(("done", "unchanged", "failed")))
+        .values(status="pending", error=None)
+    )
+
+
+def reclaim_stale_jobs(lease_seconds: float = INGEST_JOB_LEASE_SECONDS) -> int:
+    """Requeue "running" jobs whose worker stopped heartbeating (a crashed or killed process)."""
+    cutoff = _now() - timedelta(seconds=lease_seconds)
+    abandoned = (ingestJobSchema.status == "running") & (
+        (ingestJobSchema.heartbeat_at < cutoff)
+        | (ingestJobSchema.heartbeat_at.is_(None) & (ingestJobSchema.started_at < cutoff))
+    )
+    with SessionLocal() as db:
+        stale = [
+            job_id for (job_id,) in db.query(ingestJobSchema.id)
+            .filter(abandoned, ingestJobSchema.cancel_requested.is_(False))
+        ]
+        if stale:
+            _requeue(db, stale)
+        # Jobs the user had already asked to cancel are finished rather than resumed
+        db.execute(
+            update(ingestJobSchema)
+            .where(abandoned, ingestJobSchema.cancel_requested.is_(True))
+            .values(status="cancelled", finished_at=_now())
+        )
+        db.commit()
+    if stale:
+        logger.warning("Requeued %d ingest jobs abandoned by a dead worker", len(stale))
+    return len(stale)
+
+
+class IngestJobQueue:
+    """Worker pool that drains queued ingest jobs from the database.
+
+    Running jobs are leased: a heartbeat thread refreshes ``heartbeat_at`` for
+    the jobs this process runs and requeues any whose lease expired elsewhere.
+    ``stop()`` interrupts in-flight jobs and puts them back to "queued" (a
+    deploy is not a cancel), so the next process resumes their remaining URLs.
+    """
+
+    def __init__(
+        self,
+        workers: int = INGEST_JOB_WORKERS,
+        poll_interval: float = INGEST_JOB_POLL_INTERVAL,
+        runner: Callable[..., IngestResult] = run_ingest,
+        lease_seconds: float = INGEST_JOB_LEASE_SECONDS,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._runner = runner
+        self._threads: List[threading.Thread] = []
+        self._running: set = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            try:
+                reclaim_stale_jobs(self.lease_seconds)
+            except Exception as e:
+                logger.warning("Could not reclaim stale ingest jobs: %s", e)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"ingest-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="ingest-job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            self._stop.set()
+            self._wake.set()
+            for thread in self._threads:
+                thread.join(timeout=timeout)
+            self._threads = []
+
+    def submit(self, urls: List[str], owner_id: int | None = None) -> str:
+        job_id = create_job(urls, owner_id)
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                running = list(self._running)
+                if running:
+                    with SessionLocal() as db:
+                        db.execute(
+                            update(ingestJobSchema)
+                            .where(ingestJobSchema.id.in_(running), ingestJobSchema.status == "running")
+                            .values(heartbeat_at=_now())
+                        )
+                        db.commit()
+                if reclaim_stale_jobs(self.lease_seconds):
+                    self._wake.set()
+            except Exception as e:
+                logger.warning("Ingest job heartbeat failed: %s", e)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                claimed = _claim_next_job()
+            except Exception as e:
+                logger.warning("Could not poll ingest jobs: %s", e)
+                claimed = None
+            if claimed is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(*claimed)
+
+    def _run(self, job_id: str, urls: List[str], owner_id: int | None = None):
+        logger.info("Running ingest job %s with %d URLs", job_id, len(urls))
+        last_check = [0.0, False]
+
+        def cancel_requested() -> bool:
+            with SessionLocal() as db:
+                return bool(db.query(ingestJobSchema.cancel_requested).filter(ingestJobSchema.id == job_id).scalar())
+
+        def should_cancel() -> bool:
+            # Poll the flag at most once a second to keep DB traffic low
+            if time.monotonic() - last_check[0] >= 1.0:
+                last_check[1] = cancel_requested()
+                last_check[0] = time.monotonic()
+            # Shutting down also stops the pipeline, but the job is requeued below, not cancelled
+            return self._stop.is_set() or last_check[1]
+
+        def on_progress(url_result: UrlResult, state: str):
+            url_state = "unchanged" if state == "done" and url_result.unchanged else _URL_STATES[state]
+            with SessionLocal() as db:
+                db.execute(
+                    update(ingestJobUrlSchema)
+                    .where(ingestJobUrlSchema.job_id == job_id, ingestJobUrlSchema.url == url_result.url)
+                    .values(
+                        status=url_state,
+                        chunks=url_result.chunks,
+                        bytes_removed=url_result.bytes_removed,
+                        chunks_removed=url_result.chunks_removed,
+                        error=url_result.error,
+                    )
+                )
+                if state == "done":
+                    db.execute(
+                        update(ingestJobSchema)
+                        .where(ingestJobSchema.id == job_id)
+                        .values(chunks_added=ingestJobSchema.chunks_added + url_result.chunks)
+                    )
+                db.commit()
+
+        status, error = "completed", None
+        self._running.add(job_id)
+        try:
+            self._runner(urls, on_progress=on_progress, should_cancel=should_cancel, owner_id=owner_id)
+            if cancel_requested():
+                status = "cancelled"
+            elif self._stop.is_set():
+                status = "queued"
+        except Exception as e:
+            if self._stop.is_set() and not cancel_requested():
+                status = "queued"
+            else:
+                logger.exception("Ingest job %s failed", job_id)
+                status, error = "failed", str(e)
+        finally:
+            self._running.discard(job_id)
+        if status == "queued":
+            with SessionLocal() as db:
+                _requeue(db, [job_id])
+                db.commit()
+            logger.info("Ingest job %s interrupted by shutdown; requeued", job_id)
+            return
+        with SessionLocal() as db:
+            db.execute(
+                update(ingestJobSchema)
+                .where(ingestJobSchema.id == job_id)
+                .values(status=status, error=error, finished_at=_now())
+            )
+            if status == "failed":
+                db.execute(
+                    update(ingestJobUrlSchema)
+                    .where(ingestJobUrlSchema.job_id == job_id, ingestJobUrlSchema.status.not_in(("done", "unchanged", "failed")))
+                    .values(status="failed", error=error)
+                )
+            db.commit()
+        logger.info("Ingest job %s finished: %s", job_id, status)
+
+
+job_queue = IngestJobQueue()
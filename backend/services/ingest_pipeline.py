@@ -0,0 +1,652 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Set
+from urllib.parse import urlparse
+
+from langchain_core.documents import Document
+
+from env import (
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    INGEST_FETCH_WORKERS,
+    INGEST_MAX_QUEUED_PARTS,
+    INGEST_PER_HOST_LIMIT,
+    INGEST_SPLIT_WORKERS,
+    INGEST_UPSERT_BATCH_SIZE,
+    RECRAWL_MAX_FAILURES,
+)
+from services.chunker import StructuredChunker
+from services.document_loader import is_upload_source, iter_pdf_documents, upload_path
+from services.html_extractor import extract_main_content, site_templates
+from services.http_fetcher import FetchError, http_fetcher
+from services.listing_extractor import extract_listings
+from services.metadata_filters import chunk_metadata, now_ts
+from services.query_cache import answer_cache
+from services.url_manifest import ManifestEntry
+
+logger = logging.getLogger(__name__)
+
+# For estimates only; chunks themselves are sized in tokens
+CHARS_PER_TOKEN = 4
+# Answers that mean the page was taken down rather than temporarily unavailable
+GONE_STATUSES = frozenset({404, 410})
+
+
+class PageGone(Exception):
+    """The page no longer exists; its indexed chunks should be removed."""
+
+
+@dataclass
+class Chunk:
+    url: str
+    id: str
+    text: str
+    metadata: dict
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    # A list, or for long documents a lazy stream of pages
+    documents: Iterable[Document] = field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    # Set when the text was boiled down from HTML: hash of the pre-template
+    # text, and the size of the unfiltered page text
+    content_hash: str | None = None
+    raw_chars: int = 0
+    bytes_removed: int = 0
+
+
+@dataclass
+class UrlResult:
+    url: str
+    chunks: int = 0
+    error: str | None = None
+    unchanged: bool = False
+    deleted: int = 0
+    bytes_removed: int = 0
+    chunks_removed: int = 0
+    # The page was indexed before but is gone now; ``deleted`` of its chunks were removed
+    gone: bool = False
+
+
+@dataclass
+class IngestResult:
+    results: Dict[str, UrlResult] = field(default_factory=dict)
+
+    @property
+    def successes(self) -> List[dict]:
+        return [
+            {
+                "url": r.url,
+                "chunks": r.chunks,
+                "unchanged": r.unchanged,
+                "bytes_removed": r.bytes_removed,
+                "chunks_removed": r.chunks_removed,
+            }
+            for r in self.results.values() if r.error is None
+        ]
+
+    @property
+    def failures(self) -> List[dict]:
+        return [{"url": r.url, "error": r.error} for r in self.results.values() if r.error is not None]
+
+    @property
+    def total_chunks(self) -> int:
+        return sum(r.chunks for r in self.results.values() if r.error is None)
+
+
+@dataclass
+class _PageState:
+    """Main-thread bookkeeping for a page whose chunks are still streaming in."""
+
+    known: Set[str]  # chunk ids stored by the previous ingest
+    ids: Dict[str, None] = field(default_factory=dict)  # every id seen so far, in page order
+    fresh: List[str] = field(default_factory=list)  # ids sent to the store in this run
+    split_done: bool = False
+
+
+class _HostLimiter:
+    """Caps how many fetches run against the same host at once."""
+
+    def __init__(self, per_host: int):
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def for_url(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self._per_host)
+            return self._semaphores[host]
+
+
+def chunk_id(url: str, text: str) -> str:
+    """Deterministic chunk id: the same text under the same URL always maps to the same id."""
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    return f"{url_hash}-{text_hash}"
+
+
+def content_hash(documents: List[Document]) -> str:
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def estimate_chunks(chars: int) -> int:
+    """Chunks the chunker produces for ``chars`` characters of text, roughly."""
+    if chars <= 0:
+        return 0
+    tokens = chars / CHARS_PER_TOKEN
+    return max(1, -int(-(tokens - CHUNK_OVERLAP_TOKENS) // (CHUNK_MAX_TOKENS - CHUNK_OVERLAP_TOKENS)))
+
+
+def fetch_documents(url: str, previous: ManifestEntry | None = None) -> FetchedPage:
+    """GET a page (conditionally, when validators are known) and extract its main text."""
+    try:
+        response = http_fetcher.fetch(
+            url,
+            etag=previous.etag if previous is not None else None,
+            last_modified=previous.last_modified if previous is not None else None,
+        )
+    except FetchError as e:
+        if e.status_code in GONE_STATUSES:
+            raise PageGone(str(e)) from e
+        raise
+    etag, last_modified = response.etag, response.last_modified
+    if response.not_modified:
+        return FetchedPage(url=url, etag=etag, last_modified=last_modified, not_modified=True)
+
+    extraction = extract_main_content(response.content, url, response.encoding, site_templates)
+    metadata = {"source": url, "doc_type": "html"}
+    if extraction.title:
+        metadata["title"] = extraction.title
+    document = Document(page_content=extraction.text, metadata=metadata)
+    return FetchedPage(
+        url=url,
+        documents=[document],
+        etag=etag,
+        last_modified=last_modified,
+        content_hash=content_hash([Document(page_content=extraction.hash_text)]),
+        raw_chars=len(extraction.raw_text),
+        bytes_removed=extraction.bytes_removed,
+    )
+
+
+def load_upload(source: str, previous: ManifestEntry | None = None) -> FetchedPage:
+    """An uploaded PDF, streamed page by page; its content hash is the file hash."""
+    path = upload_path(source)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Uploaded file for {source} is no longer available")
+    return FetchedPage(url=source, documents=iter_pdf_documents(path, source), content_hash=urlparse(source).netloc)
+
+
+def fetch_source(url: str, previous: ManifestEntry | None = None) -> FetchedPage:
+    if is_upload_source(url):
+        return load_upload(url, previous)
+    return fetch_documents(url, previous)
+
+
+_chunker: StructuredChunker | None = None
+
+
+def split_documents(url: str, documents: Iterable[Document]) -> Iterator[Chunk]:
+    """Yield a page's chunks one at a time, in order.
+
+    ``start_index`` (offset in the document) lets the query path stitch
+    overlapping neighbours back together; ``section`` is the heading a chunk
+    falls under.
+    """
+    global _chunker
+    if _chunker is None:
+        _chunker = StructuredChunker()
+    index = 0
+    for document in documents:
+        for piece in _chunker.iter_chunks(document.page_content):
+            metadata = dict(document.metadata, start_index=piece.start, chunk_index=index)
+            if piece.section:
+                metadata["section"] = piece.section
+            yield Chunk(url=url, id=chunk_id(url, piece.text), text=piece.text, metadata=metadata)
+            index += 1
+
+
+def _page_hash(page: FetchedPage) -> str:
+    return page.content_hash or content_hash(page.documents)
+
+
+class IngestPipeline:
+    """Staged URL ingestion: fetch -> split -> batched embed + upsert.
+
+    Fetches run concurrently (bounded globally and per host), splitting runs in a
+    separate worker pool as soon as each page arrives, and chunks from all URLs are
+    pooled into fixed-size upsert batches so the vector store sees a few large
+    writes instead of one per page. ``split`` may be a generator: chunks are
+    streamed into the batches while the page is still being chunked, so a long
+    page's first chunks are searchable early and it is never held as one list.
+    At most ``max_queued_parts`` parts wait for the upsert stage at once; split
+    workers block beyond that, so a slow embedder holds back chunking instead
+    of letting split output pile up in memory.
+
+    With a ``manifest``, re-ingest is incremental: pages that answer 304 or whose
+    text hash is unchanged are skipped, only chunk ids not already stored are
+    upserted, and ids that disappeared from the page are deleted.
+
+    With a ``listings`` store, structured listings (address, price, beds, baths,
+    sqft) are extracted from each page during the split stage and written when
+    the page finishes.
+
+    Every chunk's metadata is normalized (source, domain, doc_type, ingested_at
+    and ``owner_id`` when given) so queries can be scoped with filters.
+
+    ``max_new_chunks`` caps how many chunks this run may add to the store (the
+    owner's remaining quota); a page that would overflow it fails instead, and
+    any of its chunks already stored are removed again.
+
+    A page already in the manifest that answers 404/410, or fails to fetch
+    ``max_fetch_failures`` times in a row, is tombstoned: its chunks and
+    listings are removed and the manifest keeps it as gone.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        embedder=None,
+        manifest=None,
+        keyword_index=None,
+        listings=None,
+        owner_id: int | None = None,
+        max_new_chunks: int | None = None,
+        max_fetch_failures: int = RECRAWL_MAX_FAILURES,
+        fetch_workers: int = INGEST_FETCH_WORKERS,
+        per_host_limit: int = INGEST_PER_HOST_LIMIT,
+        split_workers: int = INGEST_SPLIT_WORKERS,
+        batch_size: int = INGEST_UPSERT_BATCH_SIZE,
+        max_queued_parts: int = INGEST_MAX_QUEUED_PARTS,
+        fetch: Callable = fetch_source,
+        split: Callable = split_documents,
+    ):
+        self.vector_store = vector_store
+        self.embedder = embedder
+        self.manifest = manifest
+        self.keyword_index = keyword_index
+        self.listings = listings
+        self.owner_id = owner_id
+        self.max_new_chunks = max_new_chunks
+        self.max_fetch_failures = max_fetch_failures
+        self.fetch_workers = fetch_workers
+        self.split_workers = split_workers
+        self.batch_size = batch_size
+        self.max_queued_parts = max(1, max_queued_parts)
+        # Most parts waiting for the main thread at once during the last run
+        self.peak_queued_parts = 0
+        self._hosts = _HostLimiter(per_host_limit)
+        self._fetch = fetch
+        self._split = split
+        self._on_progress = None
+        self._remaining: Dict[str, int] = {}
+        self._previous: Dict[str, ManifestEntry] = {}
+        self._pending_entries: Dict[str, tuple] = {}
+        self._pending_listings: Dict[str, list] = {}
+        self._pages: Dict[str, _PageState] = {}
+        self._finished: Set[str] = set()
+        self._cancelled = threading.Event()
+        self._budget: int | None = None
+        self._part_slots = threading.BoundedSemaphore(self.max_queued_parts)
+        self._parts_lock = threading.Lock()
+        self._queued_parts = 0
+
+    def _fetch_limited(self, url: str) -> FetchedPage:
+        with self._hosts.for_url(url):
+            return self._fetch(url, self._previous.get(url))
+
+    def _queue_part(self, url: str, part: List[Chunk], events: "queue.Queue") -> bool:
+        """Hand a part to the main thread, waiting for a free slot; False once cancelled."""
+        while not self._part_slots.acquire(timeout=0.1):
+            if self._cancelled.is_set():
+                return False
+        with self._parts_lock:
+            self._queued_parts += 1
+            self.peak_queued_parts = max(self.peak_queued_parts, self._queued_parts)
+        events.put(("part", url, part))
+        return True
+
+    def _part_taken(self):
+        with self._parts_lock:
+            self._queued_parts -= 1
+        self._part_slots.release()
+
+    def _split_page(self, url: str, documents: Iterable[Document], events: "queue.Queue"):
+        """Chunk a page in the split pool, handing chunks to the main thread as they come.
+
+        Parts of ``batch_size`` chunks are queued as ``("part", url, chunks)``
+        so their upserts can start while the rest of a long page is still being
+        chunked; with ``max_queued_parts`` parts outstanding this blocks until
+        the main thread takes one. Returns (number of chunks, extracted listings or None).
+        """
+        ingested_at = now_ts()
+        part, total, listings = [], 0, []
+
+        def tap(documents):
+            # Documents may be a lazy stream (PDF pages), so listings are pulled out as they pass
+            for document in documents:
+                if self.listings is not None:
+                    listings.extend(extract_listings(url, document.page_content))
+                yield document
+
+        if isinstance(documents, list):
+            # Fetched pages stay lists for split functions that index into them
+            list(tap(documents))
+        else:
+            documents = tap(documents)
+        for chunk in self._split(url, documents):
+            if self._cancelled.is_set():
+                break
+            chunk.metadata = chunk_metadata(chunk.metadata, url, ingested_at, self.owner_id)
+            part.append(chunk)
+            total += 1
+            if len(part) >= self.batch_size:
+                if not self._queue_part(url, part, events):
+                    break
+                part = []
+        if part and not self._cancelled.is_set():
+            self._queue_part(url, part, events)
+        return total, listings if self.listings is not None else None
+
+
+    def _upsert(self, batch: List[Chunk], result: IngestResult):
+        texts = [c.text for c in batch]
+        try:
+            # One embedding call per batch; without an embedder the store embeds itself
+            embeddings = self.embedder.embed_passages(texts) if self.embedder is not None else None
+            self.vector_store.upsert(
+                documents=texts,
+                metadatas=[c.metadata for c in batch],
+                ids=[c.id for c in batch],
+                embeddings=embeddings,
+            )
+        except Exception as e:
+            logger.warning("Upsert of %d chunks failed: %s", len(batch), e)
+            for url in {c.url for c in batch}:
+                if result.results[url].error is None:
+                    result.results[url].error = f"Upsert failed: {e}"
+                    self._report(result.results[url], "failed")
+            return
+        answer_cache.invalidate()
+        self._index_keywords(lambda index: index.upsert([c.id for c in batch], texts, [c.metadata for c in batch]))
+        for chunk in batch:
+            self._remaining[chunk.url] -= 1
+        for url in {c.url for c in batch}:
+            if self._remaining[url] == 0 and self._pages[url].split_done:
+                self._finish(result.results[url])
+
+    def _finish(self, url_result: UrlResult):
+        """All of a URL's new chunks are stored: drop stale ids and record the manifest."""
+        if url_result.error is not None:
+            return
+        entry, stale = self._pending_entries.pop(url_result.url, (None, []))
+        try:
+            if stale:
+                self.vector_store.delete(ids=stale)
+                answer_cache.invalidate()
+                self._index_keywords(lambda index: index.delete(stale))
+                url_result.deleted = len(stale)
+            if self.manifest is not None and entry is not None:
+                self.manifest.record(entry)
+        except Exception as e:
+            logger.warning("Could not finalize URL %s: %s", url_result.url, e)
+            url_result.error = str(e)
+            self._report(url_result, "failed")
+            return
+        self._write_listings(url_result.url)
+        self._finished.add(url_result.url)
+        self._report(url_result, "done")
+
+    def _write_listings(self, url: str):
+        # Like the keyword index, the listings table is derived data: log, don't fail the page
+        listings = self._pending_listings.pop(url, None)
+        if self.listings is None or listings is None:
+            return
+        try:
+            self.listings.replace_for_url(url, listings)
+        except Exception as e:
+            logger.warning("Listing extraction write failed for %s: %s", url, e)
+
+    def _index_keywords(self, write):
+        # The keyword index is a sidecar: a failed write degrades recall, not the ingest
+        if self.keyword_index is None:
+            return
+        try:
+            write(self.keyword_index)
+        except Exception as e:
+            logger.warning("Keyword index update failed: %s", e)
+
+    def _report(self, url_result: UrlResult, state: str):
+        if self._on_progress is not None:
+            try:
+                self._on_progress(url_result, state)
+            except Exception as e:
+                logger.warning("Progress callback failed for %s: %s", url_result.url, e)
+
+    def _is_unchanged(self, page: FetchedPage) -> bool:
+        previous = self._previous.get(page.url)
+        if page.not_modified:
+            return True
+        return previous is not None and previous.content_hash == _page_hash(page)
+
+    def _accept(self, url_result: UrlResult, part: List[Chunk]) -> List[Chunk]:
+        """Dedupe a part of a page's chunks and keep only ids not already in the store."""
+        state = self._pages[url_result.url]
+        fresh = []
+        for chunk in part:
+            if chunk.id in state.ids:
+                continue
+            state.ids[chunk.id] = None
+            if chunk.id not in state.known:
+                fresh.append(chunk)
+        state.fresh.extend(c.id for c in fresh)
+        self._remaining[url_result.url] += len(fresh)
+        url_result.chunks = len(state.fresh)
+        return fresh
+
+    def _abort(self, url_result: UrlResult, error: str, pending: List[Chunk], state: str = "failed"):
+        """Fail a page mid-stream and take back the chunks it already added."""
+        url = url_result.url
+        url_result.error = error
+        pending[:] = [c for c in pending if c.url != url]
+        self._pending_listings.pop(url, None)
+        page = self._pages.get(url)
+        if page is not None and page.fresh:
+            try:
+                self.vector_store.delete(ids=page.fresh)
+                answer_cache.invalidate()
+                self._index_keywords(lambda index: index.delete(page.fresh))
+            except Exception as e:
+                logger.warning("Could not roll back chunks of %s: %s", url, e)
+        self._report(url_result, state)
+
+    def _fetch_failed(self, url_result: UrlResult, error: Exception):
+        """Count a failed fetch of an indexed page, and remove the page once it is gone for good."""
+        url = url_result.url
+        previous = self._previous.get(url)
+        if self.manifest is None or previous is None:
+            return
+        try:
+            failures = self.manifest.mark_failed(url)
+            if not isinstance(error, PageGone) and failures < self.max_fetch_failures:
+                return
+            ids = previous.chunk_ids
+            if ids:
+                self.vector_store.delete(ids=ids)
+                answer_cache.invalidate()
+                self._index_keywords(lambda index: index.delete(ids))
+            self.manifest.tombstone(url)
+        except Exception as e:
+            logger.warning("Could not tombstone URL %s: %s", url, e)
+            return
+        self._pending_listings[url] = []
+        self._write_listings(url)
+        url_result.gone = True
+        url_result.deleted = len(ids)
+        logger.info("%s is gone, removed %d chunks", url, len(ids))
+
+    def _complete_split(self, page: FetchedPage, url_result: UrlResult, total: int, listings, pending: List[Chunk]):
+        """All of a page's chunks are known: check the quota and stage its manifest entry."""
+        url = page.url
+        state = self._pages[url]
+        state.split_done = True
+        if url_result.bytes_removed:
+            url_result.chunks_removed = max(0, estimate_chunks(page.raw_chars) - total)
+            logger.info(
+                "%s: boilerplate removal dropped %d bytes, ~%d chunks",
+                url, url_result.bytes_removed, url_result.chunks_removed,
+            )
+        if listings is not None:
+            self._pending_listings[url] = listings
+        stale = [i for i in state.known if i not in state.ids]
+        if self._budget is not None:
+            growth = len(state.fresh) - len(stale)
+            if growth > self._budget:
+                self._abort(url_result, f"Chunk quota exceeded: page needs {growth} chunks, {self._budget} left", pending)
+                return
+            self._budget -= growth
+        self._pending_entries[url] = (
+            ManifestEntry(
+                url=url,
+                content_hash=_page_hash(page),
+                etag=page.etag,
+                last_modified=page.last_modified,
+                chunk_ids=list(state.ids),
+            ),
+            stale,
+        )
+        self._report(url_result, "split")
+        if self._remaining[url] == 0:
+            self._finish(url_result)
+
+    def run(
+        self,
+        urls: List[str],
+        on_progress: Callable[[UrlResult, str], None] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> IngestResult:
+        """Ingest ``urls`` and return per-URL results.
+
+        ``on_progress(url_result, state)`` is called from the calling thread as each
+        URL moves through ``fetched`` -> ``split`` -> ``done`` (or ``failed`` /
+        ``cancelled``). ``should_cancel()`` is polled between stages; once it returns
+        True no new work is started and unfinished URLs are reported as cancelled.
+        """
+        urls = list(dict.fromkeys(urls))
+        result = IngestResult(results={url: UrlResult(url=url) for url in urls})
+        if not urls:
+            return result
+        self._on_progress = on_progress
+        self._remaining = {}
+        self._pending_entries = {}
+        self._pending_listings = {}
+        self._pages = {}
+        self._finished = set()
+        self._cancelled = threading.Event()
+        self._budget = self.max_new_chunks
+        self._part_slots = threading.BoundedSemaphore(self.max_queued_parts)
+        self._queued_parts = 0
+        self.peak_queued_parts = 0
+        self._previous = self.manifest.get_many(urls) if self.manifest is not None else {}
+
+        pending: List[Chunk] = []
+        pages: Dict[str, FetchedPage] = {}
+        # Completed futures and streamed chunk parts arrive on one queue, so
+        # splitting and upserting overlap with the fetches still in flight and a
+        # page's parts always come before its split completes. Only parts count
+        # against ``max_queued_parts``; completion events never wait.
+        events: "queue.Queue" = queue.Queue()
+        in_flight = set()
+
+        def submit(pool, stage: str, url: str, fn, *args):
+            future = pool.submit(fn, *args)
+            in_flight.add(future)
+            future.add_done_callback(lambda f: events.put((stage, url, f)))
+
+        fetch_workers = max(1, min(self.fetch_workers, len(urls)))
+        with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="ingest-fetch") as fetch_pool, \
+                ThreadPoolExecutor(max_workers=self.split_workers, thread_name_prefix="ingest-split") as split_pool:
+            for url in urls:
+                submit(fetch_pool, "fetch", url, self._fetch_limited, url)
+            while in_flight:
+                if should_cancel is not None and should_cancel():
+                    self._cancelled.set()
+                    for future in in_flight:
+                        future.cancel()
+                    break
+                try:
+                    stage, url, payload = events.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                url_result = result.results[url]
+                if stage == "part":
+                    self._part_taken()
+                    if url_result.error is not None:
+                        continue
+                    state = self._pages[url]
+                    fresh = self._accept(url_result, payload)
+                    if self._budget is not None and len(state.fresh) - len(state.known) > self._budget:
+                        self._abort(url_result, f"Chunk quota exceeded: page needs more than {self._budget} chunks", pending)
+                        continue
+                    pending.extend(fresh)
+                    while len(pending) >= self.batch_size:
+                        batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+                        self._upsert(batch, result)
+                    continue
+                in_flight.discard(payload)
+                if url_result.error is not None:
+                    continue
+                try:
+                    output = payload.result()
+                except Exception as e:
+                    logger.warning("Error during %s of URL %s: %s", stage, url, e)
+                    if stage == "fetch":
+                        self._fetch_failed(url_result, e)
+                    self._abort(url_result, str(e), pending)
+                    continue
+                if stage == "fetch":
+                    if self._is_unchanged(output):
+                        url_result.unchanged = True
+                        self._finished.add(url)
+                        if self.manifest is not None:
+                            self.manifest.touch(url, output.etag, output.last_modified)
+                        self._report(url_result, "done")
+                        continue
+                    url_result.bytes_removed = output.bytes_removed
+                    self._report(url_result, "fetched")
+                    pages[url] = output
+                    previous = self._previous.get(url)
+                    self._pages[url] = _PageState(known=set(previous.chunk_ids) if previous is not None else set())
+                    self._remaining[url] = 0
+                    submit(split_pool, "split", url, self._split_page, url, output.documents, events)
+                    continue
+                total, listings = output
+                self._complete_split(pages.pop(url), url_result, total, listings, pending)
+
+        # On cancel, pages whose split completed are still written (and get their
+        # manifest entry) so they are not lost; chunks of pages cut off mid-split
+        # are dropped and any already stored are taken back, like a failed page.
+        if self._cancelled.is_set():
+            pending = [c for c in pending if c.url in self._pending_entries]
+        if pending:
+            self._upsert(pending, result)
+        if self._cancelled.is_set():
+            for url_result in result.results.values():
+                if url_result.error is None and url_result.url not in self._finished:
+                    self._abort(url_result, "Cancelled", pending, "cancelled")
+        return result
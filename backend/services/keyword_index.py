@@ -0,0 +1,166 @@
+import json
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from services.metadata_filters import SearchFilters
+
+# "$1,250,000" -> "1250000" so prices match however they were typed
+_DIGIT_GROUPS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# Metadata keys mirrored into indexed columns for pre-filtering
+FILTER_COLUMNS = ("domain", "source", "doc_type", "owner_id", "ingested_at")
+_SQL_OPERATORS = {"eq": "=", "gte": ">=", "lte": "<="}
+
+
+def normalize_text(text: str) -> str:
+    return _DIGIT_GROUPS.sub("", text)
+
+
+def _match_expression(query: str) -> str:
+    tokens = _TOKEN.findall(normalize_text(query).lower())
+    # Quote every token so FTS5 syntax characters in user input are inert
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(tokens))
+
+
+def _filter_sql(filters: SearchFilters | None, alias: str = "c") -> Tuple[str, list]:
+    if filters is None:
+        return "", []
+    clauses, params = [], []
+    for column, op, value in filters.conditions():
+        if op == "in":
+            clauses.append(f"{alias}.{column} IN ({','.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{alias}.{column} {_SQL_OPERATORS[op]} ?")
+            params.append(value)
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+class KeywordIndex:
+    """BM25 keyword index over chunk text, kept in SQLite FTS5 next to the vector store.
+
+    ``chunks`` holds id/text/metadata keyed by chunk id plus a normalized
+    ``body``; ``chunks_fts`` is an external-content FTS5 index over ``body``,
+    kept in sync by triggers, so upserts and deletes by chunk id are indexed
+    lookups rather than full scans.
+
+    The filterable metadata keys are also stored as indexed columns, so scoped
+    searches and "is anything in scope at all" checks stay local.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL DEFAULT '{}',
+                body TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                body, content='chunks', content_rowid='rowid', tokenize='unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts(rowid, body) VALUES (new.rowid, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, body) VALUES ('delete', old.rowid, old.body);
+            END;
+            """
+        )
+        self._add_filter_columns()
+        self._conn.commit()
+
+    def _add_filter_columns(self):
+        # Index files created before metadata filtering lack these columns
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        for column in FILTER_COLUMNS:
+            if column not in existing:
+                kind = "INTEGER" if column in ("owner_id", "ingested_at") else "TEXT"
+                self._conn.execute(f"ALTER TABLE chunks ADD COLUMN {column} {kind}")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_chunks_{column} ON chunks ({column})")
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with the lock held; a closed index reopens on its next use
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def close(self):
+        """Release the SQLite file handle; the index stays usable and reopens when needed."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[dict]):
+        rows = []
+        for chunk_id, text, md in zip(ids, documents, metadatas):
+            md = md or {}
+            rows.append((chunk_id, text, json.dumps(md), normalize_text(text), *(md.get(c) for c in FILTER_COLUMNS)))
+        columns = ", ".join(("id", "text", "metadata", "body") + FILTER_COLUMNS)
+        placeholders = ", ".join("?" * (4 + len(FILTER_COLUMNS)))
+        with self._lock:
+            self._db().executemany("DELETE FROM chunks WHERE id = ?", [(r[0],) for r in rows])
+            self._db().executemany(f"INSERT INTO chunks ({columns}) VALUES ({placeholders})", rows)
+            self._db().commit()
+
+    def delete(self, ids: Iterable[str]):
+        with self._lock:
+            self._db().executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            self._db().commit()
+
+    def search(self, query: str, n_results: int = 20, filters: SearchFilters | None = None) -> List[Tuple[str, float, str, dict]]:
+        """BM25-ranked matches as (id, score, text, metadata); higher score is better."""
+        expression = _match_expression(query)
+        if not expression:
+            return []
+        where, params = _filter_sql(filters)
+        with self._lock:
+            rows = self._db().execute(
+                f"""
+                SELECT c.id, -bm25(chunks_fts) AS score, c.text, c.metadata
+                FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid
+                WHERE chunks_fts MATCH ?{where}
+                ORDER BY bm25(chunks_fts)
+                LIMIT ?
+                """,
+                (expression, *params, n_results),
+            ).fetchall()
+        return [(cid, score, text, json.loads(md)) for cid, score, text, md in rows]
+
+    def lookup(self, token: str) -> List[str]:
+        """Ids of chunks containing an exact token (address number, zip, MLS id, price)."""
+        expression = _match_expression(token)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT c.id FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid WHERE chunks_fts MATCH ?",
+                (expression.replace(" OR ", " "),),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def count(self, filters: SearchFilters | None = None) -> int:
+        """Number of chunks, optionally only those in ``filters``' scope (answered from the column indexes)."""
+        where, params = _filter_sql(filters)
+        with self._lock:
+            return self._db().execute(f"SELECT COUNT(*) FROM chunks c WHERE 1=1{where}", params).fetchone()[0]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Combine ranked id lists: score(id) = sum over lists of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
@@ -0,0 +1,87 @@
+import re
+from dataclasses import dataclass
+from typing import List
+
+# Street address: house number, capitalised street name words and a suffix,
+# optionally followed by ", City, ST 12345".
+_SUFFIXES = (
+    "St|Street|Ave|Avenue|Rd|Road|Blvd|Boulevard|Dr|Drive|Ln|Lane|Ct|Court|Way|Pl|Place|"
+    "Ter|Terrace|Pkwy|Parkway|Cir|Circle|Hwy|Highway|Trl|Trail|Loop|Sq|Square"
+)
+ADDRESS = re.compile(
+    rf"\b\d{{1,6}}(?:\s+[NSEW]\.?)?(?:\s+[A-Z0-9][\w'.-]*){{1,4}}\s+(?:{_SUFFIXES})\b\.?"
+    r"(?:\s*(?:#|Apt\.?|Unit)\s*\w+)?"
+    r"(?:,\s*[A-Z][A-Za-z.]*(?:\s+[A-Z][A-Za-z.]*){0,3})?"
+    r"(?:,?\s+[A-Z]{2})?(?:\s+\d{5}(?:-\d{4})?)?"
+)
+PRICE = re.compile(r"\$\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*([kKmM]\b|million\b|thousand\b)?")
+BEDS = re.compile(r"\b(\d+(?:\.\d+)?)\s*(?:-\s*)?(?:beds?|bedrooms?|bd|br)\b", re.IGNORECASE)
+BATHS = re.compile(r"\b(\d+(?:\.\d+)?)\s*(?:-\s*)?(?:baths?|bathrooms?|ba)\b", re.IGNORECASE)
+SQFT = re.compile(r"\b(\d{1,3}(?:,\d{3})+|\d+)\s*(?:sq\.?\s*ft\.?|sqft|square\s+feet|sf)\b", re.IGNORECASE)
+
+# Text after the last address that still belongs to it
+_TAIL = 600
+
+
+@dataclass
+class Listing:
+    url: str
+    address: str
+    price: int | None = None
+    beds: float | None = None
+    baths: float | None = None
+    sqft: int | None = None
+
+
+def parse_money(amount: str, unit: str | None = None) -> int:
+    value = float(amount.replace(",", ""))
+    unit = (unit or "").lower()
+    if unit in ("k", "thousand"):
+        value *= 1_000
+    elif unit in ("m", "million"):
+        value *= 1_000_000
+    return int(round(value))
+
+
+def _fields(text: str) -> dict:
+    fields = {}
+    price = PRICE.search(text)
+    if price:
+        fields["price"] = parse_money(price.group(1), price.group(2))
+    beds = BEDS.search(text)
+    if beds:
+        fields["beds"] = float(beds.group(1))
+    baths = BATHS.search(text)
+    if baths:
+        fields["baths"] = float(baths.group(1))
+    sqft = SQFT.search(text)
+    if sqft:
+        fields["sqft"] = int(sqft.group(1).replace(",", ""))
+    return fields
+
+
+def extract_listings(url: str, text: str) -> List[Listing]:
+    """Pull (address, price, beds, baths, sqft) records out of page text.
+
+    Street addresses split the page into records. Listing pages put the details
+    either after the address ("123 Elm St ... $450,000 3 bd") or before it, as
+    cards usually do ("$450,000 3 bd ... 123 Elm St"); which one is decided once
+    per page by whether prices more often precede or follow the addresses. Addresses
+    with neither a price nor a bedroom count are ignored (usually the agent's
+    office or a map caption, not a listing).
+    """
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    matches = list(ADDRESS.finditer(text))
+    if not matches:
+        return []
+    before = [text[matches[i - 1].end() if i else max(0, m.start() - _TAIL):m.start()] for i, m in enumerate(matches)]
+    after = [text[m.end():matches[i + 1].start() if i + 1 < len(matches) else m.end() + _TAIL] for i, m in enumerate(matches)]
+    details_first = sum(bool(PRICE.search(s)) for s in before) > sum(bool(PRICE.search(s)) for s in after)
+    listings: dict = {}
+    for i, match in enumerate(matches):
+        fields = _fields(before[i] if details_first else after[i])
+        if "price" not in fields and "beds" not in fields:
+            continue
+        address = " ".join(match.group(0).split()).rstrip(".,")
+        listings.setdefault(address.lower(), Listing(url=url, address=address, **fields))
+    return list(listings.values())
@@ -0,0 +1,88 @@
+from typing import List, Sequence
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from database.postgresdb import SessionLocal
+from models.listing_model import listingSchema
+from services.listing_extractor import Listing
+
+
+def _to_listing(row: listingSchema) -> Listing:
+    return Listing(url=row.url, address=row.address, price=row.price, beds=row.beds, baths=row.baths, sqft=row.sqft)
+
+
+class ListingStore:
+    """Structured listings extracted at ingest, queried by the SQL side of the query router.
+
+    Scoped like the vector collections: ``owner_id`` for one user's listings,
+    None for listings from the shared collection.
+    """
+
+    def __init__(self, session_factory=SessionLocal, owner_id: int | None = None):
+        self._session_factory = session_factory
+        self.owner_id = owner_id
+
+    def _scoped(self, db):
+        owner = listingSchema.owner_id
+        return db.query(listingSchema).filter(owner.is_(None) if self.owner_id is None else owner == self.owner_id)
+
+    def replace_for_url(self, url: str, listings: Sequence[Listing]):
+        """Make ``listings`` the complete set of rows for ``url``."""
+        for attempt in range(2):
+            with self._session_factory() as db:
+                self._scoped(db).filter(listingSchema.url == url).delete(synchronize_session=False)
+                db.add_all(
+                    listingSchema(url=url, owner_id=self.owner_id, address=l.address, price=l.price, beds=l.beds, baths=l.baths, sqft=l.sqft)
+                    for l in listings
+                )
+                try:
+                    db.commit()
+                    return
+                except IntegrityError:
+                    # A concurrent replace for the same page committed first; redo ours on top
+                    db.rollback()
+                    if attempt:
+                        raise
+
+    def _filtered(self, db, query):
+        q = self._scoped(db)
+        for column, low, high in (
+            (listingSchema.price, query.min_price, query.max_price),
+            (listingSchema.beds, query.min_beds, query.max_beds),
+            (listingSchema.baths, query.min_baths, query.max_baths),
+            (listingSchema.sqft, query.min_sqft, query.max_sqft),
+        ):
+            if low is not None:
+                q = q.filter(column >= low)
+            if high is not None:
+                q = q.filter(column <= high)
+        if query.sources:
+            q = q.filter(listingSchema.url.in_(query.sources))
+        if query.domains:
+            patterns = [f"%://{host}{tail}" for d in query.domains for host in (d, f"www.{d}") for tail in ("", "/%", ":%")]
+            q = q.filter(or_(*(listingSchema.url.like(p) for p in patterns)))
+        return q
+
+    def search(self, query) -> List[Listing]:
+        """Listings matching ``query`` (a ``ListingQuery``), ordered for its intent."""
+        column = getattr(listingSchema, query.field)
+        with self._session_factory() as db:
+            q = self._filtered(db, query)
+            if query.intent in ("min", "max"):
+                q = q.filter(column.isnot(None))
+            order = column.desc() if query.intent == "max" else column.asc()
+            rows = q.order_by(order.nulls_last(), listingSchema.id).limit(query.limit).all()
+            return [_to_listing(row) for row in rows]
+
+    def count(self, query) -> int:
+        with self._session_factory() as db:
+            return self._filtered(db, query).count()
+
+    def average(self, query) -> tuple:
+        """(average of ``query.field``, number of listings it was computed over)."""
+        column = getattr(listingSchema, query.field)
+        with self._session_factory() as db:
+            q = self._filtered(db, query).filter(column.isnot(None))
+            avg, n = q.with_entities(func.avg(column), func.count(listingSchema.id)).one()
+            return (float(avg) if avg is not None else None), n
@@ -0,0 +1,99 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+DEFAULT_DOC_TYPE = "html"
+
+
+def normalize_domain(value: str) -> str:
+    """"https://WWW.Zillow.com/homes" and "zillow.com" both become "zillow.com"."""
+    host = urlparse(value).netloc if "://" in value else value
+    host = host.lower().split("@")[-1].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def chunk_metadata(
+    metadata: dict,
+    url: str,
+    ingested_at: int,
+    owner_id: int | None = None,
+    doc_type: str | None = None,
+) -> dict:
+    """Normalized metadata stored with every chunk.
+
+    Keeps loader fields that are useful downstream (title, section, offsets) and adds the
+    filterable keys: ``source``, ``domain``, ``doc_type``, ``ingested_at`` (unix
+    seconds, so range filters work) and ``owner_id`` when the chunk has an owner.
+    Vector stores reject ``None`` values, so absent fields are left out.
+    """
+    normalized = {
+        "source": url,
+        "domain": normalize_domain(url),
+        "doc_type": doc_type or metadata.get("doc_type") or DEFAULT_DOC_TYPE,
+        "ingested_at": int(ingested_at),
+    }
+    if owner_id is not None:
+        normalized["owner_id"] = int(owner_id)
+    for key in ("title", "section", "start_index", "chunk_index", "page"):
+        if metadata.get(key) is not None:
+            normalized[key] = metadata[key]
+    return normalized
+
+
+@dataclass
+class SearchFilters:
+    """Retrieval scope. Empty lists / None mean "no restriction" for that field."""
+
+    domains: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    doc_types: List[str] = field(default_factory=list)
+    owner_id: int | None = None
+    ingested_after: int | None = None
+    ingested_before: int | None = None
+
+    def __post_init__(self):
+        self.domains = sorted({normalize_domain(d) for d in self.domains})
+        self.sources = sorted(set(self.sources))
+        self.doc_types = sorted({t.lower() for t in self.doc_types})
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.domains or self.sources or self.doc_types or self.owner_id is not None
+            or self.ingested_after is not None or self.ingested_before is not None
+        )
+
+    def conditions(self) -> List[tuple]:
+        """(column, operator, value) triples shared by the Chroma and SQLite translations."""
+        conditions = []
+        for column, values in (("domain", self.domains), ("source", self.sources), ("doc_type", self.doc_types)):
+            if values:
+                conditions.append((column, "in", list(values)))
+        if self.owner_id is not None:
+            conditions.append(("owner_id", "eq", self.owner_id))
+        if self.ingested_after is not None:
+            conditions.append(("ingested_at", "gte", self.ingested_after))
+        if self.ingested_before is not None:
+            conditions.append(("ingested_at", "lte", self.ingested_before))
+        return conditions
+
+    def to_where(self) -> Dict[str, Any] | None:
+        """Chroma ``where`` clause, or None when unfiltered."""
+        clauses = []
+        for column, op, value in self.conditions():
+            if op == "in":
+                clauses.append({column: {"$in": value} if len(value) > 1 else value[0]})
+            else:
+                clauses.append({column: {f"${op}": value}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def cache_scope(self) -> str:
+        """Stable key so cached answers are only reused within the same scope."""
+        return "" if self.is_empty else repr(self.conditions())
+
+
+def now_ts() -> int:
+    return int(time.time())
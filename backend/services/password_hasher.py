@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from passlib.context import CryptContext
+
+from env import BCRYPT_ROUNDS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash/verify calls are already waiting; the request should be retried later."""
+
+
+def make_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    # min_rounds: hashes below the configured cost are flagged for rehash; higher ones are left alone
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+class PasswordHasher:
+    """bcrypt off the event loop, in a small dedicated thread pool.
+
+    bcrypt releases the GIL, so ``workers`` threads hash in parallel while the
+    event loop keeps serving other requests; capping the pool (rather than
+    using the loop's default executor) keeps a login burst from taking every
+    core away from queries. At most ``max_pending`` calls may wait for a
+    worker; beyond that ``PasswordHasherBusy`` is raised right away instead of
+    letting logins queue for seconds.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        context: CryptContext | None = None,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.context = context or make_context()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "rehashed": 0,
+            "max_pending": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    async def _run(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusy(f"{self._pending} password operations already queued")
+            self._pending += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+        queued_at = time.perf_counter()
+
+        def work():
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._active += 1
+                waited = started - queued_at
+                self._stats["wait_seconds"] += waited
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._stats["completed"] += 1
+                    self._stats["run_seconds"] += time.perf_counter() - started
+
+        def dropped(future):
+            # Cancelled before a worker picked it up (the caller went away): work() never runs
+            if future.cancelled():
+                with self._lock:
+                    self._pending -= 1
+
+        future = self._executor.submit(work)
+        future.add_done_callback(dropped)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple:
+        """(matches, new hash or None): a new hash when ``hashed`` uses a lower cost than configured."""
+        ok, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        if new_hash is not None:
+            with self._lock:
+                self._stats["rehashed"] += 1
+        return ok, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "rounds": self.context.to_dict().get("bcrypt__default_rounds"),
+                "pending": self._pending,
+                "active": self._active,
+                "completed": completed,
+                "rejected": self._stats["rejected"],
+                "rehashed": self._stats["rehashed"],
+                "max_pending": self._stats["max_pending"],
+                "avg_wait_ms": round(1000 * self._stats["wait_seconds"] / completed, 2) if completed else 0.0,
+                "max_wait_ms": round(1000 * self._stats["max_wait_seconds"], 2),
+                "avg_run_ms": round(1000 * self._stats["run_seconds"] / completed, 2) if completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,28 @@
+"""Functions run inside the PDF extraction process pool.
+
+Kept free of application imports so spawned workers start quickly and hold
+nothing but the pages they are parsing.
+"""
+from typing import List, Tuple
+
+
+def page_count(path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(path: str, first: int, last: int) -> List[Tuple[int, str]]:
+    """(1-based page number, text) for pages ``first`` .. ``last - 1``."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages = []
+    for index in range(first, min(last, len(reader.pages))):
+        try:
+            text = reader.pages[index].extract_text() or ""
+        except Exception:
+            # One unreadable page (broken font, odd encoding) should not sink the document
+            text = ""
+        pages.append((index + 1, text))
+    return pages
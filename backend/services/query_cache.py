@@ -0,0 +1,170 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from env import (
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL_SECONDS,
+    QUERY_CACHE_SEMANTIC_THRESHOLD,
+)
+from services.query_router import question_entities
+
+
+def normalize_question(question: str) -> str:
+    text = re.sub(r"\s+", " ", question.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+@dataclass
+class _Entry:
+    answer: str
+    sources: str
+    embedding: np.ndarray | None
+    generation: int
+    created_at: float
+    scope: str = ""
+    entities: str = ""
+
+
+class AnswerCache:
+    """Two-tier answer cache for /process/query.
+
+    - exact tier: LRU + TTL keyed on the normalized question text
+    - semantic tier: reuse an answer whose question embedding has cosine
+      similarity >= ``semantic_threshold`` with the new question and names
+      the same entities (``question_entities``: city, price, beds, ...);
+      e5 similarities cluster high, so the embedding alone would answer
+      "... in Austin" with a cached "... in Houston"
+
+    Every write to the collection calls ``invalidate()``, which bumps a
+    generation counter; entries from an older generation are never served.
+    ``scope`` (the query's filters) is part of the key in both tiers, so an
+    answer is only reused for a question asked over the same documents.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+        semantic_threshold: float = QUERY_CACHE_SEMANTIC_THRESHOLD,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _fresh(self, entry: _Entry, now: float) -> bool:
+        return entry.generation == self._generation and now - entry.created_at <= self.ttl_seconds
+
+    @staticmethod
+    def _key(question: str, scope: str) -> str:
+        key = normalize_question(question)
+        return f"{scope}\0{key}" if scope else key
+
+    def get_exact(self, question: str, scope: str = "") -> Tuple[str, str] | None:
+        key = self._key(question, scope)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._fresh(entry, now):
+                self._entries.pop(key, None)
+                self.exact_misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.answer, entry.sources
+
+    def get_semantic(self, embedding: Sequence[float], scope: str = "", question: str = "") -> Tuple[str, str] | None:
+        if self.semantic_threshold > 1.0:
+            self.misses += 1
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        entities = question_entities(question)
+        now = time.monotonic()
+        with self._lock:
+            keys, vectors = [], []
+            for key, entry in self._entries.items():
+                if (
+                    entry.embedding is not None
+                    and entry.scope == scope
+                    and entry.entities == entities
+                    and self._fresh(entry, now)
+                ):
+                    keys.append(key)
+                    vectors.append(entry.embedding)
+            if vectors:
+                scores = np.vstack(vectors) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.semantic_threshold:
+                    entry = self._entries[keys[best]]
+                    self._entries.move_to_end(keys[best])
+                    self.semantic_hits += 1
+                    return entry.answer, entry.sources
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        question: str,
+        answer: str,
+        sources: str,
+        embedding: Sequence[float] | None = None,
+        generation: int | None = None,
+        scope: str = "",
+    ):
+        """Store an answer. Pass the ``generation`` read before retrieval so an answer
+        computed across a concurrent write is not cached as current."""
+        vector = None
+        if embedding is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+        with self._lock:
+            gen = self._generation if generation is None else generation
+            if gen != self._generation:
+                return
+            key = self._key(question, scope)
+            self._entries[key] = _Entry(answer, sources, vector, gen, time.monotonic(), scope, question_entities(question))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        # Every question is looked up in the exact tier first
+        lookups = self.exact_hits + self.exact_misses
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "exact_misses": self.exact_misses,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "generation": self._generation,
+        }
+
+
+answer_cache = AnswerCache()
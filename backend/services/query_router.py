@@ -0,0 +1,257 @@
+import re
+from dataclasses import dataclass, fields, replace
+from typing import Tuple
+
+from services.listing_extractor import Listing, parse_money
+from services.metadata_filters import SearchFilters
+
+_AMOUNT = r"\$?\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|m|thousand|million)?\b"
+_UPPER = r"(?:under|below|less than|cheaper than|no more than|at most|up to|max(?:imum)?|<=?)"
+_LOWER = r"(?:over|above|more than|greater than|at least|min(?:imum)?|from|>=?)"
+_SQFT_UNIT = r"\s*(?:sq\.?\s*ft\.?|sqft|square\s+feet|sf)\b"
+
+SQFT_RANGE = re.compile(rf"between\s+([\d,]+)\s+and\s+([\d,]+){_SQFT_UNIT}", re.IGNORECASE)
+SQFT_BOUND = re.compile(rf"({_UPPER}|{_LOWER})\s+([\d,]+){_SQFT_UNIT}", re.IGNORECASE)
+PRICE_RANGE = re.compile(rf"between\s+{_AMOUNT}\s+and\s+{_AMOUNT}", re.IGNORECASE)
+PRICE_BOUND = re.compile(rf"({_UPPER}|{_LOWER})\s+{_AMOUNT}", re.IGNORECASE)
+ROOMS = re.compile(
+    r"(at least\s+|min(?:imum)?\s+|at most\s+|max(?:imum)?\s+)?(\d+)\s*(\+|or more|or fewer|or less)?\s*-?\s*"
+    r"(bed(?:room)?s?|bd|br|bath(?:room)?s?|ba)\b",
+    re.IGNORECASE,
+)
+
+PLACE = re.compile(r"\b(?:in|near|around|at|within|for|of)\s+((?:[\w'.-]+\s*){1,3})", re.IGNORECASE)
+LISTING_WORDS = re.compile(r"\b(homes?|houses?|listings?|propert(?:y|ies)|condos?|apartments?|townhouses?|units?|places?)\b", re.IGNORECASE)
+COUNT = re.compile(r"\bhow many\s+(homes?|houses?|listings?|propert(?:y|ies)|condos?|apartments?|townhouses?|units?|places?)\b", re.IGNORECASE)
+AVERAGE = re.compile(r"\b(average|mean|typical)\s+(price|cost|size|square footage|sq\.?\s*ft|sqft)\b", re.IGNORECASE)
+SUPERLATIVES = (
+    (re.compile(r"\b(cheapest|least expensive|lowest[- ]priced|lowest price|most affordable)\b", re.IGNORECASE), "min", "price"),
+    (re.compile(r"\b(most expensive|priciest|highest[- ]priced|highest price)\b", re.IGNORECASE), "max", "price"),
+    (re.compile(r"\b(largest|biggest|most square feet|most space)\b", re.IGNORECASE), "max", "sqft"),
+    (re.compile(r"\b(smallest|least square feet)\b", re.IGNORECASE), "min", "sqft"),
+)
+# Words that carry no constraint of their own. Anything else left over once the
+# filters are parsed out ("in Houston", "with a pool", "nearby", "45 Maple Dr")
+# is a constraint the listings table cannot apply, so the LLM answers instead.
+FILLER = frozenset("""
+    a all an and any are at available be by can could currently do does for from get give
+    have has how i in is it list listed listings many me much number of on or please s
+    sale show some tell than that the there these this those to total what which with you
+""".split())
+
+
+@dataclass
+class ListingQuery:
+    # "list", "count", "avg", or "min" / "max" of ``field``
+    intent: str = "list"
+    field: str = "price"
+    min_price: int | None = None
+    max_price: int | None = None
+    min_beds: float | None = None
+    max_beds: float | None = None
+    min_baths: float | None = None
+    max_baths: float | None = None
+    min_sqft: int | None = None
+    max_sqft: int | None = None
+    limit: int = 5
+    # Scope from the request filters; listings are keyed by page URL
+    sources: Tuple[str, ...] = ()
+    domains: Tuple[str, ...] = ()
+
+    @property
+    def has_filters(self) -> bool:
+        return any(
+            v is not None for v in (
+                self.min_price, self.max_price, self.min_beds, self.max_beds,
+                self.min_baths, self.max_baths, self.min_sqft, self.max_sqft,
+            )
+        )
+
+
+def _is_upper(word: str) -> bool:
+    return re.fullmatch(_UPPER, word.strip(), re.IGNORECASE) is not None
+
+
+def parse_listing_query(question: str) -> ListingQuery | None:
+    """Recognise numeric / filter questions about listings; None means "ask the LLM".
+
+    Handles superlatives ("cheapest 3-bed"), counts ("how many homes under
+    $500k"), averages ("average price of 2 bedroom condos") and plain filtered
+    lists ("homes with at least 3 baths over 2,000 sq ft"). Questions about a
+    specific property ("how many bedrooms does 123 Elm St have") are not
+    matched, since they need the page text; neither are questions with any
+    constraint the filters cannot express ("in Houston", "with a pool"),
+    which would otherwise be answered over every listing.
+    """
+    q, rest = _parse(question)
+    if _unparsed(rest):
+        return None
+    if q.intent in ("count", "avg", "min", "max"):
+        return q
+    if q.has_filters and LISTING_WORDS.search(question):
+        return q
+    return None
+
+
+def _parse(question: str) -> Tuple[ListingQuery, str]:
+    """The filters a question states, and the text left once they are cut out."""
+    text = question
+    q = ListingQuery()
+
+    for pattern, intent, field in SUPERLATIVES:
+        match = pattern.search(text)
+        if match:
+            q.intent, q.field, q.limit = intent, field, 1
+            text = text.replace(match.group(0), " ")
+            break
+    match = COUNT.search(text)
+    if match:
+        q.intent = "count"
+        text = text.replace(match.group(0), " ")
+    average = AVERAGE.search(text)
+    if average:
+        q.intent = "avg"
+        q.field = "price" if average.group(2).lower() in ("price", "cost") else "sqft"
+        text = text.replace(average.group(0), " ")
+
+    # Square footage first, so "over 2,000 sq ft" is not read as a price
+    match = SQFT_RANGE.search(text)
+    if match:
+        q.min_sqft, q.max_sqft = int(match.group(1).replace(",", "")), int(match.group(2).replace(",", ""))
+        text = text.replace(match.group(0), " ")
+    for match in list(SQFT_BOUND.finditer(text)):
+        value = int(match.group(2).replace(",", ""))
+        if _is_upper(match.group(1)):
+            q.max_sqft = value
+        else:
+            q.min_sqft = value
+        text = text.replace(match.group(0), " ")
+
+    for match in list(ROOMS.finditer(text)):
+        qualifier, number, suffix, unit = match.groups()
+        value = float(number)
+        target = "baths" if unit.lower().startswith("bath") or unit.lower() == "ba" else "beds"
+        qualifier = (qualifier or "").strip().lower()
+        suffix = (suffix or "").lower()
+        if qualifier.startswith(("at least", "min")) or suffix in ("+", "or more"):
+            setattr(q, f"min_{target}", value)
+        elif qualifier.startswith(("at most", "max")) or suffix in ("or fewer", "or less"):
+            setattr(q, f"max_{target}", value)
+        else:
+            setattr(q, f"min_{target}", value)
+            setattr(q, f"max_{target}", value)
+        text = text.replace(match.group(0), " ")
+
+    match = PRICE_RANGE.search(text)
+    if match:
+        q.min_price = parse_money(match.group(1), match.group(2))
+        q.max_price = parse_money(match.group(3), match.group(4))
+        text = text.replace(match.group(0), " ")
+    else:
+        for match in list(PRICE_BOUND.finditer(text)):
+            amount, unit = match.group(2), match.group(3)
+            # Bare small numbers ("over 2") are not prices
+            if "$" not in match.group(0) and not unit and float(amount.replace(",", "")) < 10_000:
+                continue
+            value = parse_money(amount, unit)
+            if _is_upper(match.group(1)):
+                q.max_price = value
+            else:
+                q.min_price = value
+            text = text.replace(match.group(0), " ")
+
+    return q, LISTING_WORDS.sub(" ", text)
+
+
+def _unparsed(text: str) -> list:
+    return [w for w in re.findall(r"[a-z]+|\d+", text.lower()) if w not in FILLER]
+
+
+def question_entities(question: str) -> str:
+    """Signature of the specifics a question names: its filters, intent, places and other numbers.
+
+    Questions that embed almost identically can still differ here ("3-bed
+    homes in Austin under 400k" / "... in Houston ..."), so the semantic
+    answer cache only reuses an answer when the signatures are equal.
+    """
+    q, rest = _parse(question)
+    parts = {
+        f"{f.name}={getattr(q, f.name):g}" for f in fields(q)
+        if f.name.startswith(("min_", "max_")) and getattr(q, f.name) is not None
+    }
+    if q.intent != "list":
+        parts.add(f"{q.intent}:{q.field}")
+    parts.update(f"#{w}" for w in _unparsed(rest) if w.isdigit())
+    for match in PLACE.finditer(rest):
+        words = []
+        for word in re.findall(r"[a-z]+|\d+", match.group(1).lower()):
+            if word == "the" and not words:
+                continue
+            if word in FILLER:
+                break
+            words.append(word)
+        if words:
+            parts.add("@" + " ".join(words))
+    return "|".join(sorted(parts))
+
+
+def _money(value) -> str:
+    return f"${value:,.0f}" if value is not None else "price n/a"
+
+
+def _number(value) -> str:
+    return f"{value:g}" if value is not None else "?"
+
+
+def format_listing(listing: Listing) -> str:
+    parts = [_money(listing.price), f"{_number(listing.beds)} bd", f"{_number(listing.baths)} ba"]
+    if listing.sqft:
+        parts.append(f"{listing.sqft:,} sqft")
+    return f"{listing.address} - " + ", ".join(parts)
+
+
+def _sources(listings) -> str:
+    return ", ".join(dict.fromkeys(l.url for l in listings))
+
+
+def answer_listing_query(question: str, store, filters: SearchFilters | None = None) -> Tuple[str, str] | None:
+    """Answer a numeric / filter question from the listings table.
+
+    Returns (answer, sources) like the LLM path, or None when the question is
+    not one the router handles or no extracted listing matches (the page text
+    may still hold the answer, so the LLM gets a chance). Domain and source
+    filters scope the listings; filters the table cannot express (doc type,
+    owner, ingest time) send the question to the LLM path instead.
+    """
+    query = parse_listing_query(question)
+    if query is None:
+        return None
+    if filters is not None:
+        if filters.doc_types or filters.owner_id is not None or filters.ingested_after or filters.ingested_before:
+            return None
+        query.sources, query.domains = tuple(filters.sources), tuple(filters.domains)
+
+    if query.intent == "count":
+        n = store.count(query)
+        if n == 0:
+            return None
+        sample = store.search(replace(query, intent="list", limit=50))
+        return f"{n} listing{'s' if n != 1 else ''} match.", _sources(sample)
+
+    if query.intent == "avg":
+        value, n = store.average(query)
+        if not n:
+            return None
+        shown = _money(value) if query.field == "price" else f"{value:,.0f} sqft"
+        sample = store.search(replace(query, intent="list", limit=50))
+        label = "price" if query.field == "price" else "size"
+        return f"The average {label} across {n} matching listing{'s' if n != 1 else ''} is {shown}.", _sources(sample)
+
+    listings = store.search(query)
+    if not listings:
+        return None
+    if query.intent in ("min", "max"):
+        answer = format_listing(listings[0])
+    else:
+        answer = "\n".join(f"{i}. {format_listing(l)}" for i, l in enumerate(listings, start=1))
+    return answer, _sources(listings)
@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from env import (
+    RECRAWL_INTERVAL_SECONDS,
+    RECRAWL_MAX_AGE_SECONDS,
+    RECRAWL_MAX_CHUNKS_PER_CYCLE,
+    RECRAWL_MAX_URLS_PER_CYCLE,
+)
+from services.ingest_jobs import run_ingest
+from services.ingest_pipeline import IngestResult
+from services.url_manifest import due_for_recrawl
+
+logger = logging.getLogger(__name__)
+
+# URLs per pipeline run; the chunk budget is checked between runs
+RECRAWL_SLICE = 25
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class RecrawlScheduler:
+    """Background refresh of ingested pages that were last fetched more than ``max_age`` seconds ago.
+
+    Every ``interval`` seconds the stalest pages across all collections are run
+    through the ingest pipeline again, each in its owner's collection.
+    Conditional GETs and content hashes skip unchanged pages, changed pages only
+    re-embed the chunks that changed, and dead pages are tombstoned.
+
+    A cycle checks at most ``max_urls`` pages and stops starting new runs once
+    ``max_chunks`` chunks were re-embedded, so refresh cost stays bounded however
+    large the index grows. Pages left over are the stalest ones in the next cycle.
+    """
+
+    def __init__(
+        self,
+        interval: float = RECRAWL_INTERVAL_SECONDS,
+        max_age: float = RECRAWL_MAX_AGE_SECONDS,
+        max_urls: int = RECRAWL_MAX_URLS_PER_CYCLE,
+        max_chunks: int = RECRAWL_MAX_CHUNKS_PER_CYCLE,
+        runner: Callable[..., IngestResult] = run_ingest,
+        due: Callable = due_for_recrawl,
+    ):
+        self.interval = interval
+        self.max_age = max_age
+        self.max_urls = max_urls
+        self.max_chunks = max_chunks
+        self._runner = runner
+        self._due = due
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "cycles": 0,
+            "checked": 0,
+            "unchanged": 0,
+            "updated": 0,
+            "gone": 0,
+            "failed": 0,
+            "chunks_embedded": 0,
+            "chunks_deleted": 0,
+        }
+        self._last_cycle: dict | None = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="recrawl", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=timeout)
+                self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_cycle()
+            except Exception:
+                logger.exception("Re-crawl cycle failed")
+
+    def run_cycle(self) -> dict:
+        """Refresh the stalest pages within the cycle budget and return what happened."""
+        started_at, started = _now(), time.monotonic()
+        due = self._due(started_at - timedelta(seconds=self.max_age), self.max_urls)
+        cycle = {key: 0 for key in self._stats if key != "cycles"}
+        cycle["due"] = len(due)
+        # Owners in order of their stalest page, each owner's pages stalest first,
+        # so all of an owner's due pages share pipeline runs however they interleave
+        by_owner: Dict[int | None, List[str]] = {}
+        for owner_id, url in due:
+            by_owner.setdefault(owner_id, []).append(url)
+        for owner_id, urls in by_owner.items():
+            for i in range(0, len(urls), RECRAWL_SLICE):
+                if self._stop.is_set() or cycle["chunks_embedded"] >= self.max_chunks:
+                    break
+                result = self._runner(urls[i:i + RECRAWL_SLICE], should_cancel=self._stop.is_set, owner_id=owner_id)
+                self._tally(cycle, result)
+        cycle["deferred"] = cycle["due"] - cycle["checked"]
+        cycle["started_at"] = started_at.isoformat()
+        cycle["seconds"] = round(time.monotonic() - started, 3)
+        with self._lock:
+            self._stats["cycles"] += 1
+            for key, value in cycle.items():
+                if key in self._stats:
+                    self._stats[key] += value
+            self._last_cycle = cycle
+        if due:
+            logger.info(
+                "Re-crawl checked %d of %d due pages: %d updated, %d gone, %d chunks re-embedded",
+                cycle["checked"], cycle["due"], cycle["updated"], cycle["gone"], cycle["chunks_embedded"],
+            )
+        return cycle
+
+    @staticmethod
+    def _tally(cycle: dict, result: IngestResult):
+        for r in result.results.values():
+            cycle["checked"] += 1
+            cycle["chunks_deleted"] += r.deleted
+            if r.gone:
+                cycle["gone"] += 1
+            elif r.error is not None:
+                cycle["failed"] += 1
+            elif r.unchanged:
+                cycle["unchanged"] += 1
+            else:
+                cycle["updated"] += 1
+                cycle["chunks_embedded"] += r.chunks
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.interval > 0,
+                "running": self._thread is not None,
+                "interval_seconds": self.interval,
+                "max_age_seconds": self.max_age,
+                "budget": {"urls": self.max_urls, "chunks": self.max_chunks},
+                **self._stats,
+                "last_cycle": dict(self._last_cycle) if self._last_cycle is not None else None,
+            }
+
+
+recrawl_scheduler = RecrawlScheduler()
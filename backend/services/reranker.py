@@ -0,0 +1,161 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from env import (
+    RERANK_BATCH_SIZE,
+    RERANK_DEVICE,
+    RERANK_MIN_SCORE,
+    RERANK_MODEL,
+    RERANK_RELATIVE_CUTOFF,
+)
+from services.embedding_service import detect_device
+from services.retrieval import Hit
+
+logger = logging.getLogger(__name__)
+
+# Recent per-query timings kept for the latency percentiles
+_LATENCY_WINDOW = 1000
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class RerankOutcome:
+    hits: List[Hit]
+    candidates: int
+    latency_ms: float
+    top_score: float
+
+
+class Reranker:
+    """Cross-encoder re-ranking of fused retrieval candidates.
+
+    Scores (query, chunk) pairs in batches and keeps at most ``top_k`` hits.
+    The adaptive cut-off drops candidates scoring below ``min_score`` or below
+    ``relative_cutoff`` times the best score, so a query with one clearly
+    relevant chunk sends one chunk instead of padding the prompt to ``top_k``.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL,
+        batch_size: int = RERANK_BATCH_SIZE,
+        device: str | None = RERANK_DEVICE,
+        min_score: float = RERANK_MIN_SCORE,
+        relative_cutoff: float = RERANK_RELATIVE_CUTOFF,
+        model=None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device or detect_device()
+        self.min_score = min_score
+        self.relative_cutoff = relative_cutoff
+        self._model = model
+        # Whether the model returns logits rather than probabilities; None until known
+        self._logits: bool | None = None
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.queries = 0
+        self.candidates = 0
+        self.kept = 0
+        self.cut_early = 0
+        self.top1_changed = 0
+        self.top_score_sum = 0.0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    logger.info("Loading re-rank model %s on %s", self.model_name, self.device)
+                    self._model = CrossEncoder(self.model_name, device=self.device)
+        return self._model
+
+    def _returns_logits(self, raw: Sequence[float]) -> bool:
+        """Decided per model (never per value, which would not be monotonic).
+
+        Sentence-transformers cross-encoders expose their output activation;
+        other models count as logit models once any score falls outside [0, 1].
+        """
+        if self._logits is None:
+            activation = getattr(self.model, "activation_fn", None)
+            if activation is not None:
+                self._logits = type(activation).__name__ != "Sigmoid"
+        if not self._logits and any(not 0.0 <= v <= 1.0 for v in raw):
+            self._logits = True
+        return bool(self._logits)
+
+    def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        """Relevance probabilities in [0, 1] for each text."""
+        if not texts:
+            return []
+        # Longest-first keeps similarly sized pairs in a batch, like the embedder does
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        raw = self.model.predict(
+            [(query, texts[i]) for i in order],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        raw = [float(value) for value in raw]
+        if self._returns_logits(raw):
+            # Models without a sigmoid head return logits; map the whole batch the same way
+            raw = [1.0 / (1.0 + math.exp(-value)) for value in raw]
+        scores = [0.0] * len(texts)
+        for i, value in zip(order, raw):
+            scores[i] = value
+        return scores
+
+    def rerank(self, query: str, hits: Sequence[Hit], top_k: int) -> RerankOutcome:
+        started = time.perf_counter()
+        scores = self.score(query, [h.text for h in hits])
+        ranked = sorted(zip(hits, scores), key=lambda pair: pair[1], reverse=True)
+
+        kept: List[Hit] = []
+        top_score = ranked[0][1] if ranked else 0.0
+        floor = max(self.min_score, top_score * self.relative_cutoff)
+        for hit, score in ranked[:top_k]:
+            # Always keep the best hit so the LLM has something to say "I don't know" about
+            if kept and score < floor:
+                break
+            kept.append(Hit(id=hit.id, text=hit.text, metadata=hit.metadata, score=score))
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.queries += 1
+            self.candidates += len(hits)
+            self.kept += len(kept)
+            self.cut_early += len(kept) < min(top_k, len(hits))
+            self.top1_changed += bool(kept) and kept[0].id != hits[0].id
+            self.top_score_sum += top_score
+            self._latencies.append(latency_ms)
+        return RerankOutcome(hits=kept, candidates=len(hits), latency_ms=latency_ms, top_score=top_score)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            queries = self.queries
+            return {
+                "model": self.model_name,
+                "device": self.device,
+                "queries": queries,
+                "avg_candidates": round(self.candidates / queries, 2) if queries else 0.0,
+                "avg_kept": round(self.kept / queries, 2) if queries else 0.0,
+                "early_cutoff_rate": round(self.cut_early / queries, 4) if queries else 0.0,
+                "top1_changed_rate": round(self.top1_changed / queries, 4) if queries else 0.0,
+                "avg_top_score": round(self.top_score_sum / queries, 4) if queries else 0.0,
+                "latency_ms_p50": round(_percentile(latencies, 0.5), 2),
+                "latency_ms_p95": round(_percentile(latencies, 0.95), 2),
+            }
@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from services.keyword_index import reciprocal_rank_fusion
+from services.metadata_filters import SearchFilters
+
+
+@dataclass
+class Hit:
+    id: str
+    text: str
+    metadata: dict = field(default_factory=dict)
+    score: float = 0.0
+
+
+def vector_search(vector_store, query_embedding, n_results: int, filters: SearchFilters | None = None) -> List[Hit]:
+    # Filters are pushed down as a ``where`` clause so the store only scores chunks in scope
+    where = filters.to_where() if filters is not None else None
+    qres = vector_store.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+    if not qres:
+        return []
+    # Results are lists per query; we used a single query so index 0
+    ids = qres.get("ids", [[]])[0]
+    docs = qres.get("documents", [[]])[0]
+    metadatas = qres.get("metadatas", [[]])[0] or [{}] * len(ids)
+    distances = (qres.get("distances") or [[]])[0] or [0.0] * len(ids)
+    return [
+        Hit(id=i, text=d, metadata=md or {}, score=-dist)
+        for i, d, md, dist in zip(ids, docs, metadatas, distances)
+    ]
+
+
+def keyword_search(keyword_index, query: str, n_results: int, filters: SearchFilters | None = None) -> List[Hit]:
+    if keyword_index is None:
+        return []
+    return [Hit(id=i, text=t, metadata=md, score=s) for i, s, t, md in keyword_index.search(query, n_results, filters)]
+
+
+def fuse(rankings: Sequence[List[Hit]], n_results: int) -> List[Hit]:
+    """Reciprocal-rank fusion of several ranked hit lists, keeping the first copy of each chunk."""
+    by_id: Dict[str, Hit] = {}
+    for ranking in rankings:
+        for hit in ranking:
+            by_id.setdefault(hit.id, hit)
+    fused = reciprocal_rank_fusion([[h.id for h in ranking] for ranking in rankings])
+    results = []
+    for chunk_id, score in fused[:n_results]:
+        hit = by_id[chunk_id]
+        results.append(Hit(id=hit.id, text=hit.text, metadata=hit.metadata, score=score))
+    return results
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TenantStore:
+    owner_id: int | None
+    vector_store: Any
+    keyword_index: Any = None
+
+
+def tenant_keyword_path(path: str, owner_id: int) -> str:
+    """keyword_index.sqlite3 -> keyword_index_user_42.sqlite3"""
+    root, ext = os.path.splitext(path)
+    return f"{root}_user_{owner_id}{ext or '.sqlite3'}"
+
+
+class TenantStores:
+    """Per-user vector collections and keyword indexes.
+
+    A signed-in user's documents live in their own collection
+    (``<collection>_user_<id>``) and their own keyword index file, so a query
+    only ever scans that user's data. Handles are opened lazily on first use
+    and kept in an LRU of at most ``max_open``; evicted handles have their
+    keyword index closed (bounding open files) and are reopened later. Anonymous requests (``owner_id=None``) use the shared
+    collection, as before.
+    """
+
+    def __init__(
+        self,
+        shared_store,
+        shared_keyword_index=None,
+        keyword_index_path: str | None = None,
+        enabled: bool = True,
+        max_open: int = 64,
+        max_chunks: int = 0,
+    ):
+        self.shared = TenantStore(None, shared_store, shared_keyword_index)
+        self.keyword_index_path = keyword_index_path
+        self.enabled = enabled
+        self.max_open = max_open
+        self.max_chunks = max_chunks
+        self._open: "OrderedDict[int, TenantStore]" = OrderedDict()
+        self._quota_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+
+    def collection_name(self, owner_id: int) -> str:
+        return f"{self.shared.vector_store.collection.name}_user_{owner_id}"
+
+    def _open_store(self, owner_id: int) -> TenantStore:
+        from services.keyword_index import KeywordIndex
+
+        vector_store = self.shared.vector_store.collection_for(self.collection_name(owner_id))
+        keyword_index = None
+        if self.keyword_index_path:
+            keyword_index = KeywordIndex(tenant_keyword_path(self.keyword_index_path, owner_id))
+        logger.info("Opened collection for user %s", owner_id)
+        return TenantStore(owner_id, vector_store, keyword_index)
+
+    def get(self, owner_id: int | None) -> TenantStore:
+        if owner_id is None or not self.enabled:
+            return self.shared
+        with self._lock:
+            store = self._open.get(owner_id)
+            if store is not None:
+                self._open.move_to_end(owner_id)
+                return store
+        # Open outside the lock: creating a collection is a network round-trip on cloud
+        store = self._open_store(owner_id)
+        with self._lock:
+            existing = self._open.get(owner_id)
+            if existing is not None:
+                self._open.move_to_end(owner_id)
+                return existing
+            self._open[owner_id] = store
+            self.opened += 1
+            evicted = []
+            while len(self._open) > self.max_open:
+                evicted.append(self._open.popitem(last=False)[1])
+                self.evicted += 1
+        for old in evicted:
+            # A request still holding the handle transparently reopens the file
+            if old.keyword_index is not None:
+                old.keyword_index.close()
+        return store
+
+    def remaining_quota(self, owner_id: int | None) -> int | None:
+        """Chunks the tenant may still add; None when unlimited (shared collection or no quota)."""
+        if owner_id is None or not self.enabled or self.max_chunks <= 0:
+            return None
+        return max(0, self.max_chunks - self.get(owner_id).vector_store.count())
+
+    @contextmanager
+    def reserve_quota(self, owner_id: int | None) -> Iterator[int | None]:
+        """Yield the tenant's remaining quota, holding their lock until the writes are done.
+
+        Ingest runs read the quota and then spend it; without the lock two jobs
+        of one user (INGEST_JOB_WORKERS > 1) would each spend the full amount.
+        Unlimited tenants are not serialized.
+        """
+        if self.remaining_quota(owner_id) is None:
+            yield None
+            return
+        with self._lock:
+            lock = self._quota_locks.setdefault(owner_id, threading.Lock())
+        with lock:
+            yield self.remaining_quota(owner_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "open_collections": len(self._open),
+                "max_open": self.max_open,
+                "max_chunks_per_user": self.max_chunks,
+                "opened": self.opened,
+                "evicted": self.evicted,
+            }
@@ -0,0 +1,136 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from database.postgresdb import SessionLocal
+from models.ingest_model import urlManifestSchema
+from services.document_loader import UPLOAD_SCHEME
+
+
+@dataclass
+class ManifestEntry:
+    url: str
+    content_hash: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+def _to_entry(row: urlManifestSchema) -> ManifestEntry:
+    return ManifestEntry(
+        url=row.url,
+        content_hash=row.content_hash,
+        etag=row.etag,
+        last_modified=row.last_modified,
+        chunk_ids=json.loads(row.chunk_ids or "[]"),
+    )
+
+
+class UrlManifest:
+    """Per-URL record of what is currently indexed: content hash, HTTP validators and chunk ids.
+
+    Scoped to one collection: ``owner_id`` for a user's own collection, None for
+    the shared one, so the same URL ingested by two users is tracked twice.
+    """
+
+    def __init__(self, session_factory=SessionLocal, owner_id: int | None = None):
+        self._session_factory = session_factory
+        self.owner_id = owner_id
+
+    def _scoped(self, db):
+        owner = urlManifestSchema.owner_id
+        return db.query(urlManifestSchema).filter(owner.is_(None) if self.owner_id is None else owner == self.owner_id)
+
+    def get_many(self, urls: List[str]) -> Dict[str, ManifestEntry]:
+        if not urls:
+            return {}
+        with self._session_factory() as db:
+            rows = self._scoped(db).filter(urlManifestSchema.url.in_(urls)).all()
+            return {row.url: _to_entry(row) for row in rows}
+
+    def record(self, entry: ManifestEntry):
+        for attempt in range(2):
+            with self._session_factory() as db:
+                row = self._scoped(db).filter(urlManifestSchema.url == entry.url).first()
+                if row is None:
+                    row = urlManifestSchema(url=entry.url, owner_id=self.owner_id)
+                    db.add(row)
+                row.content_hash = entry.content_hash
+                row.etag = entry.etag
+                row.last_modified = entry.last_modified
+                row.chunk_ids = json.dumps(entry.chunk_ids)
+                row.chunk_count = len(entry.chunk_ids)
+                row.last_fetched_at = datetime.now(timezone.utc)
+                row.fetch_failures = 0
+                row.gone_at = None
+                try:
+                    db.commit()
+                    return
+                except IntegrityError:
+                    # A concurrent record() inserted the row first; update that one instead
+                    db.rollback()
+                    if attempt:
+                        raise
+
+    def touch(self, url: str, etag: str | None = None, last_modified: str | None = None):
+        """Mark an unchanged page as freshly checked, keeping any newer validators."""
+        with self._session_factory() as db:
+            row = self._scoped(db).filter(urlManifestSchema.url == url).first()
+            if row is None:
+                return
+            row.etag = etag or row.etag
+            row.last_modified = last_modified or row.last_modified
+            row.last_fetched_at = datetime.now(timezone.utc)
+            row.fetch_failures = 0
+            db.commit()
+
+    def mark_failed(self, url: str) -> int:
+        """Count a failed fetch of a tracked page; returns its consecutive failures (0 if untracked).
+
+        The page still counts as checked, so the re-crawl moves on to others.
+        """
+        with self._session_factory() as db:
+            row = self._scoped(db).filter(urlManifestSchema.url == url).first()
+            if row is None:
+                return 0
+            row.fetch_failures = (row.fetch_failures or 0) + 1
+            row.last_fetched_at = datetime.now(timezone.utc)
+            db.commit()
+            return row.fetch_failures
+
+    def tombstone(self, url: str):
+        """Record that a page is gone and none of its chunks are stored any more."""
+        with self._session_factory() as db:
+            row = self._scoped(db).filter(urlManifestSchema.url == url).first()
+            if row is None:
+                return
+            row.content_hash = row.etag = row.last_modified = None
+            row.chunk_ids = "[]"
+            row.chunk_count = 0
+            row.gone_at = row.last_fetched_at = datetime.now(timezone.utc)
+            db.commit()
+
+
+def due_for_recrawl(older_than: datetime, limit: int, session_factory=SessionLocal) -> List[tuple]:
+    """(owner_id, url) of live pages last fetched before ``older_than``, stalest first, across all collections.
+
+    Uploaded documents are not re-fetched: their content never changes.
+    """
+    with session_factory() as db:
+        fetched = urlManifestSchema.last_fetched_at
+        rows = (
+            db.query(urlManifestSchema.owner_id, urlManifestSchema.url)
+            .filter(
+                urlManifestSchema.gone_at.is_(None),
+                ~urlManifestSchema.url.like(f"{UPLOAD_SCHEME}://%"),
+                or_(fetched.is_(None), fetched < older_than),
+            )
+            .order_by(fetched.is_(None).desc(), fetched, urlManifestSchema.id)
+            .limit(limit)
+            .all()
+        )
+        return [(owner_id, url) for owner_id, url in rows]
@@ -0,0 +1,304 @@
+import asyncio
+import csv
+import io
+import json
+import multiprocessing
+import threading
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database.postgresdb import AsyncSessionLocal, SessionLocal, async_url
+from env import BCRYPT_ROUNDS, DB_URL, USER_IMPORT_BATCH_SIZE, USER_IMPORT_MAX_ROWS, USER_IMPORT_WORKERS
+from models.user_model import EMAIL_REGEX, userImportJobSchema, userSchema
+from services import hash_worker
+
+logger = logging.getLogger(__name__)
+
+# Passwords per task sent to a hashing process
+HASH_CHUNK = 16
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+@dataclass
+class ImportRow:
+    row: int  # 1-based position in the input (data rows for CSV)
+    email: str
+    password: str
+    username: str = ""
+    lastname: str = ""
+
+
+@dataclass
+class RowResult:
+    row: int
+    email: str | None
+    status: str  # created / exists / duplicate / invalid
+    id: int | None = None
+    error: str | None = None
+
+
+def _records(data: bytes, fmt: str) -> List[dict]:
+    text = data.decode("utf-8-sig")
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or not {"email", "password"} <= {f.strip().lower() for f in reader.fieldnames}:
+            raise ValueError("CSV needs a header row with at least email and password columns")
+        return [{(k or "").strip().lower(): v for k, v in record.items()} for record in reader]
+    if fmt == "json":
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(payload, dict):
+            payload = payload.get("users")
+        if not isinstance(payload, list):
+            raise ValueError('JSON must be a list of users or {"users": [...]}')
+        return payload
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def parse_users(data: bytes, fmt: str, max_rows: int = USER_IMPORT_MAX_ROWS) -> tuple:
+    """(rows to import, results for rows rejected up front) from a CSV or JSON body.
+
+    Raises ValueError when the body itself cannot be read.
+    """
+    records = _records(data, fmt)
+    if len(records) > max_rows:
+        raise ValueError(f"Import has {len(records)} rows, the limit is {max_rows}")
+    rows, rejected = [], []
+    for number, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            rejected.append(RowResult(number, None, "invalid", error="Row is not an object"))
+            continue
+        email = str(record.get("email") or "").strip().lower()
+        password = str(record.get("password") or "")
+        if not EMAIL_REGEX.match(email):
+            rejected.append(RowResult(number, email or None, "invalid", error="Invalid email format"))
+        elif not password:
+            rejected.append(RowResult(number, email, "invalid", error="Password is required"))
+        else:
+            rows.append(ImportRow(
+                row=number,
+                email=email,
+                password=password,
+                username=str(record.get("username") or "").strip(),
+                lastname=str(record.get("lastname") or "").strip(),
+            ))
+    return rows, rejected
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _hash_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the server process runs threads, which forking does not copy safely
+            _pool = ProcessPoolExecutor(max_workers=USER_IMPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def hash_all(passwords: List[str], rounds: int = BCRYPT_ROUNDS) -> List[str]:
+    """bcrypt hashes of ``passwords`` in order, computed across the import process pool."""
+    if not passwords:
+        return []
+    pool = _hash_pool()
+    chunks = [passwords[i:i + HASH_CHUNK] for i in range(0, len(passwords), HASH_CHUNK)]
+    hashed = await asyncio.gather(*(asyncio.wrap_future(pool.submit(hash_worker.hash_passwords, c, rounds)) for c in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def _existing_emails(db, emails: List[str]) -> set:
+    found = set()
+    for i in range(0, len(emails), 500):
+        result = await db.execute(select(userSchema.email).where(userSchema.email.in_(emails[i:i + 500])))
+        found.update(result.scalars())
+    return found
+
+
+async def import_users(
+    rows: List[ImportRow],
+    rejected: List[RowResult] | None = None,
+    session_factory=AsyncSessionLocal,
+    rounds: int = BCRYPT_ROUNDS,
+    batch_size: int = USER_IMPORT_BATCH_SIZE,
+) -> dict:
+    """Create accounts for ``rows``; returns counts and one result per input row.
+
+    Emails repeated within the input are imported once; emails already
+    registered are skipped before hashing, and any registered concurrently
+    are caught by ON CONFLICT DO NOTHING. Each batch is one multi-row INSERT
+    and one commit.
+    """
+    started = time.perf_counter()
+    results: Dict[int, RowResult] = {r.row: r for r in rejected or []}
+    unique: Dict[str, ImportRow] = {}
+    for row in rows:
+        if row.email in unique:
+            results[row.row] = RowResult(row.row, row.email, "duplicate", error=f"Same email as row {unique[row.email].row}")
+        else:
+            unique[row.email] = row
+
+    async with session_factory() as db:
+        existing = await _existing_emails(db, list(unique))
+    for email in existing:
+        row = unique.pop(email)
+        results[row.row] = RowResult(row.row, email, "exists")
+    pending = list(unique.values())
+    # No connection is held while hashing, which dominates the import time
+    hashes = await hash_all([row.password for row in pending], rounds)
+
+    async with session_factory() as db:
+        insert = _INSERTS[db.get_bind().dialect.name]
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            statement = (
+                insert(userSchema)
+                .values([
+                    {"email": row.email, "password": hashed, "username": row.username, "lastname": row.lastname}
+                    for row, hashed in zip(batch, hashes[i:i + batch_size])
+                ])
+                .on_conflict_do_nothing(index_elements=["email"])
+                .returning(userSchema.id, userSchema.email)
+            )
+            created = {email: user_id for user_id, email in (await db.execute(statement)).all()}
+            await db.commit()
+            for row in batch:
+                if row.email in created:
+                    results[row.row] = RowResult(row.row, row.email, "created", id=created[row.email])
+                else:
+                    results[row.row] = RowResult(row.row, row.email, "exists")
+
+    ordered = [asdict(results[n]) for n in sorted(results)]
+    summary = {status: 0 for status in ("created", "exists", "duplicate", "invalid")}
+    for result in ordered:
+        summary[result["status"]] += 1
+    return {"total": len(ordered), **summary, "seconds": round(time.perf_counter() - started, 3), "results": ordered}
+
+
+def run_import_job(rows: List[ImportRow], rejected: List[RowResult] | None = None) -> dict:
+    """import_users() on its own event loop, for a background job thread.
+
+    The shared async engine's pooled connections belong to the server's event
+    loop, so the job opens an unpooled engine of its own.
+    """
+    async def run():
+        engine = create_async_engine(async_url(DB_URL), poolclass=NullPool)
+        try:
+            return await import_users(rows, rejected, session_factory=async_sessionmaker(bind=engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class ImportJobs:
+    """Bulk imports run in the background, one at a time, tracked in ``user_import_jobs``.
+
+    Imports are serialized so concurrent submissions queue up instead of each
+    taking the whole hashing pool. Their input (plaintext passwords included)
+    is held in memory only, never written to the job table, so an import that
+    has not finished when the process stops is failed rather than resumed.
+    """
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._unfinished: set = set()
+        self._lock = threading.Lock()
+
+    def submit(self, rows: List[ImportRow], rejected: List[RowResult], submitted_by: int | None = None) -> str:
+        job_id = str(uuid4())
+        with SessionLocal() as db:
+            db.add(userImportJobSchema(
+                id=job_id, status="queued", submitted_by=submitted_by, total_rows=len(rows) + len(rejected),
+            ))
+            db.commit()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-import")
+            self._unfinished.add(job_id)
+            self._executor.submit(self._run, job_id, rows, rejected)
+        return job_id
+
+    def _update(self, job_id: str, **values):
+        with SessionLocal() as db:
+            db.execute(update(userImportJobSchema).where(userImportJobSchema.id == job_id).values(**values))
+            db.commit()
+
+    def _run(self, job_id: str, rows: List[ImportRow], rejected: List[RowResult]):
+        self._update(job_id, status="running", started_at=_now())
+        status, error, result = "completed", None, None
+        try:
+            summary = run_import_job(rows, rejected)
+            result = json.dumps(summary)
+            logger.info(
+                "User import %s: %d created, %d existing, %d invalid",
+                job_id, summary["created"], summary["exists"], summary["invalid"],
+            )
+        except Exception as e:
+            logger.exception("User import %s failed", job_id)
+            status, error = "failed", str(e)
+        self._update(job_id, status=status, error=error, result=result, finished_at=_now())
+        with self._lock:
+            self._unfinished.discard(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with SessionLocal() as db:
+            job = db.get(userImportJobSchema, job_id)
+            if job is None:
+                return None
+            return {
+                "job_id": job.id,
+                "status": job.status,
+                "submitted_by": job.submitted_by,
+                "total_rows": job.total_rows,
+                "error": job.error,
+                "result": json.loads(job.result) if job.result else None,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+
+    def stop(self):
+        """Drop queued imports and mark every unfinished one failed; the file has to be submitted again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            unfinished, self._unfinished = list(self._unfinished), set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if unfinished:
+            with SessionLocal() as db:
+                db.execute(
+                    update(userImportJobSchema)
+                    .where(userImportJobSchema.id.in_(unfinished), userImportJobSchema.status.in_(("queued", "running")))
+                    .values(status="failed", error="Interrupted by a shutdown; submit the file again", finished_at=_now())
+                )
+                db.commit()
+
+
+import_jobs = ImportJobs()
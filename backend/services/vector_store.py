@@ -0,0 +1,117 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_BACKENDS = ("cloud", "local", "memory")
+
+
+class VectorStore(ABC):
+    """Interface the ingest and query paths rely on.
+
+    Mirrors the subset of the Chroma collection API the app uses, so a backend
+    only has to provide upsert / query / get / delete / count / collection_for
+    with Chroma's argument names and result shapes. A backend missing any of
+    them fails when it is constructed.
+    """
+
+    backend = "abstract"
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[dict],
+        embeddings: Sequence[Sequence[float]] | None = None,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 5,
+        where: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get(self, ids: List[str] | None = None, where: Dict[str, Any] | None = None, include=None) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def delete(self, ids: List[str] | None = None, where: Dict[str, Any] | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def collection_for(self, name: str) -> "VectorStore":
+        """Open (creating if needed) another collection on the same backend."""
+
+
+class ChromaVectorStore(VectorStore):
+    """Adapter over a Chroma collection; the client decides where the index lives."""
+
+    def __init__(self, collection, backend: str, client=None):
+        self.collection = collection
+        self.backend = backend
+        self.client = client
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def query(self, query_embeddings, n_results=5, where=None):
+        kwargs = {"where": where} if where else {}
+        return self.collection.query(query_embeddings=query_embeddings, n_results=n_results, **kwargs)
+
+    def get(self, ids=None, where=None, include=None):
+        kwargs = {"include": include} if include is not None else {}
+        return self.collection.get(ids=ids, where=where, **kwargs)
+
+    def delete(self, ids=None, where=None):
+        self.collection.delete(ids=ids, where=where)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def collection_for(self, name: str) -> "ChromaVectorStore":
+        collection = self.client.get_or_create_collection(name=name, embedding_function=None)
+        return ChromaVectorStore(collection, self.backend, self.client)
+
+
+def _chroma_client(cfg: dict):
+    import chromadb
+
+    backend = cfg["backend"]
+    if backend == "cloud":
+        if not (cfg["api_key"] and cfg["tenant"] and cfg["database"]):
+            raise Exception("Chroma Cloud environment variables are not configured.")
+        return chromadb.CloudClient(
+            api_key=cfg["api_key"],
+            tenant=cfg["tenant"],
+            database=cfg["database"],
+        )
+    if backend == "local":
+        # Embedded, on-disk HNSW index: no network hop per query
+        return chromadb.PersistentClient(path=cfg["persist_path"])
+    if backend == "memory":
+        return chromadb.EphemeralClient()
+    raise Exception(f"Unknown VECTOR_STORE_BACKEND '{backend}'. Expected one of: {', '.join(VECTOR_STORE_BACKENDS)}")
+
+
+def create_vector_store(cfg: dict) -> VectorStore:
+    """Build the configured backend. ``cfg`` comes from the component registry."""
+    client = _chroma_client(cfg)
+    # Vectors always come from the EmbeddingService, so the collection is not
+    # bound to an embedding function of its own.
+    collection = client.get_or_create_collection(
+        name=cfg["collection"],
+        embedding_function=None,
+    )
+    logger.info("Vector store ready: %s backend, collection %s", cfg["backend"], cfg["collection"])
+    return ChromaVectorStore(collection, cfg["backend"], client)
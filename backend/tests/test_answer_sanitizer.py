@@ -0,0 +1,31 @@
+import sys
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.answer_sanitizer import StreamingSanitizer, sanitize_answer
+
+
+def stream(tokens):
+    sanitizer = StreamingSanitizer()
+    emitted = [sanitizer.feed(t) for t in tokens]
+    emitted.append(sanitizer.finish())
+    return emitted
+
+
+def test_streaming_matches_batch_sanitizer():
+    text = "Final Answer: The 3-bed on Elm St is listed at $450,000.\nSOURCES: https://a.example.com"
+    tokens = [text[i:i + 3] for i in range(0, len(text), 3)]
+    emitted = stream(tokens)
+
+    assert "".join(emitted) == sanitize_answer(text) == "The 3-bed on Elm St is listed at $450,000."
+    # Text is released before the stream ends, not buffered until finish()
+    assert any(emitted[:-1])
+
+
+def test_streaming_without_markers_passes_text_through():
+    text = "Prices rose 4% year over year."
+    assert "".join(stream([w + " " for w in text.split(" ")])) == text
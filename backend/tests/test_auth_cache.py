@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import pathlib
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# Ensure required env vars before importing app
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "testsecret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_EXPIRATION_TIME", "60")  # minutes
+os.environ.setdefault("DEV_PORT", "http://testclient")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import app
+from database.postgresdb import async_engine, engine
+from services.auth_cache import TtlLruCache, token_cache
+
+
+def signed_in_client(password: str = "TestPass123!") -> TestClient:
+    client = TestClient(app)
+    payload = {
+        "username": "user" + uuid.uuid4().hex[:6],
+        "lastname": "ln" + uuid.uuid4().hex[:6],
+        "email": f"cache{uuid.uuid4().hex[:6]}@example.com",
+        "password": password,
+    }
+    assert client.post("/auth/register", json=payload).status_code == 201
+    login = client.post("/auth/login", data={"username": payload["email"], "password": password})
+    assert login.status_code == 200
+    return client
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", self)
+
+
+def test_repeat_requests_skip_the_users_lookup():
+    client = signed_in_client()
+    assert client.get("/users/me").status_code == 200
+    hits = token_cache.hits
+
+    with QueryCounter() as queries:
+        for _ in range(5):
+            me = client.get("/users/me")
+            assert me.status_code == 200
+    assert queries.count == 0
+    assert token_cache.hits >= hits + 5
+    assert "password" not in me.json()
+
+
+def test_password_change_revokes_old_tokens_at_once():
+    client = signed_in_client("OldPass123!")
+    me = client.get("/users/me")
+    assert me.status_code == 200
+
+    change = {"current_password": "OldPass123!", "new_password": "NewPass456!", "new_password_confirm": "NewPass456!"}
+    assert client.put("/users/change-password", json=change).status_code == 200
+    # The old token is still cached as valid, but no longer matches the password
+    assert client.get("/users/me").status_code == 401
+
+    login = client.post("/auth/login", data={"username": me.json()["email"], "password": "NewPass456!"})
+    assert login.status_code == 200
+    assert client.get("/users/me").status_code == 200
+
+
+def test_deleted_user_token_stops_working():
+    client = signed_in_client()
+    assert client.get("/users/me").status_code == 200
+    assert client.delete("/users/").status_code == 204
+    assert client.get("/users/me").status_code == 401
+
+
+def test_ttl_lru_cache_expires_and_evicts():
+    cache = TtlLruCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+    cache.put("short", 4, ttl_seconds=0.05)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    cache.invalidate("c")
+    assert cache.get("c") is None
+    assert cache.stats()["invalidations"] == 1
@@ -118,4 +118,34 @@ def test_change_password_mismatch():
         "new_password_confirm": "DifferentPass!",
     }
     ch = client.put("/users/change-password", json=change_payload, cookies=cookies)
-    assert ch.status_code == 400
\ No newline at end of file
+    assert ch.status_code == 400
+
+def test_optional_auth_rejects_a_bad_token_instead_of_going_anonymous():
+    anonymous = TestClient(app)
+    assert anonymous.get("/process/jobs/missing-job").status_code == 404
+
+    expired = TestClient(app, cookies={"access_token": "not-a-valid-token"})
+    r = expired.get("/process/jobs/missing-job")
+    assert r.status_code == 401
+    assert r.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_internal_stats_and_reload_are_for_operators(monkeypatch):
+    import controller.auth_controller as auth_controller
+
+    own = TestClient(app)
+    routes = ["/process/db/stats", "/process/fetch/stats", "/process/recrawl/stats", "/auth/hasher/stats"]
+    for route in routes:
+        assert own.get(route).status_code == 401
+
+    payload = unique_user_payload()
+    assert own.post("/auth/register", json=payload).status_code == 201
+    assert own.post("/auth/login", data={"username": payload["email"], "password": payload["password"]}).status_code == 200
+    # Anyone can register, so a signed-in account alone is not enough
+    for route in routes:
+        assert own.get(route).status_code == 403
+    assert own.post("/process/reload").status_code == 403
+
+    monkeypatch.setattr(auth_controller, "USER_IMPORT_ADMIN_EMAILS", frozenset({payload["email"]}))
+    for route in routes:
+        assert own.get(route).status_code == 200
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import pathlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from langchain_core.documents import Document
+
+from services.chunker import StructuredChunker
+from services.context_builder import TokenCounter
+from services.ingest_pipeline import Chunk, FetchedPage, IngestPipeline
+
+COUNTER = TokenCounter("")
+
+PAGE = """123 Elm St, Austin, TX 78701
+Lovely craftsman close to downtown with a big yard. The kitchen was renovated in 2021 and the roof is new.
+Price: $450,000
+3 Beds
+2 Baths
+
+Features
+- Hardwood floors throughout
+- Two car garage with storage
+- Fenced back yard with mature oak trees
+- Solar panels on the south roof
+
+Schools
+Great schools nearby, all within walking distance of the house."""
+
+
+def chunker(max_tokens, overlap=0):
+    return StructuredChunker(max_tokens=max_tokens, overlap_tokens=overlap, counter=COUNTER)
+
+
+def test_chunks_respect_token_budget_and_offsets():
+    long_text = " ".join(f"Sentence {i} describes the house in some detail." for i in range(200))
+    pieces = list(chunker(64, overlap=16).iter_chunks(long_text))
+    assert len(pieces) > 10
+    for piece in pieces:
+        assert piece.tokens <= 64
+        assert COUNTER.count(piece.text) <= 64
+        assert long_text[piece.start:piece.start + len(piece.text)] == piece.text
+    # Neighbours overlap, so the query path can stitch them back together
+    assert all(b.start < a.start + len(a.text) for a, b in zip(pieces, pieces[1:]))
+
+
+def test_headings_start_sections_and_lists_stay_together():
+    pieces = list(chunker(60).iter_chunks(PAGE))
+    sections = [p.section for p in pieces]
+    assert "Features" in sections and "Schools" in sections
+    features = next(p for p in pieces if p.section == "Features")
+    assert features.text.startswith("Features\n- Hardwood floors")
+    assert features.text.rstrip().endswith("Solar panels on the south roof")
+    schools = next(p for p in pieces if p.section == "Schools")
+    assert schools.text.startswith("Schools\nGreat schools")
+
+
+def test_oversized_sentences_are_cut_at_token_boundaries():
+    text = "word " * 500
+    pieces = list(chunker(100).iter_chunks(text.strip()))
+    assert [p.tokens for p in pieces] == [100] * 5
+
+
+class RecordingStore:
+    def __init__(self):
+        self.batches = []
+        self.times = []
+        self.deleted = []
+
+    def upsert(self, documents, metadatas, ids, embeddings=None):
+        self.batches.append(list(ids))
+        self.times.append(time.monotonic())
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+def test_pipeline_upserts_first_batches_while_page_is_still_chunking():
+    url = "https://big.example.com/pdf"
+
+    def fetch(u, previous=None):
+        return FetchedPage(url=u, documents=[Document(page_content="x", metadata={"source": u})])
+
+    def slow_split(u, documents):
+        for i in range(40):
+            time.sleep(0.01)
+            yield Chunk(url=u, id=f"{u}#{i}", text=f"text {i}", metadata={"source": u})
+
+    store = RecordingStore()
+    pipeline = IngestPipeline(store, fetch=fetch, split=slow_split, batch_size=10)
+    result = pipeline.run([url])
+
+    assert result.results[url].chunks == 40
+    assert [len(b) for b in store.batches] == [10, 10, 10, 10]
+    # The first batch was stored well before the last chunk was produced
+    assert store.times[0] < store.times[-1] - 0.15
+
+
+def test_quota_overflow_mid_stream_rolls_back_stored_chunks():
+    url = "https://big.example.com/listing"
+
+    def fetch(u, previous=None):
+        return FetchedPage(url=u, documents=[Document(page_content="x", metadata={"source": u})])
+
+    def split(u, documents):
+        for i in range(30):
+            yield Chunk(url=u, id=f"{u}#{i}", text=f"text {i}", metadata={"source": u})
+
+    store = RecordingStore()
+    pipeline = IngestPipeline(store, fetch=fetch, split=split, batch_size=5, max_new_chunks=12)
+    result = pipeline.run([url])
+
+    assert "quota" in result.results[url].error
+    stored = [i for batch in store.batches for i in batch]
+    assert stored and set(stored) <= set(store.deleted)
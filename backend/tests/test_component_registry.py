@@ -0,0 +1,48 @@
+import os
+import sys
+import pathlib
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import services.component_registry as component_registry
+from services.component_registry import ComponentRegistry
+
+
+def test_failed_reload_keeps_the_previous_components(monkeypatch):
+    config = {"llm": {"v": 1}, "embeddings": {"v": 1}}
+    fail_b = False
+
+    def build(name):
+        def builder(cfg, built):
+            if name == "embeddings" and fail_b:
+                raise RuntimeError("model failed to load")
+            return (name, cfg["v"])
+        return builder
+
+    monkeypatch.setattr(component_registry, "_BUILDERS", {"llm": build("llm"), "embeddings": build("embeddings")})
+    monkeypatch.setattr(component_registry, "_read_config", lambda: {n: dict(c) for n, c in config.items()})
+    monkeypatch.setattr(component_registry, "load_dotenv", lambda **kwargs: None)
+
+    registry = ComponentRegistry()
+    registry.initialize()
+    assert registry._built == {"llm": ("llm", 1), "embeddings": ("embeddings", 1)}
+
+    config = {"llm": {"v": 2}, "embeddings": {"v": 2}}
+    fail_b = True
+    with pytest.raises(RuntimeError):
+        registry.reload()
+    # Nothing was swapped in: the LLM was rebuilt aside but not published
+    assert registry._built == {"llm": ("llm", 1), "embeddings": ("embeddings", 1)}
+    assert registry.status().ready and registry.status().error == "model failed to load"
+
+    fail_b = False
+    assert registry.reload() == {"reloaded": ["llm", "embeddings"], "unchanged": []}
+    assert registry._built == {"llm": ("llm", 2), "embeddings": ("embeddings", 2)}
+    assert registry.reload()["reloaded"] == []
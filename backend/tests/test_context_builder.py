@@ -0,0 +1,77 @@
+import os
+import sys
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from langchain_core.documents import Document
+
+from services.context_builder import ContextBuilder, TokenCounter
+from services.ingest_pipeline import split_documents
+from services.retrieval import Hit
+
+PAGE = " ".join(
+    f"Paragraph {i}: the home at {100 + i} Elm St has {i % 5 + 1} bedrooms and a renovated kitchen."
+    for i in range(60)
+)
+
+
+def page_hits(url="https://x.com/a"):
+    chunks = split_documents(url, [Document(page_content=PAGE, metadata={"source": url})])
+    return [Hit(id=c.id, text=c.text, metadata=c.metadata) for c in chunks]
+
+
+def test_split_records_offsets_for_merging():
+    hits = page_hits()
+    assert [h.metadata["chunk_index"] for h in hits] == list(range(len(hits)))
+    for h in hits:
+        start = h.metadata["start_index"]
+        assert PAGE[start:start + len(h.text)] == h.text
+
+
+def test_overlapping_neighbours_are_stitched_back_together():
+    hits = page_hits()
+    builder = ContextBuilder(token_budget=10_000, tokenizer="")
+    # Retrieval order is by relevance, not by position on the page
+    result = builder.build([hits[2], hits[0], hits[1]])
+    assert result.merged == 2
+    assert len(result.texts) == 1
+    assert result.texts[0] == PAGE[: hits[2].metadata["start_index"] + len(hits[2].text)]
+    assert result.tokens_saved > 0
+
+
+def test_near_duplicates_from_other_sources_are_dropped():
+    text = "Charming 3 bed bungalow at 42 Oak St, listed at $450,000 with a large fenced yard and new roof."
+    hits = [
+        Hit(id="a", text=text, metadata={"source": "x.com"}),
+        Hit(id="b", text=text.replace("new roof", "new roof."), metadata={"source": "y.com"}),
+        Hit(id="c", text="Condo downtown with a rooftop pool and gym, 2 beds.", metadata={"source": "z.com"}),
+    ]
+    result = ContextBuilder(token_budget=10_000, tokenizer="").build(hits)
+    assert result.duplicates == 1
+    assert [md["source"] for md in result.metadatas] == ["x.com", "z.com"]
+
+
+def test_budget_is_respected_in_relevance_order():
+    hits = [Hit(id=str(i), text=f"Listing {i}: " + "spacious bright home " * 40, metadata={"source": f"s{i}"}) for i in range(5)]
+    builder = ContextBuilder(token_budget=300, tokenizer="")
+    result = builder.build(hits)
+    assert result.tokens_used <= 300
+    assert builder.counter.count("\n\n".join(result.texts)) <= 300
+    assert result.texts[0].startswith("Listing 0")
+    assert result.truncated + result.dropped > 0
+    assert result.tokens_in > result.tokens_used
+
+
+def test_estimate_counts_long_words_by_character_ratio():
+    counter = TokenCounter("", chars_per_token=4)
+    text = "Renovated 3-bed in Austin, TX"
+    # Renovated(3) 3 - bed in Austin(2) , TX
+    assert counter.count(text) == 11
+    assert len(counter.spans(text)) == 11
+    assert counter.truncate(text, 3) == "Renovated"
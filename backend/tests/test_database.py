@@ -0,0 +1,49 @@
+import os
+import sys
+import asyncio
+import pathlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "testsecret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import text
+
+from database.postgresdb import AsyncSessionLocal, _engine_options, async_url, pool_stats
+
+
+def test_async_url_picks_async_drivers():
+    assert async_url("postgresql://u:p@db:5432/app").drivername == "postgresql+asyncpg"
+    assert async_url("postgresql+psycopg2://u:p@db/app").drivername == "postgresql+asyncpg"
+    ssl = async_url("postgresql://u:p@db/app?sslmode=require")
+    assert "sslmode" not in ssl.query
+    assert async_url("sqlite:///./test.db").drivername == "sqlite+aiosqlite"
+
+
+def test_postgres_engines_get_pool_and_statement_timeout_settings():
+    sync = _engine_options("postgresql://u:p@db/app")
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= set(sync)
+    assert "statement_timeout" in sync["connect_args"]["options"]
+    asyncpg = _engine_options("postgresql://u:p@db/app?sslmode=require", async_driver=True)
+    assert "statement_timeout" in asyncpg["connect_args"]["server_settings"]
+    assert asyncpg["connect_args"]["ssl"] == "require"
+    assert _engine_options("sqlite:///./test.db") == {}
+
+
+def test_async_sessions_run_concurrently_and_report_pool_usage():
+    async def query():
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(text("SELECT 1"))).scalar()
+
+    async def main():
+        return await asyncio.gather(*(query() for _ in range(5)))
+
+    assert asyncio.run(main()) == [1] * 5
+    stats = pool_stats()
+    assert set(stats) == {"sync", "async"}
+    assert stats["async"]["pool"]
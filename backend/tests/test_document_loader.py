@@ -0,0 +1,92 @@
+import os
+import sys
+import asyncio
+import pathlib
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.document_loader import (
+    UnsupportedDocument,
+    UploadTooLarge,
+    is_upload_source,
+    iter_pdf_documents,
+    save_upload,
+    shutdown_pdf_pool,
+    upload_path,
+)
+
+
+def make_pdf(pages) -> bytes:
+    """A minimal valid PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+async def body(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_save_upload_streams_to_content_addressed_file(tmp_path):
+    data = make_pdf(["Hello"])
+    stored = asyncio.run(save_upload(body(data), "../Appraisal 2024.pdf", directory=str(tmp_path)))
+
+    assert is_upload_source(stored.source)
+    assert stored.source.endswith("/Appraisal%202024.pdf")
+    assert stored.size == len(data)
+    assert stored.path == upload_path(stored.source, str(tmp_path))
+    assert pathlib.Path(stored.path).read_bytes() == data
+    # Same bytes, same source: re-uploads are skipped as unchanged
+    again = asyncio.run(save_upload(body(data), "Appraisal 2024.pdf", directory=str(tmp_path)))
+    assert again.source == stored.source
+    assert sorted(p.name for p in tmp_path.iterdir()) == [pathlib.Path(stored.path).name]
+
+
+def test_save_upload_rejects_oversized_and_non_pdf_bodies(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(save_upload(body(make_pdf(["x" * 50])), "big.pdf", directory=str(tmp_path), max_bytes=100))
+    with pytest.raises(UnsupportedDocument):
+        asyncio.run(save_upload(body(b"<html>not a pdf</html>"), "fake.pdf", directory=str(tmp_path)))
+    # Partial files are cleaned up
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pdf_pages_are_extracted_in_order_with_page_metadata(tmp_path):
+    pytest.importorskip("pypdf")
+    data = make_pdf([f"Page {i} of the appraisal" for i in range(1, 6)])
+    stored = asyncio.run(save_upload(body(data, 4096), "appraisal.pdf", directory=str(tmp_path)))
+    try:
+        documents = list(iter_pdf_documents(stored.path, stored.source, pages_per_task=2))
+    finally:
+        shutdown_pdf_pool()
+
+    assert [d.metadata["page"] for d in documents] == [1, 2, 3, 4, 5]
+    assert "Page 3 of the appraisal" in documents[2].page_content
+    assert documents[0].metadata["doc_type"] == "pdf"
+    assert documents[0].metadata["title"] == "appraisal.pdf"
@@ -0,0 +1,52 @@
+import sys
+import pathlib
+
+import numpy as np
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.embedding_service import EmbeddingService
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), float(t.startswith("query: "))] for t in texts], dtype=np.float32)
+
+
+def test_prefixes_batches_and_cache(tmp_path):
+    model = FakeModel()
+    service = EmbeddingService(
+        model_name="intfloat/multilingual-e5-large",
+        batch_size=2,
+        device="cpu",
+        cache_path=str(tmp_path / "cache.sqlite3"),
+        model=model,
+    )
+    texts = ["a much longer chunk of listing text", "short", "mid length", "short"]
+
+    vectors = service.embed_passages(texts)
+    # Output keeps input order; duplicate text is embedded once
+    assert [v[0] for v in vectors] == [len("passage: " + t) for t in texts]
+    assert sum(len(c) for c in model.calls) == 3
+    # Misses are length-sorted before batching
+    assert model.calls[0] == ["passage: short", "passage: mid length"]
+
+    assert service.embed_query("short")[1] == 1.0
+
+    # A fresh service over the same cache file never touches the model
+    reloaded = EmbeddingService(
+        model_name="intfloat/multilingual-e5-large",
+        cache_path=str(tmp_path / "cache.sqlite3"),
+        device="cpu",
+        model=FakeModel(),
+    )
+    assert reloaded.embed_passages(texts) == vectors
+    assert reloaded.model.calls == []
+    assert reloaded.stats()["cache_hits"] == 4
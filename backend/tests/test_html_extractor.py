@@ -0,0 +1,111 @@
+import os
+import sys
+import pathlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.html_extractor import SiteTemplates, extract_main_content
+from services.ingest_pipeline import estimate_chunks
+from services.listing_extractor import extract_listings
+
+CHROME = """
+<div class="cookie-consent">We use cookies to improve your experience. <button>Accept</button></div>
+<header class="site-header"><a href="/">Home</a> <a href="/buy">Buy</a> <a href="/rent">Rent</a></header>
+<nav><ul><li><a href="/austin">Austin</a></li><li><a href="/dallas">Dallas</a></li></ul></nav>
+"""
+FOOTER = """
+<div class="promo-strip">Talk to a local agent today, no obligation required!</div>
+<footer>Copyright Realty Co. All rights reserved. <a href="/privacy">Privacy</a></footer>
+<script>window.dataLayer = [];</script>
+"""
+
+
+def listing_page(address: str, price: str, extra: str = "") -> bytes:
+    return f"""<html><head><title>{address}</title><style>body {{ color: red }}</style></head><body>
+{CHROME}
+<main>
+<h1>{address}</h1>
+<p>Lovely craftsman close to downtown, with a big yard and a <a href="/roof">new roof</a>.</p>
+<table>
+<tr><th>Price</th><td>{price}</td></tr>
+<tr><th>Beds</th><td>3</td></tr>
+<tr><th>Baths</th><td>2</td></tr>
+<tr><th>Sq Ft</th><td>1,500</td></tr>
+</table>
+<p><a href="/a">Austin homes</a> | <a href="/b">Texas homes</a> | <a href="/c">All cities</a></p>
+<p>Serving buyers and sellers across Central Texas since 1998.</p>
+{extra}
+<h2>Schools</h2>
+<p>Great schools nearby.</p>
+</main>
+{FOOTER}
+</body></html>""".encode("utf-8")
+
+
+def test_strips_chrome_and_keeps_listing_specs():
+    extraction = extract_main_content(listing_page("123 Elm St, Austin, TX 78701", "$450,000"), "https://example.com/1", "utf-8")
+
+    text = extraction.text
+    assert extraction.title == "123 Elm St, Austin, TX 78701"
+    assert "Lovely craftsman" in text and "Great schools nearby." in text
+    for junk in ("cookies", "Buy", "Dallas", "Copyright", "dataLayer", "color: red", "All cities", "local agent"):
+        assert junk not in text
+    # Spec table becomes text the listing parser understands
+    assert "Price: $450,000" in text and "3 Beds" in text
+    [listing] = extract_listings("https://example.com/1", text)
+    assert (listing.price, listing.beds, listing.baths, listing.sqft) == (450000, 3.0, 2.0, 1500)
+    # Headings start a new paragraph for the splitter
+    assert "\n\nSchools\n" in text
+    assert extraction.tables == 1
+    assert extraction.lines_dropped == 1
+    assert extraction.bytes_removed > len(text)
+
+
+def test_header_value_tables_become_one_line_per_row():
+    html = b"""<html><body><table>
+    <tr><th>Address</th><th>Price</th><th>Beds</th></tr>
+    <tr><td>1 Oak Ave</td><td>$300,000</td><td>2</td></tr>
+    <tr><td>9 Pine Rd</td><td>$410,000</td><td>4</td></tr>
+    </table></body></html>"""
+    text = extract_main_content(html, "https://example.com/list").text
+    assert text.splitlines() == [
+        "Address: 1 Oak Ave; Price: $300,000; 2 Beds",
+        "Address: 9 Pine Rd; Price: $410,000; 4 Beds",
+    ]
+
+
+def test_site_templates_drop_lines_repeated_across_pages():
+    templates = SiteTemplates(min_pages=3)
+    pages = [
+        ("https://www.example.com/1", listing_page("123 Elm St, Austin, TX 78701", "$450,000")),
+        ("https://example.com/2", listing_page("88 Oak Avenue, Austin, TX 78702", "$510,000")),
+        ("https://example.com/3", listing_page("9 Lakeview Blvd, Austin, TX 78703", "$620,000", "<p>Recently renovated kitchen with quartz counters.</p>")),
+    ]
+    extractions = [extract_main_content(html, url, "utf-8", templates) for url, html in pages]
+
+    blurb = "Serving buyers and sellers across Central Texas since 1998."
+    assert blurb in extractions[0].text and blurb in extractions[1].text
+    third = extractions[2]
+    assert blurb not in third.text
+    assert "Recently renovated kitchen" in third.text
+    # Listing data is never treated as template, even when it repeats
+    assert "3 Beds" in third.text and "$620,000" in third.text
+    assert third.template_lines >= 1
+    # Change detection hashes the text before template removal
+    assert blurb in third.hash_text
+    # Same page seen again does not count as another page
+    again = extract_main_content(pages[0][1], pages[0][0], "utf-8", SiteTemplates(min_pages=2))
+    assert blurb in again.text
+
+
+def test_estimate_chunks_matches_chunker_geometry():
+    # ~4 characters per token, 256-token chunks overlapping by 32
+    assert estimate_chunks(0) == 0
+    assert estimate_chunks(500) == 1
+    assert estimate_chunks(1024) == 1
+    assert estimate_chunks(4000) == 5
@@ -0,0 +1,149 @@
+import sys
+import time
+import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.http_fetcher import FetchError, HttpFetcher
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits.append((self.path, self.client_address[1], time.monotonic()))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            self._route()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _route(self):
+        if self.path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, headers={"ETag": '"v1"'})
+            else:
+                self._send(200, b"<html><title>Hi</title>Hello</html>", {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+        elif self.path == "/flaky":
+            calls = sum(1 for p, _, _ in self.server.hits if p == "/flaky")
+            if calls < 3:
+                self._send(503, b"busy", {"Retry-After": "0"})
+            else:
+                self._send(200, b"ok")
+        elif self.path == "/down":
+            self._send(503, b"busy")
+        elif self.path == "/missing":
+            self._send(404, b"nope")
+        elif self.path == "/huge":
+            self._send(200, b"x" * 5000)
+        elif self.path == "/huge-chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for _ in range(10):
+                self.wfile.write(b"3e8\r\n" + b"x" * 1000 + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path.startswith("/slow"):
+            time.sleep(0.2)
+            self._send(200, b"slow")
+        else:
+            self._send(404)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.hits = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = HttpFetcher(timeout=5, max_bytes=2000, retries=3, backoff=0.01, per_host=2, politeness_delay=0, http2=False)
+    yield fetcher
+    fetcher.close()
+
+
+def test_conditional_get_and_connection_reuse(stub_server, fetcher):
+    server, base = stub_server
+    first = fetcher.fetch(f"{base}/page")
+    assert first.status_code == 200
+    assert first.etag == '"v1"'
+    assert b"Hello" in first.content
+    assert first.encoding == "utf-8"
+
+    second = fetcher.fetch(f"{base}/page", etag=first.etag)
+    assert second.not_modified
+    assert second.content == b""
+    # Both requests went over the same pooled keep-alive connection
+    assert len({port for _, port, _ in server.hits}) == 1
+    assert fetcher.stats()["not_modified"] == 1
+
+
+def test_retries_transient_errors_then_gives_up(stub_server, fetcher):
+    _, base = stub_server
+    assert fetcher.fetch(f"{base}/flaky").content == b"ok"
+    assert fetcher.stats()["retries"] == 2
+
+    with pytest.raises(FetchError, match="HTTP 503"):
+        fetcher.fetch(f"{base}/down")
+    # Client errors are not retried
+    with pytest.raises(FetchError, match="HTTP 404"):
+        fetcher.fetch(f"{base}/missing")
+    assert fetcher.stats()["requests"] == 3 + 4 + 1
+
+
+def test_body_limit_applies_to_declared_and_streamed_sizes(stub_server, fetcher):
+    _, base = stub_server
+    with pytest.raises(FetchError, match="exceeds"):
+        fetcher.fetch(f"{base}/huge")
+    with pytest.raises(FetchError, match="exceeds"):
+        fetcher.fetch(f"{base}/huge-chunked")
+    assert fetcher.stats()["too_large"] == 2
+
+
+def test_per_host_cap_and_politeness_delay(stub_server):
+    server, base = stub_server
+    fetcher = HttpFetcher(timeout=5, retries=0, per_host=2, politeness_delay=0.05, http2=False)
+    try:
+        # Warm the client so connection setup does not skew the first start time
+        fetcher.fetch(f"{base}/page")
+        server.hits.clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: fetcher.fetch(f"{base}/slow{i}"), range(6)))
+    finally:
+        fetcher.close()
+
+    assert server.max_in_flight == 2
+    starts = sorted(t for _, _, t in server.hits)
+    assert all(b - a >= 0.04 for a, b in zip(starts, starts[1:]))
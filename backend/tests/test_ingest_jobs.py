@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import pathlib
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from database.postgresdb import engine
+from models import user_model, ingest_model  # noqa: F401  (registers tables)
+from services.ingest_jobs import IngestJobQueue, cancel_job, get_job
+from services.ingest_pipeline import IngestResult, UrlResult
+
+user_model.Base.metadata.create_all(bind=engine)
+
+
+def wait_for(job_id, states, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job["status"] in states:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job stayed {get_job(job_id)['status']}")
+
+
+def fake_runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+    result = IngestResult(results={u: UrlResult(url=u) for u in urls})
+    for url in urls:
+        r = result.results[url]
+        if "bad" in url:
+            r.error = "fetch failed"
+            on_progress(r, "failed")
+        else:
+            r.chunks = 4
+            on_progress(r, "split")
+            on_progress(r, "done")
+    return result
+
+
+def test_job_reports_per_url_progress():
+    queue = IngestJobQueue(workers=1, poll_interval=0.05, runner=fake_runner)
+    try:
+        job_id = queue.submit(["https://a.example.com/1", "https://bad.example.com/2"])
+        job = wait_for(job_id, ("completed",))
+    finally:
+        queue.stop()
+
+    assert job["chunks_added"] == 4
+    assert job["progress"] == {"total": 2, "finished": 2}
+    assert job["details"]["success"] == [{"url": "https://a.example.com/1", "chunks": 4, "unchanged": False}]
+    assert job["details"]["failed"] == [{"url": "https://bad.example.com/2", "error": "fetch failed"}]
+
+
+def test_running_job_can_be_cancelled():
+    release = threading.Event()
+
+    def blocking_runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+        while not should_cancel():
+            release.wait(0.05)
+        for url in urls:
+            on_progress(UrlResult(url=url, error="Cancelled"), "cancelled")
+        return IngestResult()
+
+    queue = IngestJobQueue(workers=1, poll_interval=0.05, runner=blocking_runner)
+    try:
+        job_id = queue.submit(["https://slow.example.com/1"])
+        wait_for(job_id, ("running",))
+        assert cancel_job(job_id)["cancel_requested"] is True
+        job = wait_for(job_id, ("cancelled",))
+    finally:
+        queue.stop()
+
+    assert job["urls"][0]["status"] == "cancelled"
+
+
+def test_stopping_the_queue_requeues_running_jobs():
+    started = threading.Event()
+
+    def interruptible_runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+        first, rest = urls[0], urls[1:]
+        on_progress(UrlResult(url=first, chunks=2), "done")
+        started.set()
+        while not should_cancel():
+            time.sleep(0.02)
+        for url in rest:
+            on_progress(UrlResult(url=url, error="Cancelled"), "cancelled")
+        return IngestResult()
+
+    queue = IngestJobQueue(workers=1, poll_interval=0.05, runner=interruptible_runner)
+    job_id = queue.submit(["https://deploy.example.com/1", "https://deploy.example.com/2"])
+    assert started.wait(5)
+    queue.stop()
+
+    job = get_job(job_id)
+    assert job["status"] == "queued" and job["started_at"] is None
+    assert [u["status"] for u in job["urls"]] == ["done", "pending"]
+
+    # The next worker resumes with only the unfinished URL
+    seen = []
+
+    def resuming_runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+        seen.extend(urls)
+        return fake_runner(urls, on_progress, should_cancel, owner_id)
+
+    queue = IngestJobQueue(workers=1, poll_interval=0.05, runner=resuming_runner)
+    queue.start()
+    try:
+        job = wait_for(job_id, ("completed",))
+    finally:
+        queue.stop()
+    assert seen == ["https://deploy.example.com/2"]
+    assert job["chunks_added"] == 6
+
+
+def test_jobs_abandoned_by_a_dead_worker_are_reclaimed():
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import update
+    from database.postgresdb import SessionLocal
+    from models.ingest_model import ingestJobSchema
+    from services.ingest_jobs import create_job, reclaim_stale_jobs
+
+    stale_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+    orphan, cancelled, alive = (create_job([f"https://crash.example.com/{i}"]) for i in range(3))
+    with SessionLocal() as db:
+        for job_id, beat, cancel in ((orphan, stale_at, False), (cancelled, stale_at, True), (alive, datetime.now(timezone.utc), False)):
+            db.execute(
+                update(ingestJobSchema).where(ingestJobSchema.id == job_id)
+                .values(status="running", started_at=stale_at, heartbeat_at=beat, cancel_requested=cancel)
+            )
+        db.commit()
+
+    assert reclaim_stale_jobs(lease_seconds=60) == 1
+    assert get_job(orphan)["status"] == "queued"
+    assert get_job(cancelled)["status"] == "cancelled"
+    assert get_job(alive)["status"] == "running"
+    with SessionLocal() as db:
+        db.execute(update(ingestJobSchema).where(ingestJobSchema.id.in_([orphan, alive])).values(status="completed"))
+        db.commit()
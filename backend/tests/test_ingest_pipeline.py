@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import threading
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from langchain_core.documents import Document
+
+from services.ingest_pipeline import Chunk, FetchedPage, IngestPipeline, chunk_id
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.batches = []
+        self.docs = {}
+
+    def upsert(self, documents, metadatas, ids, embeddings=None):
+        self.batches.append(list(ids))
+        self.docs.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+class FakeManifest:
+    def __init__(self):
+        self.entries = {}
+
+    def get_many(self, urls):
+        return {u: self.entries[u] for u in urls if u in self.entries}
+
+    def record(self, entry):
+        self.entries[entry.url] = entry
+
+    def touch(self, url, etag=None, last_modified=None):
+        pass
+
+
+def page(url, text):
+    return FetchedPage(url=url, documents=[Document(page_content=text, metadata={"source": url})])
+
+
+def slow_fetch(url: str, previous=None):
+    if "broken" in url:
+        raise RuntimeError("boom")
+    time.sleep(0.2)
+    return page(url, url)
+
+
+def fake_split(url: str, documents):
+    return [Chunk(url=url, id=f"{url}#{i}", text=f"text {i}", metadata={"source": url}) for i in range(3)]
+
+
+def test_pipeline_fetches_concurrently_and_batches_upserts():
+    urls = [f"https://site{i}.example.com/listing" for i in range(20)]
+    store = FakeVectorStore()
+    pipeline = IngestPipeline(store, fetch_workers=20, batch_size=25, fetch=slow_fetch, split=fake_split)
+
+    started = time.perf_counter()
+    result = pipeline.run(urls + ["https://broken.example.com/"])
+    elapsed = time.perf_counter() - started
+
+    # 20 sequential fetches would take ~4s; concurrent ones take about one fetch
+    assert elapsed < 1.5
+    assert len(result.successes) == 20
+    assert result.failures == [{"url": "https://broken.example.com/", "error": "boom"}]
+    assert result.total_chunks == 60
+    assert [len(b) for b in store.batches] == [25, 25, 10]
+
+
+def test_pipeline_limits_requests_per_host():
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def counting_fetch(url, previous=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return page(url, url)
+
+    urls = [f"https://same-host.example.com/listing/{i}" for i in range(12)]
+    pipeline = IngestPipeline(FakeVectorStore(), fetch_workers=12, per_host_limit=2, fetch=counting_fetch, split=fake_split)
+    result = pipeline.run(urls)
+
+    assert len(result.successes) == 12
+    assert peak <= 2
+
+
+def test_reingest_skips_unchanged_and_replaces_stale_chunks():
+    url = "https://listing.example.com/42"
+    content = {"text": "3 bed\n\n2 bath\n\n$450,000"}
+
+    def fetch(u, previous=None):
+        return page(u, content["text"])
+
+    def split(u, documents):
+        parts = documents[0].page_content.split("\n\n")
+        # Duplicate paragraphs collapse onto one deterministic id
+        return [Chunk(url=u, id=chunk_id(u, p), text=p, metadata={}) for p in parts + parts[:1]]
+
+    store, manifest = FakeVectorStore(), FakeManifest()
+    pipeline = IngestPipeline(store, manifest=manifest, fetch=fetch, split=split)
+
+    first = pipeline.run([url]).results[url]
+    assert first.chunks == 3 and len(store.docs) == 3
+
+    again = pipeline.run([url]).results[url]
+    assert again.unchanged and again.chunks == 0
+    assert len(store.batches) == 1
+
+    content["text"] = "3 bed\n\n2 bath\n\n$425,000"
+    changed = pipeline.run([url]).results[url]
+    assert (changed.chunks, changed.deleted) == (1, 1)
+    assert sorted(store.docs.values()) == ["$425,000", "2 bath", "3 bed"]
+
+
+def test_pipeline_reports_boilerplate_removed_and_hashes_pre_template_text():
+    url = "https://listing.example.com/7"
+    content = {"hash": "h1"}
+
+    def fetch(u, previous=None):
+        fetched = page(u, "3 bed house")
+        fetched.content_hash, fetched.raw_chars, fetched.bytes_removed = content["hash"], 4000, 3989
+        return fetched
+
+    store, manifest = FakeVectorStore(), FakeManifest()
+    pipeline = IngestPipeline(store, manifest=manifest, fetch=fetch, split=fake_split)
+
+    [success] = pipeline.run([url]).successes
+    assert success["bytes_removed"] == 3989
+    # ~5 chunks of raw page text became 3
+    assert success["chunks_removed"] == 2
+    assert manifest.entries[url].content_hash == "h1"
+    assert pipeline.run([url]).results[url].unchanged
+
+
+def test_slow_upserts_hold_back_splitting():
+    lock = threading.Lock()
+    stored, split, backlog = 0, 0, 0
+
+    class SlowEmbedder:
+        def embed_passages(self, texts):
+            nonlocal stored
+            time.sleep(0.01)
+            with lock:
+                stored += len(texts)
+            return [[0.0] for _ in texts]
+
+    def long_split(url, documents):
+        nonlocal split, backlog
+        for i in range(500):
+            with lock:
+                split += 1
+                backlog = max(backlog, split - stored)
+            yield Chunk(url=url, id=f"{url}#{i}", text=f"text {i}", metadata={"source": url})
+
+    pipeline = IngestPipeline(
+        FakeVectorStore(), embedder=SlowEmbedder(), batch_size=10, max_queued_parts=4,
+        fetch=lambda url, previous=None: page(url, url), split=long_split,
+    )
+    result = pipeline.run(["https://long.example.com/"])
+
+    assert result.total_chunks == 500
+    assert 1 <= pipeline.peak_queued_parts <= 4
+    # Queued parts, the part being built, the batch being embedded and a partial batch
+    assert backlog <= (4 + 3) * 10
+
+
+def test_cancel_keeps_split_pages_and_takes_back_the_rest():
+    split_count = 0
+
+    def split(url, documents):
+        nonlocal split_count
+        if "short" in url:
+            yield from fake_split(url, documents)
+            return
+        for i in range(100):
+            split_count += 1
+            time.sleep(0.005)
+            yield Chunk(url=url, id=f"{url}#{i}", text=f"text {i}", metadata={"source": url})
+
+    store, manifest = FakeVectorStore(), FakeManifest()
+    pipeline = IngestPipeline(
+        store, manifest=manifest, batch_size=5,
+        fetch=lambda url, previous=None: page(url, url), split=split,
+    )
+    short, long = "https://short.example.com/", "https://long.example.com/"
+    result = pipeline.run([short, long], should_cancel=lambda: split_count >= 30)
+
+    assert result.results[short].error is None
+    assert result.results[long].error == "Cancelled"
+    # Only the page that finished splitting is stored and tracked in the manifest
+    assert set(store.docs) == {f"{short}#{i}" for i in range(3)}
+    assert set(manifest.entries) == {short}
@@ -0,0 +1,68 @@
+import sys
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from services.retrieval import Hit, fuse
+
+
+def make_index(tmp_path):
+    index = KeywordIndex(str(tmp_path / "keywords.sqlite3"))
+    index.upsert(
+        ["a", "b", "c"],
+        [
+            "3 bed home at 1234 Elm St, Austin 78701. Listed at $450,000. MLS# 5550123.",
+            "2 bed condo at 88 Oak St, Dallas 75201. Listed at $310,000. MLS# 5550999.",
+            "Spacious family home with a large backyard near good schools.",
+        ],
+        [{"source": "x.com"}, {"source": "y.com"}, {"source": "z.com"}],
+    )
+    return index
+
+
+def test_exact_tokens_and_prices_match(tmp_path):
+    index = make_index(tmp_path)
+    assert index.lookup("5550123") == ["a"]
+    assert index.lookup("1234 Elm") == ["a"]
+    # Prices match with or without digit grouping
+    assert index.lookup("$310,000") == ["b"]
+    assert index.lookup("310000") == ["b"]
+
+    results = index.search("price of MLS 5550999?", 5)
+    assert results[0][0] == "b"
+    assert results[0][2].startswith("2 bed condo")
+    assert results[0][3] == {"source": "y.com"}
+
+
+def test_upsert_replaces_and_delete_removes(tmp_path):
+    index = make_index(tmp_path)
+    index.upsert(["a"], ["3 bed home at 1234 Elm St. Reduced to $425,000."], [{"source": "x.com"}])
+    assert index.count() == 3
+    assert index.lookup("450000") == []
+    assert index.lookup("425000") == ["a"]
+
+    index.delete(["a", "b"])
+    assert index.count() == 1
+    assert index.lookup("Elm") == []
+
+
+def test_search_ignores_fts_syntax_in_user_input(tmp_path):
+    index = make_index(tmp_path)
+    assert index.search('"unbalanced AND (', 5) == []
+    assert index.search("", 5) == []
+
+
+def test_rrf_promotes_items_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]])
+    assert [item for item, _ in fused] == ["y", "x", "w", "z"]
+
+    dense = [Hit("x", "dense x"), Hit("y", "dense y")]
+    keyword = [Hit("y", "keyword y"), Hit("w", "keyword w")]
+    hits = fuse([dense, keyword], 2)
+    assert hits[0].id == "y"
+    assert hits[0].text == "dense y"
+    assert len(hits) == 2
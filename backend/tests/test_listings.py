@@ -0,0 +1,136 @@
+import os
+import sys
+import pathlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from langchain_core.documents import Document
+
+from database.postgresdb import engine
+from models import user_model, listing_model  # noqa: F401  (registers tables)
+from services.ingest_pipeline import FetchedPage, IngestPipeline, split_documents
+from services.listing_extractor import extract_listings
+from services.listing_store import ListingStore
+from services.query_router import answer_listing_query, parse_listing_query
+
+user_model.Base.metadata.create_all(bind=engine)
+
+AUSTIN_PAGE = """Homes for sale in Austin
+123 Elm St, Austin, TX 78701
+$450,000 | 3 beds | 2 baths | 1,500 sqft
+Lovely craftsman close to downtown.
+88 Oak Avenue Unit 4, Austin, TX 78702
+$1.2M 4 bd 3.5 ba 2,800 sq ft
+Contact our office at 500 Main Street, Austin TX
+"""
+
+DALLAS_CARDS = """$325,000
+2 bd 1 ba 900 sqft
+45 Maple Dr, Dallas, TX 75201
+$610K
+3 bedrooms 3 bathrooms 2,400 square feet
+9 W Lakeview Blvd, Dallas, TX 75202
+"""
+
+
+def test_extracts_details_after_or_before_the_address():
+    austin = extract_listings("https://a.example.com", AUSTIN_PAGE)
+    assert [(l.address, l.price, l.beds, l.baths, l.sqft) for l in austin] == [
+        ("123 Elm St, Austin, TX 78701", 450_000, 3, 2, 1500),
+        ("88 Oak Avenue Unit 4, Austin, TX 78702", 1_200_000, 4, 3.5, 2800),
+    ]
+    dallas = extract_listings("https://d.example.com", DALLAS_CARDS)
+    assert [(l.address, l.price, l.beds) for l in dallas] == [
+        ("45 Maple Dr, Dallas, TX 75201", 325_000, 2),
+        ("9 W Lakeview Blvd, Dallas, TX 75202", 610_000, 3),
+    ]
+
+
+def test_parser_routes_numeric_questions_only():
+    q = parse_listing_query("cheapest 3-bed under $500k in this list")
+    assert (q.intent, q.field, q.min_beds, q.max_beds, q.max_price) == ("min", "price", 3, 3, 500_000)
+
+    q = parse_listing_query("How many homes between $300k and $700k have 2+ baths?")
+    assert (q.intent, q.min_price, q.max_price, q.min_baths) == ("count", 300_000, 700_000, 2)
+
+    q = parse_listing_query("show homes over 2,000 sq ft")
+    assert (q.intent, q.min_sqft, q.min_price) == ("list", 2000, None)
+
+    assert parse_listing_query("What is the neighborhood like around 123 Elm St?") is None
+    assert parse_listing_query("How many bedrooms does 123 Elm St have?") is None
+
+
+def test_parser_leaves_questions_with_unparsed_constraints_to_the_llm():
+    # Each names a constraint (city, amenity, place, address) the table cannot apply
+    for question in (
+        "average price in Houston",
+        "How many homes in Austin have a pool?",
+        "largest park nearby",
+        "How many units does the building at 45 Maple Dr have?",
+        "cheapest 3-bed with a garage",
+        "homes over 2",
+    ):
+        assert parse_listing_query(question) is None, question
+    assert parse_listing_query("What's the cheapest home with at least 2 baths in this list?").min_baths == 2
+
+
+def test_router_answers_from_the_listings_table():
+    store = ListingStore()
+    store.replace_for_url("https://a.example.com", extract_listings("https://a.example.com", AUSTIN_PAGE))
+    store.replace_for_url("https://d.example.com", extract_listings("https://d.example.com", DALLAS_CARDS))
+    # Re-ingest replaces a page's rows instead of duplicating them
+    store.replace_for_url("https://d.example.com", extract_listings("https://d.example.com", DALLAS_CARDS))
+
+    answer, sources = answer_listing_query("cheapest 3-bed under $500k", store)
+    assert answer.startswith("123 Elm St, Austin, TX 78701 - $450,000")
+    assert sources == "https://a.example.com"
+
+    answer, _ = answer_listing_query("How many homes under $700k?", store)
+    assert answer == "3 listings match."
+
+    answer, _ = answer_listing_query("What is the average price of 3 bedroom homes?", store)
+    assert answer == "The average price across 2 matching listings is $530,000."
+
+    answer, _ = answer_listing_query("largest house", store)
+    assert answer.startswith("88 Oak Avenue")
+
+    # Nothing extracted matches: let the LLM look at the text instead
+    assert answer_listing_query("cheapest 6 bedroom home", store) is None
+    # Not an average over every listing
+    assert answer_listing_query("average price in Houston", store) is None
+
+
+class FakeVectorStore:
+    def upsert(self, documents, metadatas, ids, embeddings=None):
+        pass
+
+    def delete(self, ids):
+        pass
+
+
+class FakeListingStore:
+    def __init__(self):
+        self.pages = {}
+
+    def replace_for_url(self, url, listings):
+        self.pages[url] = listings
+
+
+def test_pipeline_extracts_listings_during_ingest():
+    def fetch(url, previous=None):
+        return FetchedPage(url=url, documents=[Document(page_content=AUSTIN_PAGE, metadata={"source": url})])
+
+    listings = FakeListingStore()
+    pipeline = IngestPipeline(FakeVectorStore(), listings=listings, fetch=fetch, split=split_documents)
+    result = pipeline.run(["https://a.example.com"])
+
+    assert result.failures == []
+    assert [l.address for l in listings.pages["https://a.example.com"]] == [
+        "123 Elm St, Austin, TX 78701",
+        "88 Oak Avenue Unit 4, Austin, TX 78702",
+    ]
@@ -0,0 +1,92 @@
+import sys
+import uuid
+import sqlite3
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.keyword_index import KeywordIndex
+from services.metadata_filters import SearchFilters, chunk_metadata
+from services.query_cache import AnswerCache
+from services.retrieval import vector_search
+from services.vector_store import create_vector_store
+
+CHUNKS = [
+    ("a", "3 bed home in Austin", chunk_metadata({"title": "A"}, "https://www.zillow.com/a", 1_000, owner_id=1)),
+    ("b", "2 bed condo in Austin", chunk_metadata({}, "https://redfin.com/b", 2_000, owner_id=2)),
+    ("c", "studio in Austin", chunk_metadata({"doc_type": "pdf"}, "https://zillow.com/c", 3_000)),
+]
+
+
+def test_chunk_metadata_is_normalized():
+    md = CHUNKS[0][2]
+    assert md == {
+        "source": "https://www.zillow.com/a",
+        "domain": "zillow.com",
+        "doc_type": "html",
+        "ingested_at": 1000,
+        "owner_id": 1,
+        "title": "A",
+    }
+    # No None values: vector stores reject them
+    assert "owner_id" not in CHUNKS[2][2]
+    assert CHUNKS[2][2]["doc_type"] == "pdf"
+
+
+def test_filters_translate_to_chroma_where():
+    assert SearchFilters().to_where() is None
+    assert SearchFilters(domains=["WWW.Zillow.com"]).to_where() == {"domain": "zillow.com"}
+    assert SearchFilters(domains=["zillow.com", "redfin.com"], ingested_after=1500).to_where() == {
+        "$and": [{"domain": {"$in": ["redfin.com", "zillow.com"]}}, {"ingested_at": {"$gte": 1500}}]
+    }
+
+
+def test_filters_are_pushed_down_to_the_vector_store():
+    store = create_vector_store({"backend": "memory", "collection": f"test_{uuid.uuid4().hex[:8]}"})
+    ids, texts, metadatas = zip(*CHUNKS)
+    store.upsert(ids=list(ids), documents=list(texts), metadatas=list(metadatas),
+                 embeddings=[[1.0, 0.0], [0.9, 0.1], [0.8, 0.2]])
+
+    hits = vector_search(store, [1.0, 0.0], 3, SearchFilters(domains=["zillow.com"]))
+    assert [h.id for h in hits] == ["a", "c"]
+    hits = vector_search(store, [1.0, 0.0], 3, SearchFilters(owner_id=2))
+    assert [h.id for h in hits] == ["b"]
+    hits = vector_search(store, [1.0, 0.0], 3, SearchFilters(ingested_after=1500, doc_types=["html"]))
+    assert [h.id for h in hits] == ["b"]
+
+
+def test_keyword_index_prefilters_on_indexed_columns(tmp_path):
+    index = KeywordIndex(str(tmp_path / "keywords.sqlite3"))
+    ids, texts, metadatas = zip(*CHUNKS)
+    index.upsert(ids, texts, metadatas)
+
+    assert {r[0] for r in index.search("Austin", 5, SearchFilters(domains=["zillow.com"]))} == {"a", "c"}
+    assert index.count(SearchFilters(sources=["https://redfin.com/b"])) == 1
+    assert index.count(SearchFilters(domains=["trulia.com"])) == 0
+    assert index.count() == 3
+
+
+def test_keyword_index_adds_filter_columns_to_old_files(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chunks (rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, text TEXT NOT NULL, "
+                 "metadata TEXT NOT NULL DEFAULT '{}', body TEXT NOT NULL)")
+    conn.execute("INSERT INTO chunks (id, text, body) VALUES ('old', 'legacy chunk', 'legacy chunk')")
+    conn.commit()
+    conn.close()
+
+    index = KeywordIndex(path)
+    assert index.count() == 1
+    assert index.count(SearchFilters(domains=["zillow.com"])) == 0
+
+
+def test_cached_answers_do_not_leak_across_scopes():
+    cache = AnswerCache(max_entries=10, ttl_seconds=60, semantic_threshold=0.9)
+    cache.put("cheapest home?", "zillow answer", "zillow.com", [1.0, 0.0], scope="zillow")
+    assert cache.get_exact("cheapest home?") is None
+    assert cache.get_semantic([1.0, 0.0]) is None
+    assert cache.get_exact("Cheapest home", "zillow") == ("zillow answer", "zillow.com")
+    assert cache.get_semantic([1.0, 0.0], "zillow", "Cheapest home") == ("zillow answer", "zillow.com")
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import asyncio
+import pathlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.password_hasher import PasswordHasher, PasswordHasherBusy, make_context
+
+
+def test_hashing_runs_off_the_event_loop():
+    hasher = PasswordHasher(workers=2, max_pending=16, context=make_context(10))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        hashes = await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(4)))
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return hashes, ticks, elapsed
+
+    hashes, ticks, elapsed = asyncio.run(main())
+    assert all(h.startswith("$2b$10$") for h in hashes)
+    # The loop kept ticking while bcrypt ran (a blocked loop would tick ~once)
+    assert ticks >= 0.5 * elapsed / 0.01
+    stats = hasher.stats()
+    assert stats["completed"] == 4 and stats["pending"] == 0 and stats["max_pending"] >= 2
+
+
+def test_full_queue_is_rejected_not_queued():
+    hasher = PasswordHasher(workers=1, max_pending=1, context=make_context(10))
+
+    async def main():
+        return await asyncio.gather(*(hasher.hash("pw") for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert any(isinstance(r, PasswordHasherBusy) for r in results)
+    assert hasher.stats()["rejected"] >= 1
+
+
+def test_verify_upgrades_hashes_below_the_configured_cost():
+    old = make_context(4).hash("secret")
+    hasher = PasswordHasher(workers=1, max_pending=4, context=make_context(5))
+
+    ok, new_hash = asyncio.run(hasher.verify_and_update("secret", old))
+    assert ok and new_hash.startswith("$2b$05$")
+    assert asyncio.run(hasher.verify_and_update("secret", new_hash)) == (True, None)
+    assert asyncio.run(hasher.verify_and_update("wrong", old)) == (False, None)
+    # A higher cost than configured is left alone
+    assert asyncio.run(hasher.verify_and_update("secret", make_context(6).hash("secret")))[1] is None
+    assert hasher.stats()["rehashed"] == 1
+
+
+def test_cancelled_callers_release_their_queue_slot():
+    hasher = PasswordHasher(workers=1, max_pending=1, context=make_context(4))
+
+    async def main():
+        blocker = asyncio.create_task(hasher._run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)  # the only worker is busy now
+        queued = asyncio.create_task(hasher.hash("pw"))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await blocker
+        try:
+            await queued
+        except asyncio.CancelledError:
+            pass
+        # The slot the cancelled call held is free again
+        return await hasher.hash("pw")
+
+    assert asyncio.run(main()).startswith("$2b$04$")
+    assert hasher.stats()["pending"] == 0
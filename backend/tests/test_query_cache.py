@@ -0,0 +1,58 @@
+import sys
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.query_cache import AnswerCache
+
+
+def test_exact_semantic_and_invalidation():
+    cache = AnswerCache(max_entries=2, ttl_seconds=60, semantic_threshold=0.9)
+    cache.put("What is the average price in Austin?", "About $500k", "a.com", [1.0, 0.0])
+
+    assert cache.get_exact("  what is the AVERAGE price in austin ") == ("About $500k", "a.com")
+    assert cache.get_semantic([0.98, 0.05], question="average price for austin") == ("About $500k", "a.com")
+    assert cache.get_semantic([0.0, 1.0], question="average price for austin") is None
+
+    # Answers computed before a write are dropped rather than cached as current
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.get_exact("what is the average price in austin") is None
+    cache.put("stale question", "old", "x", [1.0, 0.0], generation)
+    assert cache.get_exact("stale question") is None
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 1)
+    assert (stats["lookups"], stats["exact_misses"]) == (3, 2)
+
+
+def test_semantic_tier_needs_the_same_entities():
+    cache = AnswerCache(max_entries=10, ttl_seconds=60, semantic_threshold=0.95)
+    cache.put("3-bed homes in Austin under 400k", "Austin answer", "a.com", [1.0, 0.0])
+    near = [0.99, 0.01]  # e5 scores paraphrases and entity swaps alike this close
+
+    assert cache.get_semantic(near, question="3 bedroom houses in austin below $400,000") == ("Austin answer", "a.com")
+    for question in (
+        "3-bed homes in Houston under 400k",
+        "3-bed homes in Austin under 500k",
+        "4-bed homes in Austin under 400k",
+        "3-bed homes under 400k",
+    ):
+        assert cache.get_semantic(near, question=question) is None, question
+
+
+def test_lru_eviction_and_ttl():
+    cache = AnswerCache(max_entries=2, ttl_seconds=60, semantic_threshold=2.0)
+    cache.put("a", "1", "")
+    cache.put("b", "2", "")
+    cache.get_exact("a")
+    cache.put("c", "3", "")
+    assert cache.get_exact("b") is None
+    assert cache.get_exact("a") == ("1", "")
+
+    expired = AnswerCache(ttl_seconds=0)
+    expired.put("q", "answer", "")
+    assert expired.get_exact("q") is None
@@ -0,0 +1,149 @@
+import os
+import sys
+import pathlib
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from langchain_core.documents import Document
+
+from database.postgresdb import SessionLocal, engine
+from models import user_model, ingest_model  # noqa: F401  (registers tables)
+from models.ingest_model import urlManifestSchema
+from services.ingest_pipeline import Chunk, FetchedPage, IngestPipeline, IngestResult, PageGone, UrlResult
+from services.recrawl_scheduler import RecrawlScheduler
+from services.url_manifest import ManifestEntry, UrlManifest, due_for_recrawl
+
+user_model.Base.metadata.create_all(bind=engine)
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.docs = {}
+
+    def upsert(self, documents, metadatas, ids, embeddings=None):
+        self.docs.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+class FakeListings:
+    def __init__(self):
+        self.replaced = {}
+
+    def replace_for_url(self, url, listings):
+        self.replaced[url] = list(listings)
+
+
+def split(url, documents):
+    return [Chunk(url=url, id=f"{url}#{i}", text=f"text {i}", metadata={}) for i in range(3)]
+
+
+def age(manifest: UrlManifest, url: str, days: int):
+    with SessionLocal() as db:
+        row = manifest._scoped(db).filter(urlManifestSchema.url == url).one()
+        row.last_fetched_at = datetime.now(timezone.utc) - timedelta(days=days)
+        db.commit()
+
+
+def test_dead_pages_are_tombstoned_and_no_longer_due():
+    owner = 9101
+    manifest = UrlManifest(owner_id=owner)
+    alive, dead, fresh = (f"https://recrawl.example.com/{name}" for name in ("alive", "dead", "fresh"))
+    upload = "upload://" + "a" * 64 + "/report.pdf"
+    taken_down = set()
+
+    def fetch(url, previous=None):
+        if url in taken_down:
+            raise PageGone(f"HTTP 410 fetching {url}")
+        return FetchedPage(url=url, documents=[Document(page_content=url, metadata={"source": url})])
+
+    store, listings = FakeVectorStore(), FakeListings()
+    pipeline = IngestPipeline(store, manifest=manifest, listings=listings, owner_id=owner, fetch=fetch, split=split)
+    pipeline.run([alive, dead, fresh])
+    manifest.record(ManifestEntry(url=upload, content_hash="a" * 64))
+    for url in (alive, dead, upload):
+        age(manifest, url, days=3)
+
+    taken_down.add(dead)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=1)
+    due = [url for o, url in due_for_recrawl(cutoff, 1000) if o == owner]
+    # Uploads never change, and recently fetched pages are not due yet
+    assert sorted(due) == [alive, dead]
+
+    result = pipeline.run(due).results
+    assert result[alive].unchanged
+    assert result[dead].gone and result[dead].deleted == 3
+    assert not any(i.startswith(dead) for i in store.docs)
+    assert listings.replaced[dead] == []
+    assert manifest.get_many([dead])[dead].chunk_ids == []
+    # Stalest first: "alive" was just checked again
+    assert [url for o, url in due_for_recrawl(datetime.now(timezone.utc), 1000) if o == owner] == [fresh, alive]
+
+
+def test_repeated_fetch_failures_tombstone_a_page():
+    owner = 9102
+    url = "https://flaky.example.com/listing"
+    manifest = UrlManifest(owner_id=owner)
+    state = {"up": True}
+
+    def fetch(u, previous=None):
+        if not state["up"]:
+            raise RuntimeError("connection refused")
+        return FetchedPage(url=u, documents=[Document(page_content="listing", metadata={"source": u})])
+
+    store = FakeVectorStore()
+    pipeline = IngestPipeline(store, manifest=manifest, owner_id=owner, max_fetch_failures=2, fetch=fetch, split=split)
+    pipeline.run([url])
+    state["up"] = False
+
+    first = pipeline.run([url]).results[url]
+    assert first.error and not first.gone and len(store.docs) == 3
+    second = pipeline.run([url]).results[url]
+    assert second.gone and store.docs == {}
+
+
+def test_cycle_stops_at_chunk_budget_and_keeps_owners_apart():
+    due = [(1, f"https://a.example.com/{i}") for i in range(30)] + [(2, f"https://b.example.com/{i}") for i in range(30)]
+    calls = []
+
+    def runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+        calls.append((owner_id, len(urls)))
+        result = IngestResult(results={u: UrlResult(url=u, chunks=10) for u in urls})
+        result.results[urls[0]].unchanged, result.results[urls[0]].chunks = True, 0
+        return result
+
+    scheduler = RecrawlScheduler(interval=0, max_urls=100, max_chunks=250, runner=runner, due=lambda cutoff, limit: due[:limit])
+    cycle = scheduler.run_cycle()
+
+    assert calls == [(1, 25), (1, 5)]
+    assert cycle["checked"] == 30 and cycle["deferred"] == 30
+    assert (cycle["unchanged"], cycle["updated"], cycle["chunks_embedded"]) == (2, 28, 280)
+    stats = scheduler.stats()
+    assert stats["cycles"] == 1 and not stats["enabled"]
+    assert stats["last_cycle"]["due"] == 60
+
+
+def test_interleaved_owners_share_pipeline_runs():
+    # Staleness order alternates owners; each owner still gets one run
+    due = [(owner, f"https://{owner}.example.com/{i}") for i in range(10) for owner in (1, 2, None)]
+    calls = []
+
+    def runner(urls, on_progress=None, should_cancel=None, owner_id=None):
+        calls.append((owner_id, urls))
+        return IngestResult(results={u: UrlResult(url=u) for u in urls})
+
+    scheduler = RecrawlScheduler(interval=0, runner=runner, due=lambda cutoff, limit: due[:limit])
+    cycle = scheduler.run_cycle()
+
+    assert [owner for owner, _ in calls] == [1, 2, None]
+    assert calls[0][1] == [f"https://1.example.com/{i}" for i in range(10)]
+    assert cycle["checked"] == 30
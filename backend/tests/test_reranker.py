@@ -0,0 +1,96 @@
+import sys
+import pathlib
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.reranker import Reranker
+from services.retrieval import Hit
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the fraction of query words found in the passage."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append((len(pairs), batch_size))
+        scores = []
+        for query, text in pairs:
+            words = query.lower().split()
+            scores.append(sum(w in text.lower() for w in words) / len(words))
+        return scores
+
+
+def make_hits():
+    return [
+        Hit(id="a", text="Condo downtown with a rooftop pool"),
+        Hit(id="b", text="3 bed home on Elm St with a big yard"),
+        Hit(id="c", text="Elm St townhouse, 2 bed"),
+        Hit(id="d", text="Office space for lease"),
+    ]
+
+
+def test_rerank_orders_by_cross_encoder_score():
+    model = FakeCrossEncoder()
+    reranker = Reranker(model_name="fake", batch_size=2, device="cpu", min_score=0.0, relative_cutoff=0.0, model=model)
+    outcome = reranker.rerank("3 bed Elm St yard", make_hits(), top_k=3)
+    assert [h.id for h in outcome.hits] == ["b", "c", "a"]
+    assert outcome.hits[0].score == 1.0
+    assert outcome.candidates == 4
+    assert model.calls == [(4, 2)]
+
+
+def test_adaptive_cutoff_sends_fewer_chunks_for_confident_queries():
+    reranker = Reranker(model_name="fake", device="cpu", min_score=0.1, relative_cutoff=0.5, model=FakeCrossEncoder())
+    outcome = reranker.rerank("rooftop pool condo downtown", make_hits(), top_k=3)
+    assert [h.id for h in outcome.hits] == ["a"]
+
+    # Nothing relevant: still keep the single best candidate
+    outcome = reranker.rerank("waterfront acreage", make_hits(), top_k=3)
+    assert len(outcome.hits) == 1
+
+    stats = reranker.stats()
+    assert stats["queries"] == 2
+    assert stats["avg_candidates"] == 4
+    assert stats["avg_kept"] == 1
+    assert stats["early_cutoff_rate"] == 1.0
+    assert stats["latency_ms_p95"] >= stats["latency_ms_p50"] >= 0
+
+
+def test_logits_are_mapped_to_probabilities():
+    class LogitModel:
+        def predict(self, pairs, batch_size=32, show_progress_bar=False):
+            return [4.0, -4.0][: len(pairs)]
+
+    reranker = Reranker(model_name="fake", device="cpu", model=LogitModel())
+    scores = reranker.score("q", ["long passage text", "short"])
+    assert 0.98 < scores[0] < 1.0
+    assert 0.0 < scores[1] < 0.02
+
+
+def test_logits_inside_zero_one_keep_their_order():
+    class LogitModel:
+        def __init__(self, logits):
+            self.logits = logits
+
+        def predict(self, pairs, batch_size=32, show_progress_bar=False):
+            return self.logits[: len(pairs)]
+
+    hits = [Hit(id="a", text="longest passage of the two"), Hit(id="b", text="short one")]
+    # 0.9 is a logit here, like 1.5; per-value mapping would rank it first
+    reranker = Reranker(model_name="fake", device="cpu", min_score=0.0, relative_cutoff=0.0, model=LogitModel([0.9, 1.5]))
+    outcome = reranker.rerank("q", hits, top_k=2)
+    assert [h.id for h in outcome.hits] == ["b", "a"]
+    assert outcome.hits[0].score > outcome.hits[1].score > 0.7
+
+    # Once identified as a logit model, an all-in-range batch is still squashed
+    reranker.model.logits = [0.2, 0.9]
+    assert reranker.score("q", ["longest passage of the two", "short one"])[1] < 0.72
+
+    # A model that already outputs probabilities is left as is
+    probabilities = Reranker(model_name="fake", device="cpu", model=LogitModel([0.2, 0.9]))
+    assert probabilities.score("q", ["longest passage of the two", "short one"]) == [0.2, 0.9]
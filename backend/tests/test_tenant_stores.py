@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import uuid
+import pathlib
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from database.postgresdb import engine
+from models import user_model, ingest_model  # noqa: F401  (registers tables)
+from services.ingest_pipeline import Chunk, FetchedPage, IngestPipeline
+from services.keyword_index import KeywordIndex
+from services.tenant_stores import TenantStores, tenant_keyword_path
+from services.url_manifest import ManifestEntry, UrlManifest
+from services.vector_store import create_vector_store
+
+user_model.Base.metadata.create_all(bind=engine)
+
+
+def make_tenants(tmp_path, **kwargs):
+    shared = create_vector_store({
+        "backend": "memory",
+        "persist_path": str(tmp_path / "chroma"),
+        "collection": f"test_{uuid.uuid4().hex[:8]}",
+        "api_key": None,
+        "tenant": None,
+        "database": None,
+    })
+    path = str(tmp_path / "keyword_index.sqlite3")
+    return TenantStores(shared, KeywordIndex(path), keyword_index_path=path, **kwargs)
+
+
+class FixedEmbedder:
+    def embed_passages(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def add(store, ids):
+    store.vector_store.upsert(
+        ids=ids, documents=[f"doc {i}" for i in ids], metadatas=[{"source": "x.com"} for _ in ids],
+        embeddings=[[1.0, 0.0] for _ in ids],
+    )
+    store.keyword_index.upsert(ids, [f"doc {i}" for i in ids], [{"source": "x.com"} for _ in ids])
+
+
+def test_each_user_gets_isolated_collection_and_keyword_index(tmp_path):
+    tenants = make_tenants(tmp_path)
+    alice, bob = tenants.get(1), tenants.get(2)
+    add(alice, ["a1", "a2"])
+    add(bob, ["b1"])
+
+    assert alice.vector_store.count() == 2
+    assert bob.vector_store.count() == 1
+    assert tenants.shared.vector_store.count() == 0
+    assert [hit[0] for hit in bob.keyword_index.search("doc")] == ["b1"]
+    assert alice.keyword_index.path == tenant_keyword_path(str(tmp_path / "keyword_index.sqlite3"), 1)
+    # Anonymous requests keep using the shared collection
+    assert tenants.get(None) is tenants.shared
+
+
+def test_open_handles_are_bounded_and_reopen_after_eviction(tmp_path):
+    tenants = make_tenants(tmp_path, max_open=2)
+    add(tenants.get(1), ["a1"])
+    tenants.get(2)
+    tenants.get(1)  # most recently used, so 2 is evicted next
+    tenants.get(3)
+
+    stats = tenants.stats()
+    assert stats["open_collections"] == 2
+    assert stats["evicted"] == 1
+    # Evicted handles reopen the same collection, data intact
+    assert tenants.get(1).vector_store.count() == 1
+    assert tenants.stats()["opened"] == 3
+
+
+def test_disabled_tenants_fall_back_to_shared(tmp_path):
+    tenants = make_tenants(tmp_path, enabled=False, max_chunks=5)
+    assert tenants.get(1) is tenants.shared
+    assert tenants.remaining_quota(1) is None
+
+
+def test_quota_fails_pages_that_would_overflow(tmp_path):
+    tenants = make_tenants(tmp_path, max_chunks=4)
+    store = tenants.get(7)
+    add(store, ["old"])
+    assert tenants.remaining_quota(7) == 3
+    assert tenants.remaining_quota(None) is None
+
+    def fetch(url, previous=None):
+        return FetchedPage(url=url, documents=[])
+
+    def split(url, documents):
+        n = 2 if "small" in url else 5
+        return [Chunk(url=url, id=f"{url}#{i}", text=f"text {i}", metadata={"source": url}) for i in range(n)]
+
+    pipeline = IngestPipeline(
+        store.vector_store, max_new_chunks=tenants.remaining_quota(7), fetch=fetch, split=split,
+        embedder=FixedEmbedder(),
+    )
+    result = pipeline.run(["https://small.example.com/", "https://big.example.com/"])
+
+    assert [s["url"] for s in result.successes] == ["https://small.example.com/"]
+    assert result.failures[0]["url"] == "https://big.example.com/"
+    assert "quota" in result.failures[0]["error"]
+    assert store.vector_store.count() == 3
+
+
+def test_manifest_is_scoped_by_owner():
+    url = f"https://example.com/{uuid.uuid4().hex}"
+    UrlManifest(owner_id=1).record(ManifestEntry(url=url, content_hash="h1", chunk_ids=["c1"]))
+    UrlManifest(owner_id=2).record(ManifestEntry(url=url, content_hash="h2", chunk_ids=["c2"]))
+
+    assert UrlManifest(owner_id=1).get_many([url])[url].content_hash == "h1"
+    assert UrlManifest(owner_id=2).get_many([url])[url].content_hash == "h2"
+    assert UrlManifest().get_many([url]) == {}
+
+
+def test_concurrent_runs_of_one_user_share_the_quota(tmp_path):
+    tenants = make_tenants(tmp_path, max_chunks=4)
+    store = tenants.get(7)
+    granted = []
+    entered = threading.Event()
+
+    def first():
+        with tenants.reserve_quota(7) as quota:
+            granted.append(quota)
+            entered.set()
+            time.sleep(0.2)
+            add(store, [f"a{i}" for i in range(quota)])
+
+    def second():
+        entered.wait()
+        with tenants.reserve_quota(7) as quota:
+            granted.append(quota)
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # The second run waited for the first one's writes and saw what was left
+    assert granted == [4, 0]
+    with tenants.reserve_quota(None) as quota:
+        assert quota is None
+
+
+def test_shared_collection_rows_are_unique_per_url():
+    import pytest
+    from sqlalchemy.exc import IntegrityError
+    from database.postgresdb import SessionLocal
+    from models.ingest_model import urlManifestSchema
+
+    url = f"https://shared.example.com/{uuid.uuid4().hex}"
+    with SessionLocal() as db:
+        db.add_all([urlManifestSchema(url=url, owner_id=None), urlManifestSchema(url=url, owner_id=None)])
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+        # The same URL in the shared collection and in two users' collections is fine
+        db.add_all(urlManifestSchema(url=url, owner_id=owner) for owner in (None, 1, 2))
+        db.commit()
+
+    UrlManifest().record(ManifestEntry(url=url, content_hash="h", chunk_ids=["c1"]))
+    assert UrlManifest().get_many([url])[url].chunk_ids == ["c1"]
+
+
+def test_eviction_closes_keyword_index_connections(tmp_path):
+    tenants = make_tenants(tmp_path, max_open=1)
+    first = tenants.get(1)
+    add(first, ["a1"])
+    tenants.get(2)
+
+    assert first.keyword_index._conn is None
+    # A caller still holding the evicted handle reopens the file on demand
+    assert [hit[0] for hit in first.keyword_index.search("doc")] == ["a1"]
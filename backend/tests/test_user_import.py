@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import pathlib
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Ensure required env vars before importing app
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "testsecret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_EXPIRATION_TIME", "60")  # minutes
+os.environ.setdefault("DEV_PORT", "http://testclient")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import app
+import controller.auth_controller as auth_controller
+from services.password_hasher import make_context
+from services.user_import import import_users, parse_users
+
+
+def test_parse_csv_and_json_reject_bad_rows():
+    csv_body = b"Email,Password,username\nA@Example.com,pw1,ann\nnot-an-email,pw2,\nb@example.com,,bob\n"
+    rows, rejected = parse_users(csv_body, "csv")
+    assert [(r.row, r.email, r.username) for r in rows] == [(1, "a@example.com", "ann")]
+    assert [(r.row, r.error) for r in rejected] == [(2, "Invalid email format"), (3, "Password is required")]
+
+    rows, rejected = parse_users(json.dumps({"users": [{"email": "c@example.com", "password": "x"}, 5]}).encode(), "json")
+    assert [r.email for r in rows] == ["c@example.com"]
+    assert rejected[0].row == 2 and rejected[0].status == "invalid"
+
+    with pytest.raises(ValueError):
+        parse_users(b"name,pass\nx,y\n", "csv")
+    with pytest.raises(ValueError):
+        parse_users(b'{"email": "x"}', "json")
+    with pytest.raises(ValueError):
+        parse_users(b"email,password\n" + b"a@b.co,pw\n" * 3, "csv", max_rows=2)
+
+
+def test_import_reports_each_row_and_is_idempotent():
+    client = TestClient(app)
+    tag = uuid.uuid4().hex[:8]
+    taken = f"taken{tag}@example.com"
+    payload = {"username": "u", "lastname": "ln", "email": taken, "password": "TestPass123!"}
+    assert client.post("/auth/register", json=payload).status_code == 201
+
+    body = "\n".join([
+        "email,password,username,lastname",
+        f"new{tag}a@example.com,secret-a,Ann,A",
+        f"{taken},whatever,,",
+        f"NEW{tag}A@example.com,secret-b,,",
+        "broken,secret,,",
+        f"new{tag}b@example.com,secret-c,Bob,B",
+    ]).encode()
+    rows, rejected = parse_users(body, "csv")
+
+    summary = asyncio.run(import_users(rows, rejected, rounds=4, batch_size=1))
+    assert [r["status"] for r in summary["results"]] == ["created", "exists", "duplicate", "invalid", "created"]
+    assert (summary["created"], summary["exists"], summary["duplicate"], summary["invalid"]) == (2, 1, 1, 1)
+
+    login = client.post("/auth/login", data={"username": f"new{tag}b@example.com", "password": "secret-c"})
+    assert login.status_code == 200
+
+    again = asyncio.run(import_users(rows, rejected, rounds=4))
+    assert again["created"] == 0 and again["exists"] == 3
+
+
+def test_import_endpoint_is_for_operators_and_runs_as_a_job(monkeypatch):
+    client = TestClient(app)
+    tag = uuid.uuid4().hex[:8]
+    users = [{"email": f"bulk{tag}{i}@example.com", "password": f"pw-{i}"} for i in range(3)]
+
+    assert client.post("/users/import", json=users).status_code == 401
+
+    admin = {"username": "admin", "lastname": "ln", "email": f"admin{tag}@example.com", "password": "TestPass123!"}
+    assert client.post("/auth/register", json=admin).status_code == 201
+    assert client.post("/auth/login", data={"username": admin["email"], "password": admin["password"]}).status_code == 200
+
+    # Signed in is not enough: only configured operators may import
+    assert client.post("/users/import", json=users).status_code == 403
+    monkeypatch.setattr(auth_controller, "USER_IMPORT_ADMIN_EMAILS", frozenset({admin["email"]}))
+
+    response = client.post("/users/import", json=users)
+    assert response.status_code == 202
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "completed" and job["total_rows"] == 3
+    assert job["result"]["created"] == 3
+    hashed = asyncio.run(_stored_hash(users[0]["email"]))
+    assert make_context().verify("pw-0", hashed)
+
+    bad = client.post("/users/import", params={"format": "csv"}, content=b"no,header\n")
+    assert bad.status_code == 400
+    assert client.post("/users/import", content=b"x", headers={"content-type": "text/plain"}).status_code == 415
+
+
+def wait_for_job(client: TestClient, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/users/import/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} stayed {job['status']}")
+
+
+async def _stored_hash(email: str) -> str:
+    from sqlalchemy import select
+    from database.postgresdb import AsyncSessionLocal
+    from models.user_model import userSchema
+
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(userSchema.password).where(userSchema.email == email))).scalar_one()
+
+
+def test_unfinished_imports_fail_on_shutdown():
+    from services.user_import import ImportJobs
+
+    jobs = ImportJobs()
+    job_id = jobs.submit([], [], submitted_by=1)
+    done = jobs.get(job_id)
+    for _ in range(100):
+        if done["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+        done = jobs.get(job_id)
+    assert done["status"] == "completed" and done["result"]["total"] == 0
+
+    # Input lives in memory only, so whatever has not finished is failed, not left queued
+    jobs._unfinished.add(job_id)
+    jobs._update(job_id, status="queued")
+    jobs.stop()
+    assert jobs.get(job_id)["status"] == "failed"
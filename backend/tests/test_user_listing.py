@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import pathlib
+import uuid
+
+from fastapi.testclient import TestClient
+
+# Ensure required env vars before importing app
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "testsecret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_EXPIRATION_TIME", "60")  # minutes
+os.environ.setdefault("DEV_PORT", "http://testclient")
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from main import app
+import controller.auth_controller as auth_controller
+import controller.user_controller as user_controller
+
+
+def register(client: TestClient, email: str, username: str):
+    payload = {"username": username, "lastname": "ln", "email": email, "password": "TestPass123!"}
+    assert client.post("/auth/register", json=payload).status_code == 201
+
+
+def test_listing_pages_by_id_with_prefix_filters_and_no_hashes(monkeypatch):
+    client = TestClient(app)
+    tag = uuid.uuid4().hex[:8]
+    emails = [f"list{tag}{i}@example.com" for i in range(5)]
+    for i, email in enumerate(emails):
+        register(client, email, f"{'Ann' if i % 2 == 0 else 'Bob'}{tag}")
+
+    assert client.get("/users/").status_code == 401
+    login = client.post("/auth/login", data={"username": emails[0], "password": "TestPass123!"})
+    assert login.status_code == 200
+    # Registration is open, so a plain account may not list the others
+    assert client.get("/users/").status_code == 403
+    monkeypatch.setattr(auth_controller, "USER_IMPORT_ADMIN_EMAILS", frozenset({emails[0]}))
+
+    seen, after = [], None
+    while True:
+        params = {"limit": 2, "email_prefix": f"LIST{tag}"}
+        if after is not None:
+            params["after"] = after
+        page = client.get("/users/", params=params).json()
+        assert len(page["users"]) <= 2
+        seen.extend(page["users"])
+        after = page["next_after"]
+        if after is None:
+            break
+
+    assert [u["email"] for u in seen] == emails
+    assert all("password" not in u for u in seen)
+    ids = [u["id"] for u in seen]
+    assert ids == sorted(ids)
+
+    anns = client.get("/users/", params={"username_prefix": f"ann{tag}"}).json()["users"]
+    assert [u["email"] for u in anns] == emails[0::2]
+    # LIKE wildcards in the prefix are matched literally
+    assert client.get("/users/", params={"email_prefix": "%"}).json()["users"] == []
+
+
+def test_export_streams_ndjson_in_batches(monkeypatch):
+    client = TestClient(app)
+    tag = uuid.uuid4().hex[:8]
+    emails = [f"export{tag}{i}@example.com" for i in range(5)]
+    for email in emails:
+        register(client, email, "exporter")
+
+    assert client.get("/users/export").status_code == 401
+
+    login = client.post("/auth/login", data={"username": emails[0], "password": "TestPass123!"})
+    assert login.status_code == 200
+    assert client.get("/users/export").status_code == 403
+    monkeypatch.setattr(auth_controller, "USER_IMPORT_ADMIN_EMAILS", frozenset({emails[0]}))
+    monkeypatch.setattr(user_controller, "EXPORT_BATCH_SIZE", 2)
+    response = client.get("/users/export", params={"email_prefix": f"export{tag}"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["email"] for r in rows] == emails
+    assert all("password" not in r for r in rows)
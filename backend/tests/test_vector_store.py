@@ -0,0 +1,56 @@
+import sys
+import uuid
+import pathlib
+
+import pytest
+
+# Ensure backend root is on sys.path for CI runners
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from services.vector_store import VectorStore, create_vector_store
+
+
+def make_store(backend: str, tmp_path):
+    return create_vector_store({
+        "backend": backend,
+        "persist_path": str(tmp_path / "chroma"),
+        "collection": f"test_{uuid.uuid4().hex[:8]}",
+        "api_key": None,
+        "tenant": None,
+        "database": None,
+    })
+
+
+def test_local_backends_share_upsert_query_count_semantics(tmp_path):
+    for backend in ("memory", "local"):
+        store = make_store(backend, tmp_path)
+        store.upsert(
+            ids=["a", "b", "c"],
+            documents=["3 bed in Austin", "2 bed in Dallas", "studio in Austin"],
+            metadatas=[{"source": "x.com"}, {"source": "y.com"}, {"source": "x.com"}],
+            embeddings=[[1.0, 0.0], [0.0, 1.0], [0.9, 0.1]],
+        )
+        # Upserting an existing id replaces it instead of adding a row
+        store.upsert(ids=["a"], documents=["3 bed in Austin, reduced"], metadatas=[{"source": "x.com"}], embeddings=[[1.0, 0.0]])
+        assert store.count() == 3
+
+        res = store.query(query_embeddings=[[1.0, 0.0]], n_results=2)
+        assert res["ids"][0] == ["a", "c"]
+        assert res["documents"][0][0] == "3 bed in Austin, reduced"
+
+        store.delete(ids=["c"])
+        assert store.count() == 2
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoCollections(VectorStore):
+        def upsert(self, ids, documents, metadatas, embeddings=None): ...
+        def query(self, query_embeddings, n_results=5, where=None): ...
+        def get(self, ids=None, where=None, include=None): ...
+        def delete(self, ids=None, where=None): ...
+        def count(self): ...
+
+    with pytest.raises(TypeError, match="collection_for"):
+        NoCollections()
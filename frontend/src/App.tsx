@@ -67,7 +67,16 @@ function FunctionPage() {
     try {
       // 1) Process URLs
       setLoadingStage('Initializing & indexing sources…');
-      await axiosInstance.post('/process/process-urls', { urls: provided });
+      const { data: job } = await axiosInstance.post('/process/process-urls', { urls: provided });
+
+      // Ingestion runs as a background job; poll until it settles
+      let status = job?.status;
+      while (status === 'queued' || status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        const { data: progress } = await axiosInstance.get(`/process/jobs/${job.job_id}`);
+        status = progress?.status;
+        setLoadingStage(`Indexing sources… (${progress?.progress?.finished ?? 0}/${progress?.progress?.total ?? provided.length})`);
+      }
 
       // 2) Query answer
       setLoadingStage('Generating answer…');